@@ -6,7 +6,10 @@ import psycopg2
 import psycopg2.extras
 import uvicorn
 from api.ml_router import router as ml_router
-from psycopg2.extras import RealDictCursor
+from db_config import PG_READ_DSN, get_connexion
+from api.data_events import VersionHeaderMiddleware, router as data_router
+from api.http_cache import CompressionMiddleware, conditional, data_stamp
+from api import queries
 
 from pathlib import Path
 from starlette_exporter import PrometheusMiddleware, handle_metrics
@@ -26,30 +29,32 @@ app = FastAPI(
 app.add_middleware(PrometheusMiddleware, app_name="pandemies_api")
 app.add_route("/metrics", handle_metrics)
 
+# Version des données (NOTIFY de l'ETL) : en-tête X-Data-Version + /data_version (SSE, long-poll)
+app.add_middleware(VersionHeaderMiddleware)
+app.include_router(data_router)
+
+# Réponses compressées (gzip) au-delà d'API_GZIP_MIN_BYTES ; ETag / 304 par endpoint
+app.add_middleware(CompressionMiddleware)
+DATA_VERSIONED = [conditional(data_stamp)]
+
 # Endpoint /health très simple
 @app.get("/health")
 def health():
-    # DB check
-    try:
-        conn = psycopg2.connect(
-            host=os.getenv("PGHOST","db"),
-            port=os.getenv("PGPORT","5432"),
-            dbname=os.getenv("PGDATABASE","pandemies_db"),
-            user=os.getenv("PGUSER","postgres"),
-            password=os.getenv("PGPASSWORD","Admin"),
-            cursor_factory=RealDictCursor,
-            connect_timeout=2
-        )
-        conn.close()
-        db_ok = True
-    except Exception:
-        db_ok = False
+    # DB check (primaire, et réplique en lecture si PG_READ_DSN est défini)
+    def db_check(readonly):
+        try:
+            get_connexion(readonly, connect_timeout=2).close()
+            return True
+        except Exception:
+            return False
+    db_ok = db_check(False)
+    replica_ok = db_check(True) if PG_READ_DSN else None
 
     # Modèle ML check
     model_ok = Path(os.getenv("MODEL_PATH","/app/prediction/artifacts/model_taux_transmission_rf.pkl")).exists()
 
-    return {"status":"ok" if (db_ok and model_ok) else "degraded",
-            "db": db_ok, "model": model_ok}
+    return {"status":"ok" if (db_ok and model_ok and replica_ok is not False) else "degraded",
+            "db": db_ok, "db_replica": replica_ok, "model": model_ok}
 
 # CORS (OK pour dev)
 app.add_middleware(
@@ -64,7 +69,7 @@ app.add_middleware(
 # Connexion DB
 # =========================
 def get_db_connection():
-    """Connexion à la base PostgreSQL"""
+    """Connexion à la base PostgreSQL (lecture)"""
     try:
         # conn = psycopg2.connect(
         #     dbname="pandemies_db",
@@ -74,14 +79,8 @@ def get_db_connection():
         #     port="5432",
         #     cursor_factory=psycopg2.extras.RealDictCursor
         # )
-        conn = psycopg2.connect(
-            dbname=os.getenv("PGDATABASE", "pandemies_db"),
-            user=os.getenv("PGUSER", "postgres"),
-            password=os.getenv("PGPASSWORD", "Admin"),
-            host=os.getenv("PGHOST", "localhost"),  # en conteneur => "db"
-            port=os.getenv("PGPORT", "5432"),
-            cursor_factory=psycopg2.extras.RealDictCursor
-        )
+        # endpoints en lecture seule : réplique si PG_READ_DSN, sinon primaire (PG*)
+        conn = get_connexion(readonly=True, cursor_factory=psycopg2.extras.RealDictCursor)
 
         return conn
     except Exception as e:
@@ -103,68 +102,39 @@ def root():
             "top_pays": "/top/{maladie}",
             "donnees_recentes": "/recent/{maladie}",
             "continents": "/continents/{maladie}",
+            "version_donnees": "/data_version",
         }
     }
 
-@app.get("/stats")
+@app.get("/stats", dependencies=DATA_VERSIONED)
 def get_statistiques_generales():
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT 
-                m.nom_maladie,
-                COUNT(*)                    AS nb_records,
-                COUNT(DISTINCT s.id_pays)   AS nb_pays,
-                MIN(s.date_stat)            AS premiere_date,
-                MAX(s.date_stat)            AS derniere_date
-            FROM statistique s 
-            JOIN maladie m ON s.id_maladie = m.id_maladie 
-            GROUP BY m.nom_maladie
-        """)
+        cur.execute(queries.STATS_SQL)
         rows = cur.fetchall()
         return {"statistiques": [dict(r) for r in rows]}
     finally:
         conn.close()
 
-@app.get("/pays/{maladie}")
+@app.get("/pays/{maladie}", dependencies=DATA_VERSIONED)
 def get_pays_par_maladie(maladie: str):
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT DISTINCT p.nom_pays, p.continent, p.population 
-            FROM pays p
-            JOIN statistique s ON p.id_pays = s.id_pays
-            JOIN maladie m     ON s.id_maladie = m.id_maladie
-            WHERE m.nom_maladie = %s
-            ORDER BY p.nom_pays
-        """, (maladie,))
+        cur.execute(queries.PAYS_SQL, {"maladie": maladie})
         rows = cur.fetchall()
         return {"pays": [dict(r) for r in rows]}
     finally:
         conn.close()
 
-@app.get("/evolution/{maladie}/{pays}")
+@app.get("/evolution/{maladie}/{pays}", dependencies=DATA_VERSIONED)
 def get_evolution_pays(maladie: str, pays: str, limit: int = 100):
     """Fix: plus de comparaison à 'NaN' + COALESCE pour NULLs"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT 
-                s.date_stat,
-                COALESCE(s.cas_totaux, 0)::bigint        AS cas_totaux,
-                COALESCE(s.nouveaux_cas, 0)::bigint      AS nouveaux_cas,
-                COALESCE(s.deces_totaux, 0)::bigint      AS deces_totaux,
-                COALESCE(s.nouveaux_deces, 0)::bigint    AS nouveaux_deces
-            FROM statistique s
-            JOIN pays p    ON s.id_pays    = p.id_pays
-            JOIN maladie m ON s.id_maladie = m.id_maladie
-            WHERE m.nom_maladie = %s AND p.nom_pays = %s
-            ORDER BY s.date_stat DESC
-            LIMIT %s
-        """, (maladie, pays, limit))
+        cur.execute(queries.EVOLUTION_SQL, {"maladie": maladie, "pays": pays, "limit": limit})
         rows = cur.fetchall()
         if not rows:
             raise HTTPException(status_code=404, detail=f"Aucune donnée pour {maladie} - {pays}")
@@ -172,90 +142,36 @@ def get_evolution_pays(maladie: str, pays: str, limit: int = 100):
     finally:
         conn.close()
 
-@app.get("/top/{maladie}")
+@app.get("/top/{maladie}", dependencies=DATA_VERSIONED)
 def get_top_pays(maladie: str, limit: int = 10):
     """Fix: COALESCE au lieu des CASE + cast"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT 
-                p.nom_pays,
-                p.continent,
-                MAX(COALESCE(s.cas_totaux, 0))   AS max_cas,
-                MAX(COALESCE(s.deces_totaux, 0)) AS max_deces
-            FROM statistique s
-            JOIN pays p    ON s.id_pays    = p.id_pays
-            JOIN maladie m ON s.id_maladie = m.id_maladie
-            WHERE m.nom_maladie = %s
-            GROUP BY p.nom_pays, p.continent
-            ORDER BY max_cas DESC
-            LIMIT %s
-        """, (maladie, limit))
+        cur.execute(queries.TOP_SQL, {"maladie": maladie, "limit": limit})
         rows = cur.fetchall()
         return {"maladie": maladie, "top_pays": [dict(r) for r in rows]}
     finally:
         conn.close()
 
-@app.get("/recent/{maladie}")
+@app.get("/recent/{maladie}", dependencies=DATA_VERSIONED)
 def get_donnees_recentes(maladie: str, jours: int = 30):
     """Fix: make_interval(days => %s) pour paramètre interval"""
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT 
-                s.date_stat,
-                p.nom_pays,
-                p.continent,
-                s.cas_totaux,
-                s.nouveaux_cas,
-                s.deces_totaux
-            FROM statistique s
-            JOIN pays p    ON s.id_pays    = p.id_pays
-            JOIN maladie m ON s.id_maladie = m.id_maladie
-            WHERE m.nom_maladie = %s 
-              AND s.date_stat >= (
-                  SELECT MAX(date_stat) - make_interval(days => %s)
-                  FROM statistique s2 
-                  JOIN maladie m2 ON s2.id_maladie = m2.id_maladie 
-                  WHERE m2.nom_maladie = %s
-              )
-            ORDER BY s.date_stat DESC, s.cas_totaux DESC
-            LIMIT 100
-        """, (maladie, jours, maladie))
+        cur.execute(queries.RECENT_SQL, {"maladie": maladie, "jours": jours})
         rows = cur.fetchall()
         return {"maladie": maladie, "periode": f"Derniers {jours} jours", "donnees": [dict(r) for r in rows]}
     finally:
         conn.close()
 
-@app.get("/continents/{maladie}")
+@app.get("/continents/{maladie}", dependencies=DATA_VERSIONED)
 def get_stats_par_continent(maladie: str):
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT 
-                p.continent,
-                COUNT(DISTINCT p.nom_pays) as nb_pays,
-                SUM(p.population)          as population_totale,
-                MAX(COALESCE(s.cas_totaux,0)) as max_cas_pays,
-                SUM(
-                    CASE WHEN s.date_stat = (
-                        SELECT MAX(s2.date_stat) 
-                        FROM statistique s2 
-                        WHERE s2.id_pays = s.id_pays 
-                          AND s2.id_maladie = s.id_maladie
-                    ) THEN COALESCE(s.cas_totaux,0) ELSE 0 END
-                ) as cas_totaux_continent
-            FROM statistique s
-            JOIN pays p    ON s.id_pays    = p.id_pays
-            JOIN maladie m ON s.id_maladie = m.id_maladie
-            WHERE m.nom_maladie = %s 
-              AND p.continent IS NOT NULL
-            GROUP BY p.continent
-            ORDER BY cas_totaux_continent DESC
-        """, (maladie,))
+        cur.execute(queries.CONTINENTS_SQL, {"maladie": maladie})
         rows = cur.fetchall()
         return {"maladie": maladie, "continents": [dict(r) for r in rows]}
     finally:
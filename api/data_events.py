@@ -0,0 +1,232 @@
+# api/data_events.py
+# Version des données côté API. Un thread par worker écoute le canal NOTIFY
+# `data_version` (publié au commit par l'ETL, la vue features et les prédictions, cf.
+# data_version.py) et garde la dernière version connue. Elle est renvoyée dans l'en-tête
+# X-Data-Version de chaque réponse et poussée aux clients par :
+#   GET /data_version                       version courante
+#   GET /data_version?since=N&wait=25       long-poll : répond dès que la version != N
+#   GET /data_version/stream                flux SSE (un évènement par nouvelle version)
+# Les caches (API, dashboard) s'invalident sur cette version au lieu d'un TTL court.
+# Avec une réplique en lecture (PG_READ_DSN) : LISTEN sur le primaire (NOTIFY n'est pas
+# répliqué), mais une version n'est annoncée qu'une fois rejouée par la réplique, sinon
+# des données anciennes partiraient étiquetées avec la nouvelle version. Le retard de
+# réplication est exposé dans /metrics (db_replica_lag_seconds).
+import asyncio
+import contextlib
+import os
+import select
+import threading
+import time
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from prometheus_client import Gauge
+from starlette.datastructures import MutableHeaders
+
+from data_version import CHANNEL, parse_payload, read_version
+from db_config import PG_READ_DSN, get_connexion
+
+DATA_VERSION_LISTEN = os.getenv("DATA_VERSION_LISTEN", "1") == "1"
+SSE_KEEPALIVE_S = float(os.getenv("SSE_KEEPALIVE_S", "15"))
+REPLICA_LAG_INTERVAL_S = float(os.getenv("REPLICA_LAG_INTERVAL_S", "5"))
+_RETRY_S = 5.0
+
+# (module jamais rechargé : collecteurs enregistrés une seule fois, cf. api/ml_metrics.py)
+DATA_VERSION_SERVED = Gauge(
+    "data_version_served", "Version des données annoncée par le worker", multiprocess_mode="livemin")
+REPLICA_LAG_SECONDS = Gauge(
+    "db_replica_lag_seconds", "Retard de rejeu de la réplique en lecture (0 = à jour)",
+    multiprocess_mode="livemax")
+
+# 0 quand tout le WAL reçu est rejoué (primaire inactif : pas de faux retard)
+_LAG_SQL = """
+SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+
+router = APIRouter(tags=["Données"])
+
+_version = None
+_modified = None  # updated_at de la version (date de publication, identique pour tous les workers)
+_lock = threading.Lock()
+_thread = None
+_subscribers = set()  # {(boucle asyncio, asyncio.Event)} des long-polls / flux SSE en cours
+
+
+def _set_version(v, modified=None):
+    global _version, _modified
+    with _lock:
+        if v is None or v == _version:
+            return
+        _version, _modified = v, modified
+        subs = list(_subscribers)
+    DATA_VERSION_SERVED.set(v)
+    for loop, event in subs:
+        loop.call_soon_threadsafe(event.set)
+
+
+def _replica_version():
+    conn = get_connexion(readonly=True)
+    try:
+        with conn.cursor() as cur:
+            return read_version(cur)[0]
+    finally:
+        conn.close()
+
+
+def _wait_for_replica(v):
+    """Bloque jusqu'à ce que la réplique ait rejoué la version `v` (sans réplique : rien)."""
+    if not PG_READ_DSN or v is None:
+        return
+    t0, delay, warned = time.monotonic(), 0.02, False
+    while True:
+        try:
+            replayed = _replica_version()
+            if replayed is not None and replayed >= v:
+                return
+        except Exception:
+            pass
+        if not warned and time.monotonic() - t0 > 30:
+            print(f"⚠️ La réplique n'a toujours pas rejoué la version {v} des données")
+            warned = True
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+
+def _announce(v, modified):
+    _wait_for_replica(v)
+    _set_version(v, modified)
+
+
+def _listen_loop():
+    warned = False
+    while True:
+        conn = None
+        try:
+            conn = get_connexion()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+                # relue à chaque (re)connexion : rattrape les NOTIFY manqués pendant la coupure
+                latest = read_version(cur)
+            _announce(*latest)
+            if warned:
+                print("✅ Écoute des versions de données rétablie")
+            warned = False
+            while True:
+                if select.select([conn], [], [], 60)[0]:
+                    conn.poll()
+                    latest = None
+                    while conn.notifies:  # seule la dernière version compte
+                        latest = parse_payload(conn.notifies.pop(0).payload)
+                    if latest is not None:
+                        _announce(*latest)
+        except Exception as e:
+            if not warned:
+                print(f"⚠️ Écoute des versions de données indisponible ({e.__class__.__name__}), nouvel essai toutes les {_RETRY_S:.0f} s")
+                warned = True
+        finally:
+            if conn is not None:
+                conn.close()
+        time.sleep(_RETRY_S)
+
+
+def _lag_loop():
+    while True:
+        try:
+            conn = get_connexion(readonly=True)
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(_LAG_SQL)
+                    REPLICA_LAG_SECONDS.set(float(cur.fetchone()[0]))
+            finally:
+                conn.close()
+        except Exception:
+            pass  # réplique injoignable : /health le signale
+        time.sleep(REPLICA_LAG_INTERVAL_S)
+
+
+def current_version():
+    """Dernière version connue (None tant qu'aucune n'a été lue) ; démarre l'écoute au 1er appel."""
+    global _thread
+    if _thread is None and DATA_VERSION_LISTEN:
+        with _lock:
+            if _thread is None:
+                _thread = threading.Thread(target=_listen_loop, name="data-version", daemon=True)
+                _thread.start()
+                if PG_READ_DSN:
+                    threading.Thread(target=_lag_loop, name="replica-lag", daemon=True).start()
+    return _version
+
+
+def last_modified():
+    """Date de publication de la version courante (None si inconnue)."""
+    current_version()
+    return _modified
+
+
+@contextlib.contextmanager
+def _subscription():
+    """Event asyncio levé à chaque nouvelle version (depuis le thread d'écoute)."""
+    event = asyncio.Event()
+    sub = (asyncio.get_running_loop(), event)
+    with _lock:
+        _subscribers.add(sub)
+    try:
+        yield event
+    finally:
+        with _lock:
+            _subscribers.discard(sub)
+
+
+@router.get("/data_version")
+async def data_version(since: int = None, wait: float = Query(0, ge=0, le=60)):
+    if since is not None and wait > 0:
+        with _subscription() as event:
+            if current_version() in (None, since):
+                try:
+                    await asyncio.wait_for(event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+    return {"version": current_version()}
+
+
+@router.get("/data_version/stream")
+async def data_version_stream():
+    async def events():
+        sent = None
+        with _subscription() as event:
+            while True:
+                v = current_version()
+                if v is not None and v != sent:
+                    sent = v
+                    yield f"event: data_version\ndata: {v}\n\n"
+                try:
+                    await asyncio.wait_for(event.wait(), SSE_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    # commentaire SSE : garde la connexion ouverte derrière les proxys
+                    yield ": keepalive\n\n"
+                event.clear()
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+class VersionHeaderMiddleware:
+    """X-Data-Version sur toutes les réponses : la version connue AU DÉBUT de la requête
+    (les données lues ensuite sont au moins aussi récentes), pour que le client ne garde
+    jamais en cache une réponse étiquetée plus récente qu'elle ne l'est."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        v = current_version()
+
+        async def send_with_version(message):
+            if message["type"] == "http.response.start" and v is not None:
+                MutableHeaders(scope=message).append("X-Data-Version", str(v))
+            await send(message)
+
+        await self.app(scope, receive, send_with_version)
@@ -0,0 +1,104 @@
+# api/http_cache.py
+# Requêtes conditionnelles et compression des réponses.
+# - ETag fort (empreinte du chemin, de la query et de la version des données / du modèle)
+#   et Last-Modified (date du commit ou mtime des artefacts). La vérification est une
+#   dépendance FastAPI : elle s'exécute AVANT l'endpoint, donc un If-None-Match qui
+#   correspond reçoit un 304 sans requête SQL ni prédiction.
+# - Compression gzip au-delà de API_GZIP_MIN_BYTES (flux SSE exclus). Le corps compressé
+#   est une autre représentation : son ETag reçoit le suffixe -gzip.
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+
+from api import data_events
+
+API_GZIP_MIN_BYTES = int(os.getenv("API_GZIP_MIN_BYTES", "1024"))
+API_GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", "5"))
+# Navigateurs : max-age=0, revalidation à chaque usage. Caches partagés (micro-cache de la
+# passerelle nginx) : réponse fraîche HTTP_SHARED_MAX_AGE_S secondes, puis servie périmée
+# pendant la revalidation en tâche de fond (un 304 sans SQL côté API). Un client qui
+# n'envoie pas X-Data-Version peut donc lire l'ancienne version jusqu'à
+# HTTP_SHARED_MAX_AGE_S + HTTP_STALE_S secondes après l'ETL (cf. gateway/nginx.conf).
+HTTP_SHARED_MAX_AGE_S = int(os.getenv("HTTP_SHARED_MAX_AGE_S", "5"))
+HTTP_STALE_S = int(os.getenv("HTTP_STALE_S", "30"))
+HTTP_CACHE_CONTROL = os.getenv(
+    "HTTP_CACHE_CONTROL",
+    f"public, max-age=0, s-maxage={HTTP_SHARED_MAX_AGE_S}, "
+    f"stale-while-revalidate={HTTP_STALE_S}, stale-if-error={10 * HTTP_STALE_S}")
+_GZIP_SUFFIX = "-gzip"
+
+
+def etag(request: Request, token) -> str:
+    query = sorted(request.query_params.multi_items())
+    digest = hashlib.sha1(repr((request.url.path, query, token)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _http_date(dt: datetime) -> str:
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+def _not_modified(request: Request, tag: str, modified: datetime = None) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:  # prioritaire sur If-Modified-Since (RFC 9110)
+        tags = [t.strip().removeprefix("W/").replace(f'{_GZIP_SUFFIX}"', '"') for t in inm.split(",")]
+        return "*" in tags or tag in tags
+    ims = request.headers.get("if-modified-since")
+    if ims and modified is not None:
+        try:
+            return modified.replace(microsecond=0) <= parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional(stamp):
+    """Dépendance de route : `stamp(request)` → (jeton de version, datetime ou None), ou None
+    si la version est inconnue (réponse servie normalement, sans validateur)."""
+    def check(request: Request, response: Response):
+        found = stamp(request)
+        if found is None:
+            return
+        token, modified = found
+        tag = etag(request, token)
+        headers = {"ETag": tag, "Cache-Control": HTTP_CACHE_CONTROL}
+        if modified is not None:
+            headers["Last-Modified"] = _http_date(modified)
+        if _not_modified(request, tag, modified):
+            raise HTTPException(status_code=304, headers=headers)  # corps vide
+        response.headers.update(headers)
+    return Depends(check)
+
+
+def data_stamp(request: Request):
+    """Endpoints de données : tout ce qu'ils renvoient dépend de la version des données."""
+    v = data_events.current_version()
+    return None if v is None else (("data", v), data_events.last_modified())
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = API_GZIP_MIN_BYTES, compresslevel: int = API_GZIP_LEVEL,
+                 exclude_paths=("/data_version/stream",)):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        # SSE : gzip retiendrait les évènements dans son tampon
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            return await self.app(scope, receive, send)
+
+        async def send_tagged(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                tag = headers.get("etag")
+                if headers.get("content-encoding") == "gzip" and tag and tag.endswith('"'):
+                    headers["ETag"] = f'{tag[:-1]}{_GZIP_SUFFIX}"'
+            await send(message)
+
+        await self.gzip(scope, receive, send_tagged)
@@ -0,0 +1,141 @@
+# api/inference.py
+# Exécuteur de prédictions à micro-batching, hors des threads de requêtes.
+# Les demandes (modèle, X) sont mises en file ; un thread répartiteur regroupe celles
+# qui arrivent dans une courte fenêtre (max_wait_ms), dans la limite de max_rows lignes,
+# fait UN model.predict par modèle sur le batch concaténé dans un pool de threads
+# dimensionné aux coeurs, puis rend à chaque appelant sa tranche du résultat.
+# Une forêt (compacte ou sklearn) coûte surtout par appel : N petites requêtes
+# concurrentes → 1 appel vectorisé au lieu de N appels qui se disputent le GIL.
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from api.ml_metrics import (
+    INFERENCE_BATCH_REQUESTS, INFERENCE_BATCH_ROWS, INFERENCE_QUEUE_DEPTH, INFERENCE_QUEUE_WAIT,
+)
+from prediction.config import ML_BATCH_MAX_ROWS, ML_BATCH_MAX_WAIT_MS, ML_INFERENCE_WORKERS
+from prediction.model_selection import available_cores
+
+_STOP = object()
+
+
+class _Request:
+    __slots__ = ("model", "X", "future", "t0")
+
+    def __init__(self, model, X):
+        self.model, self.X, self.future, self.t0 = model, X, Future(), time.perf_counter()
+
+
+class BatchingExecutor:
+    """File de prédictions fusionnées : `predict(model, X)` bloque jusqu'au résultat."""
+
+    def __init__(self, max_rows: int = ML_BATCH_MAX_ROWS, max_wait_ms: float = ML_BATCH_MAX_WAIT_MS,
+                 workers: int = ML_INFERENCE_WORKERS):
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1e3
+        self.workers = workers or available_cores()
+        self._queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ml-predict")
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._dispatch, name="ml-batcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, model, X: pd.DataFrame) -> Future:
+        self._ensure_started()
+        req = _Request(model, X)
+        INFERENCE_QUEUE_DEPTH.inc()
+        self._queue.put(req)
+        return req.future
+
+    def predict(self, model, X: pd.DataFrame, timeout: float = None) -> np.ndarray:
+        return self.submit(model, X).result(timeout)
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        self._pool.shutdown(wait=True)
+
+    def _take(self, timeout=None):
+        item = self._queue.get(timeout=timeout)
+        if item is not _STOP:
+            INFERENCE_QUEUE_DEPTH.dec()
+        return item
+
+    def _dispatch(self):
+        carry = None  # demande qui aurait dépassé max_rows : ouvre le batch suivant
+        while True:
+            first = carry if carry is not None else self._take()
+            carry = None
+            if first is _STOP:
+                return
+            batch, rows = [first], len(first.X)
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._take(remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP or rows + len(item.X) > self.max_rows:
+                    carry = item
+                    break
+                batch.append(item)
+                rows += len(item.X)
+
+            groups = {}  # un appel predict par modèle (plusieurs maladies possibles)
+            for req in batch:
+                groups.setdefault(id(req.model), []).append(req)
+            for reqs in groups.values():
+                self._pool.submit(self._run, reqs)
+
+    @staticmethod
+    def _run(reqs: list):
+        now = time.perf_counter()
+        for r in reqs:
+            INFERENCE_QUEUE_WAIT.observe(now - r.t0)
+        model = reqs[0].model
+        X = reqs[0].X if len(reqs) == 1 else pd.concat([r.X for r in reqs], ignore_index=True)
+        INFERENCE_BATCH_ROWS.observe(len(X))
+        INFERENCE_BATCH_REQUESTS.observe(len(reqs))
+        try:
+            y = np.asarray(model.predict(X))
+        except Exception as e:
+            if len(reqs) == 1:
+                reqs[0].future.set_exception(e)
+                return
+            # une demande invalide ne doit pas faire échouer les autres : on les rejoue seules
+            for r in reqs:
+                BatchingExecutor._run([r])
+            return
+        start = 0
+        for r in reqs:
+            r.future.set_result(y[start:start + len(r.X)])
+            start += len(r.X)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> BatchingExecutor:
+    """Exécuteur partagé du process (un par worker uvicorn), créé au premier appel."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BatchingExecutor()
+    return _executor
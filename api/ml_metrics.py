@@ -0,0 +1,62 @@
+# api/ml_metrics.py
+# Métriques Prometheus du chemin ML (exposées par /metrics avec les métriques HTTP).
+# Module à part, jamais rechargé : un collecteur ne peut être enregistré qu'une fois.
+# Avec plusieurs workers uvicorn, PROMETHEUS_MULTIPROC_DIR (cf. Dockerfile.api) agrège
+# les process ; les jauges précisent donc leur mode d'agrégation.
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "ml_inference_queue_depth", "Demandes de prédiction en attente de batch", multiprocess_mode="livesum")
+INFERENCE_BATCH_ROWS = Histogram(
+    "ml_inference_batch_rows", "Lignes évaluées par appel model.predict (batch fusionné)",
+    buckets=(1, 10, 50, 100, 500, 1000, 2000, 5000, 10000, 50000))
+INFERENCE_BATCH_REQUESTS = Histogram(
+    "ml_inference_batch_requests", "Demandes fusionnées par batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64))
+INFERENCE_QUEUE_WAIT = Histogram(
+    "ml_inference_queue_wait_seconds", "Attente d'une demande avant son batch",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25))
+
+# --- Instrumentation de /ml (labels `endpoint` = gabarit de route, cardinalité bornée) ---
+MODEL_LOAD_SECONDS = Histogram(
+    "ml_model_load_seconds", "Chargement d'un modèle (forêt compacte ou .pkl)", ["maladie", "format"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30))
+MODEL_ACTIVE = Gauge(
+    "ml_model_active", "Modèle chargé par maladie (1 = version servie)", ["maladie", "version", "format"],
+    multiprocess_mode="livemax")
+PHASE_SECONDS = Histogram(
+    "ml_phase_seconds", "Durée par phase d'une requête ML", ["endpoint", "phase"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+ROWS_SCORED = Histogram(
+    "ml_rows_scored", "Lignes évaluées par requête", ["endpoint"],
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 10000))
+CACHE_REQUESTS = Counter(
+    "ml_cache_requests_total", "Accès aux caches ML (ratio = hit / total)", ["endpoint", "cache", "result"])
+
+_active = {}  # {maladie: labels du modèle actif}, pour éteindre l'ancienne version
+
+
+@contextmanager
+def phase(endpoint: str, name: str):
+    """Chronomètre une phase : data_load, feature_select, predict, serialize."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.labels(endpoint, name).observe(time.perf_counter() - t0)
+
+
+def cache_access(endpoint: str, cache: str, hit: bool):
+    CACHE_REQUESTS.labels(endpoint, cache, "hit" if hit else "miss").inc()
+
+
+def model_loaded(maladie: str, version: str, fmt: str, seconds: float):
+    MODEL_LOAD_SECONDS.labels(maladie, fmt).observe(seconds)
+    old = _active.pop(maladie, None)
+    if old is not None:
+        MODEL_ACTIVE.labels(*old).set(0)  # (remove n'est pas supporté en multiprocess)
+    _active[maladie] = (maladie, version, fmt)
+    MODEL_ACTIVE.labels(maladie, version, fmt).set(1)
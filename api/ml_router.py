@@ -1,24 +1,134 @@
 # api/ml_router.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field  # (utile si tu gardes /ml/predict unitaire)
 from joblib import load
+from collections import OrderedDict
 from pathlib import Path
 import math
+import re
+import time
+from datetime import datetime, timezone
 import pandas as pd
 
-from prediction.config import MODEL_PATH, FEATURE_COLS, FEATURES_CSV, TARGET_COL
+from prediction.config import (
+    ARTIFACTS_DIR, MODEL_PATH, FEATURE_COLS, FEATURES_CSV, FEATURES_SOURCE, MALADIE_CIBLE, ML_BATCHING,
+    ML_CACHE_ENTRIES, ML_MAX_MODELS, ML_SERVING_MODE, TARGET_COL, paths_for,
+)
+from api import data_events, ml_metrics
+from api.http_cache import conditional
+from api.inference import get_executor
+from prediction.compact_forest import compact_path, load_compact_forest
+from prediction.feature_store import FeatureStore, feature_store_path
+from prediction.datasets import dataset_countries, dataset_path, has_dataset, primary_source, read_dataset
+from prediction.stamps import is_current, read_model_version
 
 router = APIRouter(prefix="/ml", tags=["ML"])
-_model = None  # lazy-load
+# Modèles chargés à la demande, un par maladie : LRU {chemin du modèle: (empreinte, modèle)}
+# borné à ML_MAX_MODELS (une forêt pickle peut peser plus d'1 Go).
+_models = OrderedDict()
+_stores = {}  # {chemin du store: (clé, FeatureStore)} — feature stores mmap partagés entre workers
+# Caches LRU (ML_CACHE_ENTRIES) dont les clés incluent l'empreinte (mtime) des artefacts,
+# ou la version des données pour la vue features : un réentraînement ou de nouvelles
+# features les invalident d'eux-mêmes.
+_features_cache = OrderedDict()  # {(features, empreinte, pays): DataFrame du pays}
+_series_cache = OrderedDict()    # {(modèle, empreinte, features, empreinte, pays): points}
+_MALADIE_RE = re.compile(r"^[a-z0-9_]+$")
 
 
-def get_model():
-    global _model
-    if _model is None:
-        if not Path(MODEL_PATH).exists():
-            raise HTTPException(status_code=503, detail="Modèle introuvable. Entraînez-le d'abord.")
-        _model = load(MODEL_PATH)
-    return _model
+def _paths(maladie: str = None) -> dict:
+    """Artefacts d'une maladie : ARTIFACTS_DIR/<maladie>/ (pipeline multi-maladies), sinon,
+    pour la maladie par défaut, MODEL_PATH / FEATURES_CSV de la config."""
+    maladie = maladie or MALADIE_CIBLE
+    if not _MALADIE_RE.match(maladie):
+        raise HTTPException(status_code=404, detail=f"Maladie inconnue: {maladie}")
+    base = ARTIFACTS_DIR / maladie
+    if base.is_dir():
+        env = paths_for(maladie)  # mêmes noms de fichiers que le pipeline
+        return {"maladie": maladie, "model": base / Path(env["MODEL_PATH"]).name,
+                "features": base / Path(env["FEATURES_CSV"]).name}
+    if maladie == MALADIE_CIBLE:
+        return {"maladie": maladie, "model": Path(MODEL_PATH), "features": Path(FEATURES_CSV)}
+    raise HTTPException(status_code=404, detail=f"Aucun modèle pour la maladie {maladie}")
+
+
+def _mtime(p: Path):
+    try:
+        return p.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _lru_get(cache: OrderedDict, key):
+    hit = cache.get(key)
+    if hit is not None:
+        cache.move_to_end(key)
+    return hit
+
+
+def _lru_put(cache: OrderedDict, key, value, size: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > size:
+        cache.popitem(last=False)  # le moins récemment utilisé
+
+
+def _model_stamp(model_path: Path):
+    return (_mtime(model_path), _mtime(compact_path(model_path) / "meta.json"))
+
+
+def get_model(maladie: str = None, endpoint: str = "-"):
+    paths = _paths(maladie)
+    model_path = paths["model"]
+    compact = compact_path(model_path)
+    key, stamp = str(model_path), _model_stamp(model_path)
+    hit = _models.get(key)
+    ml_metrics.cache_access(endpoint, "model", hit is not None and hit[0] == stamp)
+    if hit is not None and hit[0] == stamp:
+        _models.move_to_end(key)
+        return hit[1]
+
+    # Forêt compacte (mmap, évaluation vectorisée) si elle est à jour, sinon le .pkl
+    t0 = time.perf_counter()
+    if is_current(compact, model_path):
+        model, fmt = load_compact_forest(compact), "compact"
+    elif model_path.exists():
+        model, fmt = load(model_path), "pickle"
+    else:
+        raise HTTPException(status_code=503, detail="Modèle introuvable. Entraînez-le d'abord.")
+    seconds = time.perf_counter() - t0
+    # version écrite à la sauvegarde (même valeur que model_registry) ; jamais hachée ici
+    ml_metrics.model_loaded(paths["maladie"], read_model_version(model_path) or "inconnue", fmt, seconds)
+    _lru_put(_models, key, (stamp, model), ML_MAX_MODELS)
+    return model
+
+
+def get_feature_store(features_csv=None):
+    """Feature store mmap s'il est à jour vis-à-vis des features (dataset ou CSV), sinon None."""
+    features_csv = features_csv or FEATURES_CSV
+    path = feature_store_path(features_csv)
+    if not is_current(path, primary_source(features_csv)):
+        return None
+    key = (path / "meta.json").stat().st_mtime_ns
+    hit = _stores.get(str(path))
+    if hit is None or hit[0] != key:
+        hit = _stores[str(path)] = (key, FeatureStore(path))
+    return hit[1]
+
+
+def _predict(model, X: pd.DataFrame):
+    """model.predict via l'exécuteur à micro-batching (hors thread de requête), sauf ML_BATCHING=0."""
+    if ML_BATCHING:
+        return get_executor().predict(model, X)
+    return model.predict(X)
+
+
+def _safe_num(x):
+    """float JSON-safe : NaN/Inf/None → None."""
+    try:
+        xf = float(x)
+        return xf if math.isfinite(xf) else None
+    except Exception:
+        return None
 
 
 # --- util: normaliser les noms pays (espaces/underscores, casse) ---
@@ -26,39 +136,215 @@ def _norm(s: str) -> str:
     return str(s).strip().lower().replace(" ", "_")
 
 
-@router.get("/available_countries")
-def available_countries():
-    if not Path(FEATURES_CSV).exists():
-        raise HTTPException(status_code=503, detail="features_data.csv introuvable.")
-    df = pd.read_csv(FEATURES_CSV)
-    pays = sorted(set(p for p in df["nom_pays"].dropna().astype(str)))
-    return {"countries": pays}
+def _db_countries(maladie: str) -> list:
+    from prediction.features_sql import list_countries_db
+    try:
+        return list_countries_db(maladie, readonly=True)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Vue features indisponible: {e}")
 
 
-@router.get("/predict_series/{nom_pays}")
-def predict_series(nom_pays: str):
-    model = get_model()
+def _features_stamp(paths: dict):
+    """Empreinte des features servies : mtime des fichiers, ou version des données (NOTIFY)
+    quand elles viennent de PostgreSQL (None tant qu'elle est inconnue : pas de cache)."""
+    if FEATURES_SOURCE == "db":
+        v = data_events.current_version()
+        return None if v is None else ("db", v)
+    return _mtime(primary_source(paths["features"]))
 
-    if not Path(FEATURES_CSV).exists():
-        raise HTTPException(status_code=503, detail="features_data.csv introuvable. Lance l'étape features.")
-    try:
-        df = pd.read_csv(FEATURES_CSV, parse_dates=["date_stat"])
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Lecture features_data.csv impossible: {e}")
 
-    # Accepter 'United States' ou 'United_States', 'france' ou 'France', etc.
-    mask = df["nom_pays"].astype(str).apply(_norm) == _norm(nom_pays)
-    d = df[mask].copy()
+def _country_features(nom_pays: str, paths: dict, endpoint: str = "-") -> pd.DataFrame:
+    """Features d'un pays, via le cache LRU quand elles viennent de fichiers."""
+    stamp = _features_stamp(paths)
+    key = (str(paths["features"]), stamp, _norm(nom_pays))
+    if stamp is not None:
+        d = _lru_get(_features_cache, key)
+        ml_metrics.cache_access(endpoint, "features", d is not None)
+        if d is not None:
+            return d.copy()
+    d = _load_country_features(nom_pays, paths)
+    if stamp is not None:
+        _lru_put(_features_cache, key, d, ML_CACHE_ENTRIES)
+    return d.copy()
+
+
+def _load_country_features(nom_pays: str, paths: dict) -> pd.DataFrame:
+    """Lignes de features d'un pays : vue PostgreSQL (FEATURES_SOURCE=db), tranche du
+    store mmap, partition Parquet du pays, sinon lecture du CSV."""
+    features_csv = paths["features"]
+    store = get_feature_store(features_csv) if FEATURES_SOURCE != "db" else None
+    if FEATURES_SOURCE == "db":
+        from prediction.features_sql import load_features_db
+        match = [p for p in _db_countries(paths["maladie"]) if _norm(p) == _norm(nom_pays)]
+        d = (load_features_db(paths["maladie"], match[0], ["date_stat", TARGET_COL] + FEATURE_COLS,
+                              readonly=True) if match else pd.DataFrame())
+    elif store is not None:
+        # Accepter 'United States' ou 'United_States', 'france' ou 'France', etc.
+        match = [p for p in store.countries if _norm(p) == _norm(nom_pays)]
+        cols = ["date_stat", TARGET_COL] + FEATURE_COLS
+        d = store.frame(match[0], [c for c in cols if c in store.columns]) if match else pd.DataFrame()
+    elif has_dataset(features_csv):
+        # Projection + filtre sur la partition nom_pays : seul le fichier du pays est lu
+        try:
+            path = dataset_path(features_csv)
+            match = [p for p in dataset_countries(path) if _norm(p) == _norm(nom_pays)]
+            d = (read_dataset(path, ["nom_pays", "date_stat", TARGET_COL] + FEATURE_COLS, match[0])
+                 if match else pd.DataFrame())
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Lecture du dataset features impossible: {e}")
+    else:
+        if not features_csv.exists():
+            raise HTTPException(status_code=503, detail="features_data.csv introuvable. Lance l'étape features.")
+        try:
+            df = pd.read_csv(features_csv, parse_dates=["date_stat"])
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Lecture features_data.csv impossible: {e}")
+        mask = df["nom_pays"].astype(str).apply(_norm) == _norm(nom_pays)
+        d = df[mask].copy()
     if d.empty:
         raise HTTPException(status_code=404, detail=f"Aucune donnée pour {nom_pays} dans features_data.csv")
+    return d
+
+
+def _db_predictions(fn, maladie: str, *args):
+    """Lecture dans la table prediction (ML_SERVING_MODE=db) : aucun modèle chargé."""
+    from prediction import predictions_db
+    if not _MALADIE_RE.match(maladie):
+        raise HTTPException(status_code=404, detail=f"Maladie inconnue: {maladie}")
+    try:
+        return getattr(predictions_db, fn)(maladie, *args, readonly=True)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Prédictions en base indisponibles: {e}")
+
+
+def _http_stamp(request: Request):
+    """Validateur HTTP des séries et listes de pays : versions du modèle et des features
+    (ou des prédictions en base) ; None quand elles ne sont pas connues."""
+    maladie = request.path_params.get("maladie") or MALADIE_CIBLE
+    if ML_SERVING_MODE == "db":
+        v = data_events.current_version()
+        return None if v is None else (("db", maladie, v), data_events.last_modified())
+    paths = _paths(maladie)
+    fstamp = _features_stamp(paths)
+    mstamp = _model_stamp(paths["model"])
+    if fstamp is None or mstamp[0] is None:
+        return None
+    mtimes = [t for t in mstamp + (fstamp,) if isinstance(t, int)]
+    modified = datetime.fromtimestamp(max(mtimes) / 1e9, timezone.utc)
+    if isinstance(fstamp, tuple):  # features en base : date du commit de la version
+        modified = max(modified, data_events.last_modified() or modified)
+    return (mstamp, fstamp), modified
+
+
+_CONDITIONAL = [conditional(_http_stamp)]
+
+
+@router.get("/maladies")
+def maladies():
+    """Maladies servies : sous-dossiers d'artefacts avec un modèle, + la maladie par défaut."""
+    found = {d.name for d in (ARTIFACTS_DIR.iterdir() if ARTIFACTS_DIR.is_dir() else [])
+             if d.is_dir() and _MALADIE_RE.match(d.name) and _paths(d.name)["model"].exists()}
+    return {"maladies": sorted(found | {MALADIE_CIBLE}), "defaut": MALADIE_CIBLE}
+
+
+@router.get("/available_countries", dependencies=_CONDITIONAL)
+def available_countries():
+    return _available_countries(MALADIE_CIBLE, "/ml/available_countries")
+
+
+@router.get("/predict_series/{nom_pays}", dependencies=_CONDITIONAL)
+def predict_series(nom_pays: str):
+    return _predict_series(MALADIE_CIBLE, nom_pays, "/ml/predict_series/{nom_pays}")
+
+
+@router.get("/{maladie}/available_countries", dependencies=_CONDITIONAL)
+def available_countries_maladie(maladie: str):
+    return _available_countries(maladie, "/ml/{maladie}/available_countries")
+
+
+@router.get("/{maladie}/predict_series/{nom_pays}", dependencies=_CONDITIONAL)
+def predict_series_maladie(maladie: str, nom_pays: str):
+    return _predict_series(maladie, nom_pays, "/ml/{maladie}/predict_series/{nom_pays}")
+
+
+def _available_countries(maladie: str, endpoint: str):
+    with ml_metrics.phase(endpoint, "data_load"):
+        return {"countries": _list_countries(maladie)}
+
+
+def _list_countries(maladie: str) -> list:
+    if ML_SERVING_MODE == "db":
+        return _db_predictions("fetch_countries", maladie)
+    paths = _paths(maladie)
+    if FEATURES_SOURCE == "db":
+        return _db_countries(paths["maladie"])
+    features_csv = paths["features"]
+    store = get_feature_store(features_csv)
+    if store is not None:
+        return sorted(store.countries)
+    if has_dataset(features_csv):
+        return dataset_countries(dataset_path(features_csv))
+    if not features_csv.exists():
+        raise HTTPException(status_code=503, detail="features_data.csv introuvable.")
+    df = pd.read_csv(features_csv, usecols=["nom_pays"])
+    return sorted(set(p for p in df["nom_pays"].dropna().astype(str)))
+
+
+def _predict_series(maladie: str, nom_pays: str, endpoint: str):
+    if ML_SERVING_MODE == "db":
+        # publier des prédictions change la version des données : elle sert de clé de cache
+        version = data_events.current_version()
+        key = ("db", maladie, version, _norm(nom_pays))
+        if version is not None:
+            points = _lru_get(_series_cache, key)
+            ml_metrics.cache_access(endpoint, "series", points is not None)
+            if points is not None:
+                return {"nom_pays": nom_pays, "points": points}
+        with ml_metrics.phase(endpoint, "data_load"):
+            rows = _db_predictions("fetch_series", maladie, _norm(nom_pays))
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"Aucune prédiction pour {nom_pays} en base")
+        with ml_metrics.phase(endpoint, "serialize"):
+            points = [{"date": d.strftime("%Y-%m-%d"), "taux_true": _safe_num(t), "taux_pred": _safe_num(p)}
+                      for d, t, p in rows]
+        if version is not None:
+            _lru_put(_series_cache, key, points, ML_CACHE_ENTRIES)
+        return {"nom_pays": nom_pays, "points": points}
+
+    paths = _paths(maladie)
+    # Série déjà calculée pour ce modèle et ces features : ni lecture ni prédiction
+    fstamp = _features_stamp(paths)
+    key = (str(paths["model"]), _model_stamp(paths["model"]), str(paths["features"]), fstamp, _norm(nom_pays))
+    if fstamp is not None:
+        points = _lru_get(_series_cache, key)
+        ml_metrics.cache_access(endpoint, "series", points is not None)
+        if points is not None:
+            return {"nom_pays": nom_pays, "points": points}
+
+    with ml_metrics.phase(endpoint, "model_load"):
+        model = get_model(paths["maladie"], endpoint)
+    with ml_metrics.phase(endpoint, "data_load"):
+        d = _country_features(nom_pays, paths, endpoint)
 
     # PRÉDICTION dans l'ordre exact des features d'entraînement
+    with ml_metrics.phase(endpoint, "feature_select"):
+        X = d[FEATURE_COLS]
+    ml_metrics.ROWS_SCORED.labels(endpoint).observe(len(X))
     try:
-        y_pred = model.predict(d[FEATURE_COLS])
+        with ml_metrics.phase(endpoint, "predict"):
+            y_pred = _predict(model, X)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erreur modèle: {e}")
 
-    d["taux_pred"] = pd.Series(y_pred)
+    with ml_metrics.phase(endpoint, "serialize"):
+        points = _points(d, y_pred)
+    if fstamp is not None:
+        _lru_put(_series_cache, key, points, ML_CACHE_ENTRIES)
+    return {"nom_pays": nom_pays, "points": points}
+
+
+def _points(d: pd.DataFrame, y_pred) -> list:
+    d["taux_pred"] = y_pred  # positionnel (l'index de d n'est pas 0..n-1 hors 1er pays)
 
     # --- SANITISATION pour JSON ---
     # 1) Forcer numérique et remplacer non-fini (NaN/Inf) par None dans la réponse
@@ -71,22 +357,12 @@ def predict_series(nom_pays: str):
     # 2) Drop les dates NaT (pas sérialisables)
     d = d.dropna(subset=["date_stat"]).sort_values("date_stat")
 
-    # 3) Helper JSON-safe
-    def safe_num(x):
-        try:
-            xf = float(x)
-            return xf if math.isfinite(xf) else None
-        except Exception:
-            return None
-
-    # 4) Construire la réponse en remplaçant NaN/Inf par None
-    points = [
+    # 3) Construire la réponse en remplaçant NaN/Inf par None
+    return [
         {
             "date": dt.strftime("%Y-%m-%d"),
-            "taux_true": safe_num(t),
-            "taux_pred": safe_num(p),
+            "taux_true": _safe_num(t),
+            "taux_pred": _safe_num(p),
         }
         for dt, t, p in zip(d["date_stat"], d[TARGET_COL], d["taux_pred"])
     ]
-
-    return {"nom_pays": nom_pays, "points": points}
@@ -0,0 +1,121 @@
+# api/queries.py
+# Requêtes SQL des endpoints de données, à un seul endroit : l'API les exécute et
+# db_schema.check_plans() vérifie par EXPLAIN ANALYZE qu'elles utilisent les index prévus.
+# La maladie (et le pays) sont résolus en identifiants par sous-requête : le planificateur
+# ne garde alors que la partition de la maladie (élagage au démarrage de l'exécution).
+
+_ID_MALADIE = "(SELECT id_maladie FROM maladie WHERE nom_maladie = %(maladie)s)"
+
+STATS_SQL = """
+SELECT
+    m.nom_maladie,
+    COUNT(*)                    AS nb_records,
+    COUNT(DISTINCT s.id_pays)   AS nb_pays,
+    MIN(s.date_stat)            AS premiere_date,
+    MAX(s.date_stat)            AS derniere_date
+FROM statistique s
+JOIN maladie m ON s.id_maladie = m.id_maladie
+GROUP BY m.nom_maladie
+"""
+
+# EXISTS : une sonde dans la clé primaire par pays au lieu d'un DISTINCT sur toute la maladie
+PAYS_SQL = f"""
+SELECT p.nom_pays, p.continent, p.population
+FROM pays p
+WHERE EXISTS (
+    SELECT 1 FROM statistique s
+    WHERE s.id_maladie = {_ID_MALADIE} AND s.id_pays = p.id_pays
+)
+ORDER BY p.nom_pays
+"""
+
+# Parcours arrière de la clé primaire (id_maladie, id_pays, date_stat), qui inclut les
+# colonnes renvoyées : index-only scan
+EVOLUTION_SQL = f"""
+SELECT
+    s.date_stat,
+    COALESCE(s.cas_totaux, 0)::bigint        AS cas_totaux,
+    COALESCE(s.nouveaux_cas, 0)::bigint      AS nouveaux_cas,
+    COALESCE(s.deces_totaux, 0)::bigint      AS deces_totaux,
+    COALESCE(s.nouveaux_deces, 0)::bigint    AS nouveaux_deces
+FROM statistique s
+WHERE s.id_maladie = {_ID_MALADIE}
+  AND s.id_pays = (SELECT id_pays FROM pays WHERE nom_pays = %(pays)s)
+ORDER BY s.date_stat DESC
+LIMIT %(limit)s
+"""
+
+TOP_SQL = f"""
+SELECT
+    p.nom_pays,
+    p.continent,
+    MAX(COALESCE(s.cas_totaux, 0))   AS max_cas,
+    MAX(COALESCE(s.deces_totaux, 0)) AS max_deces
+FROM statistique s
+JOIN pays p ON s.id_pays = p.id_pays
+WHERE s.id_maladie = {_ID_MALADIE}
+GROUP BY p.nom_pays, p.continent
+ORDER BY max_cas DESC
+LIMIT %(limit)s
+"""
+
+# Dernière date et fenêtre récente : index (id_maladie, date_stat) incluant les colonnes
+RECENT_SQL = f"""
+SELECT
+    s.date_stat,
+    p.nom_pays,
+    p.continent,
+    s.cas_totaux,
+    s.nouveaux_cas,
+    s.deces_totaux
+FROM statistique s
+JOIN pays p ON s.id_pays = p.id_pays
+WHERE s.id_maladie = {_ID_MALADIE}
+  AND s.date_stat >= (
+      SELECT MAX(s2.date_stat) - make_interval(days => %(jours)s)
+      FROM statistique s2
+      WHERE s2.id_maladie = {_ID_MALADIE}
+  )
+ORDER BY s.date_stat DESC, s.cas_totaux DESC
+LIMIT 100
+"""
+
+# Dernière date de chaque pays par fenêtre sur la clé primaire (lue dans l'ordre id_pays,
+# index-only) au lieu d'une sous-requête corrélée MAX(date_stat) par ligne
+CONTINENTS_SQL = f"""
+WITH s AS (
+    SELECT id_pays, date_stat, cas_totaux,
+           MAX(date_stat) OVER (PARTITION BY id_pays) AS derniere_date
+    FROM statistique
+    WHERE id_maladie = {_ID_MALADIE}
+)
+SELECT
+    p.continent,
+    COUNT(DISTINCT p.nom_pays) as nb_pays,
+    SUM(p.population)          as population_totale,
+    MAX(COALESCE(s.cas_totaux,0)) as max_cas_pays,
+    SUM(
+        CASE WHEN s.date_stat = s.derniere_date THEN COALESCE(s.cas_totaux,0) ELSE 0 END
+    ) as cas_totaux_continent
+FROM s
+JOIN pays p ON s.id_pays = p.id_pays
+WHERE p.continent IS NOT NULL
+GROUP BY p.continent
+ORDER BY cas_totaux_continent DESC
+"""
+
+# Plan attendu par requête (vérifié par db_schema.check_plans) :
+#   index      : index (nom sur la table partitionnée) qui doit apparaître dans le plan
+#   index_only : ce parcours doit être un Index Only Scan
+#   partitions : nombre maximal de partitions de statistique lues (élagage)
+PLAN_CHECKS = {
+    "stats":      {"sql": STATS_SQL, "params": {}},
+    "pays":       {"sql": PAYS_SQL, "params": {"maladie"}, "index": "statistique_pkey", "partitions": 1},
+    "evolution":  {"sql": EVOLUTION_SQL, "params": {"maladie", "pays", "limit"},
+                   "index": "statistique_pkey", "index_only": True, "partitions": 1},
+    "top":        {"sql": TOP_SQL, "params": {"maladie", "limit"}, "partitions": 1},
+    "recent":     {"sql": RECENT_SQL, "params": {"maladie", "jours"},
+                   "index": "statistique_recent_idx", "index_only": True, "partitions": 1},
+    "continents": {"sql": CONTINENTS_SQL, "params": {"maladie"},
+                   "index": "statistique_pkey", "index_only": True, "partitions": 1},
+}
@@ -0,0 +1,187 @@
+# app/api_client.py
+# Accès à l'API pour le dashboard : une session HTTP partagée (keep-alive, pool de
+# connexions) gardée entre les reruns Streamlit, un cache TTL unique pour tous les GET
+# (dataviz et ML), des appels indépendants lancés en parallèle et un état de santé de
+# l'API rafraîchi en tâche de fond (plus de ping bloquant à chaque rerun).
+# Chaque entrée du cache porte la version des données (en-tête X-Data-Version) ; un
+# thread suit le flux SSE /data_version/stream et, dès que l'ETL publie une nouvelle
+# version, les entrées plus anciennes ne sont plus servies. Tant que ce flux est
+# connecté, le TTL est long (API_CACHE_TTL_LIVE_S) ; sinon on retombe sur API_CACHE_TTL_S.
+# Une entrée périmée est revalidée par If-None-Match : si rien n'a changé côté API, la
+# réponse est un 304 sans corps et le JSON (et le DataFrame parsé) sont réutilisés.
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+API_CACHE_TTL_S = float(os.getenv("API_CACHE_TTL_S", "300"))
+API_CACHE_TTL_LIVE_S = float(os.getenv("API_CACHE_TTL_LIVE_S", "3600"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "8"))
+API_HEALTH_INTERVAL_S = float(os.getenv("API_HEALTH_INTERVAL_S", "10"))
+
+
+class ApiError(Exception):
+    """Réponse non exploitable : API injoignable (status None) ou code HTTP d'erreur."""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiClient:
+    def __init__(self, base_url: str = API_BASE_URL, ttl_s: float = API_CACHE_TTL_S,
+                 pool_size: int = API_POOL_SIZE, health_interval_s: float = API_HEALTH_INTERVAL_S,
+                 max_entries: int = 512, live_ttl_s: float = API_CACHE_TTL_LIVE_S):
+        self.base_url = base_url.rstrip("/")
+        self.ttl_s = ttl_s
+        self.live_ttl_s = live_ttl_s
+        self.max_entries = max_entries
+        self.session = requests.Session()
+        # relances courtes sur erreurs de connexion / 502-504 (GET idempotents)
+        retry = Retry(total=2, connect=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                      allowed_methods=("GET",), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api")
+        self._cache = OrderedDict()  # {clé: (expiration, version, valeur)} — les erreurs ne sont pas gardées
+        self._lock = threading.Lock()
+        self._health_interval_s = health_interval_s
+        self._healthy = None
+        self._health_ready = threading.Event()
+        self._health_thread = None
+        self.data_version = None  # dernière version des données vue (en-tête ou flux SSE)
+        self._stream_live = False
+
+    # --- GET avec cache (TTL + version des données) et revalidation (ETag) ---
+    def _cached(self, key, load):
+        """(valeur, version). `load(ancienne)` reçoit l'entrée périmée (ou None) pour
+        revalider plutôt que retélécharger, et renvoie (valeur, version des données)."""
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] > now and hit[1] == self.data_version:
+                self._cache.move_to_end(key)
+                return hit[2], hit[1]
+        value, version = load(hit[2] if hit is not None else None)
+        with self._lock:
+            ttl = self.live_ttl_s if self._stream_live else self.ttl_s
+            self._cache[key] = (now + ttl, version, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return value, version
+
+    def _observe_version(self, version):
+        """Nouvelle version des données : les entrées plus anciennes ne sont plus servies
+        telles quelles (elles restent en cache pour la revalidation)."""
+        if version is not None and version != self.data_version:
+            self.data_version = version
+
+    def _get(self, endpoint: str, timeout: float, stale=None):
+        """(json, etag), version. Avec une entrée périmée, GET conditionnel : un 304 ne
+        transporte que des en-têtes et le JSON déjà reçu est réutilisé."""
+        headers = {"If-None-Match": stale[1]} if stale is not None and stale[1] else {}
+        if self.data_version is not None:
+            # clé du micro-cache de la passerelle : une nouvelle version n'y lit rien d'ancien
+            headers["X-Data-Version"] = self.data_version
+        try:
+            r = self.session.get(f"{self.base_url}{endpoint}", timeout=timeout, headers=headers)
+        except requests.exceptions.RequestException as e:
+            raise ApiError(f"API non disponible ({e.__class__.__name__})") from e
+        if r.status_code == 304 and "If-None-Match" in headers:
+            value = stale
+        elif r.status_code == 200:
+            value = (r.json(), r.headers.get("ETag"))
+        else:
+            raise ApiError(f"Erreur API: {endpoint} (code {r.status_code})", r.status_code)
+        version = r.headers.get("X-Data-Version")
+        self._observe_version(version)
+        return value, version
+
+    def fetch(self, endpoint: str, timeout: float = 10) -> dict:
+        """JSON d'un endpoint (ex. "/pays/covid_19"), servi du cache s'il est frais."""
+        return self._cached(endpoint, lambda stale: self._get(endpoint, timeout, stale))[0][0]
+
+    def fetch_frame(self, endpoint: str, parse, timeout: float = 10):
+        """Résultat de `parse(json)` (typiquement un DataFrame trié, dates converties), gardé
+        dans le même cache : un rerun ne reparse pas le JSON. Le résultat est partagé entre
+        les reruns et les sessions : ne pas le modifier en place."""
+        def load(stale):
+            (payload, _), version = self._cached(endpoint, lambda old: self._get(endpoint, timeout, old))
+            if stale is not None and stale[0] is payload:  # JSON revalidé (304) : rien à reparser
+                return stale, version
+            return (payload, parse(payload)), version
+        return self._cached((endpoint, parse.__qualname__), load)[0][1]
+
+    def fetch_many(self, endpoints, timeout: float = 10) -> list:
+        """Plusieurs endpoints indépendants en parallèle ; un résultat (JSON ou ApiError)
+        par endpoint, dans l'ordre."""
+        def one(ep):
+            try:
+                return self.fetch(ep, timeout)
+            except ApiError as e:
+                return e
+        return list(self._pool.map(one, endpoints))
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    # --- Santé de l'API (thread de fond) ---
+    def _ping(self) -> bool:
+        try:
+            # hors session : pas de relances, un ping doit échouer vite
+            return requests.get(f"{self.base_url}/", timeout=2).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def _health_loop(self):
+        while True:
+            self._healthy = self._ping()
+            self._health_ready.set()
+            time.sleep(self._health_interval_s)
+
+    # --- Version des données poussée par l'API (SSE) ---
+    def _version_loop(self):
+        while True:
+            try:
+                # lecture bornée : l'API envoie un keepalive toutes les ~15 s
+                with requests.get(f"{self.base_url}/data_version/stream", stream=True,
+                                  timeout=(3, 60)) as r:
+                    if r.status_code == 200:
+                        for line in r.iter_lines(decode_unicode=True):
+                            if line and line.startswith("data:"):
+                                self._observe_version(line[5:].strip())
+                                self._stream_live = True  # invalidation active : TTL long
+            except requests.exceptions.RequestException:
+                pass
+            # flux coupé : TTL court jusqu'à la reconnexion (qui relit la version courante)
+            self._stream_live = False
+            time.sleep(self._health_interval_s)
+
+    def is_up(self, wait_s: float = 3) -> bool:
+        """Dernier état connu de l'API ; au tout premier appel, attend au plus `wait_s`
+        le premier ping. Démarre aussi le suivi des versions de données."""
+        if self._health_thread is None:
+            with self._lock:
+                if self._health_thread is None:
+                    self._health_thread = threading.Thread(target=self._health_loop, name="api-health",
+                                                           daemon=True)
+                    self._health_thread.start()
+                    threading.Thread(target=self._version_loop, name="api-data-version", daemon=True).start()
+        self._health_ready.wait(wait_s)
+        return bool(self._healthy)
+
+
+@st.cache_resource
+def get_client() -> ApiClient:
+    """Client partagé par toutes les sessions et tous les reruns du serveur Streamlit."""
+    return ApiClient()
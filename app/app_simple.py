@@ -2,9 +2,14 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import requests
 from pathlib import Path
 import json
+import sys
+
+# module voisin (streamlit run ajoute déjà ce dossier au PYTHONPATH, pas tous les lanceurs)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from api_client import ApiError, get_client
+from charts import line_chart
 
 # =========================
 # Config Streamlit & API
@@ -66,30 +71,57 @@ def save_users(users: dict) -> None:
 USERS = load_users()
 
 # =========================
-# Fonctions API (GET) — inchangé
+# Fonctions API (GET) — session partagée + cache TTL (app/api_client.py)
 # =========================
-@st.cache_data(ttl=300)
-def get_api_data(endpoint: str):
-    try:
-        r = requests.get(f"{API_BASE_URL}{endpoint}", timeout=10)
-        if r.status_code == 200:
-            return r.json()
-        else:
-            st.error(f"❌ Erreur API: {endpoint} (code {r.status_code})")
-            return None
-    except requests.exceptions.ConnectionError:
+API = get_client()
+
+def _show_api_error(e: ApiError):
+    if e.status is None:
         st.error("❌ API non disponible. Lancez : uvicorn api.api_pandemies:app --reload")
+    else:
+        st.error(f"❌ {e}")
+
+def get_api_data(endpoint: str, timeout: float = 10):
+    try:
+        return API.fetch(endpoint, timeout)
+    except ApiError as e:
+        _show_api_error(e)
         return None
-    except Exception as e:
-        st.error(f"❌ Erreur: {e}")
-        return None
+
+def get_api_data_many(*endpoints):
+    """Endpoints indépendants récupérés en parallèle (None pour ceux en erreur)."""
+    out = []
+    for res in API.fetch_many(endpoints):
+        if isinstance(res, ApiError):
+            _show_api_error(res)
+            res = None
+        out.append(res)
+    return out
 
 def test_api() -> bool:
+    return API.is_up()
+
+# --- DataFrames parsés une fois puis réutilisés d'un rerun à l'autre (cache du client) ---
+def _evolution_df(payload: dict) -> pd.DataFrame:
+    df = pd.DataFrame(payload.get("donnees", []))
+    if not df.empty:
+        df["date_stat"] = pd.to_datetime(df["date_stat"])
+        df = df.sort_values("date_stat").reset_index(drop=True)
+    return df
+
+def _series_df(payload: dict) -> pd.DataFrame:
+    df = pd.DataFrame(payload.get("points", []))
+    if not df.empty:
+        df["date"] = pd.to_datetime(df["date"])
+        df[["taux_true", "taux_pred"]] = df[["taux_true", "taux_pred"]].astype(float)
+    return df
+
+def get_frame(endpoint: str, parse, timeout: float = 10):
     try:
-        r = requests.get(f"{API_BASE_URL}/", timeout=5)
-        return r.status_code == 200
-    except:
-        return False
+        return API.fetch_frame(endpoint, parse, timeout)
+    except ApiError as e:
+        _show_api_error(e)
+        return None
 
 # =========================
 # Pages (rangées en petites fonctions)
@@ -104,18 +136,15 @@ def page_vue_par_pays(maladie: str):
     pays_choisi = st.selectbox("🌍 Choisir un pays", pays_list)
     if not pays_choisi:
         return
-    evo = get_api_data(f"/evolution/{maladie}/{pays_choisi}?limit=5000")
-    if not (evo and "donnees" in evo):
+    df = get_frame(f"/evolution/{maladie}/{pays_choisi}?limit=5000", _evolution_df)
+    if df is None:
         st.error(f"❌ Erreur données pour {pays_choisi}")
         return
-    df = pd.DataFrame(evo["donnees"])
     if df.empty:
         st.warning(f"⚠️ Aucune donnée pour {pays_choisi}")
         return
-    df["date_stat"] = pd.to_datetime(df["date_stat"])
-    df = df.sort_values("date_stat")
     st.subheader(f"📈 Cas totaux - {pays_choisi}")
-    fig = px.line(df, x="date_stat", y="cas_totaux", title=f"Cas totaux cumulés - {pays_choisi}")
+    fig = line_chart(df, x="date_stat", y="cas_totaux", title=f"Cas totaux cumulés - {pays_choisi}")
     st.plotly_chart(fig, use_container_width=True)
     st.subheader("📊 Nouveaux cas quotidiens (30 derniers jours)")
     fig2 = px.bar(df.tail(30), x="date_stat", y="nouveaux_cas")
@@ -142,18 +171,18 @@ def page_comparaison(maladie: str):
     if not (pays1 and pays2 and pays1 != pays2):
         st.info("👆 Sélectionnez deux pays différents")
         return
-    evo1 = get_api_data(f"/evolution/{maladie}/{pays1}?limit=5000")
-    evo2 = get_api_data(f"/evolution/{maladie}/{pays2}?limit=5000")
-    if not (evo1 and evo2 and "donnees" in evo1 and "donnees" in evo2):
+    # les deux séries en parallèle (JSON), puis parsées une seule fois (cache)
+    get_api_data_many(f"/evolution/{maladie}/{pays1}?limit=5000", f"/evolution/{maladie}/{pays2}?limit=5000")
+    df1 = get_frame(f"/evolution/{maladie}/{pays1}?limit=5000", _evolution_df)
+    df2 = get_frame(f"/evolution/{maladie}/{pays2}?limit=5000", _evolution_df)
+    if df1 is None or df2 is None:
         st.error("❌ Erreur récupération données")
         return
-    df1 = pd.DataFrame(evo1["donnees"]); df1["date_stat"] = pd.to_datetime(df1["date_stat"]); df1["pays"] = pays1
-    df2 = pd.DataFrame(evo2["donnees"]); df2["date_stat"] = pd.to_datetime(df2["date_stat"]); df2["pays"] = pays2
-    dfc = pd.concat([df1, df2])
+    dfc = pd.concat([df1.assign(pays=pays1), df2.assign(pays=pays2)])
     if dfc.empty:
         return
     typ = st.selectbox("📈 Type de données", ["cas_totaux", "nouveaux_cas", "deces_totaux", "nouveaux_deces"])
-    figc = px.line(dfc, x="date_stat", y=typ, color="pays")
+    figc = line_chart(dfc, x="date_stat", y=typ, color="pays")
     st.plotly_chart(figc, use_container_width=True)
 
 # def page_comparaison(maladie: str):
@@ -193,12 +222,10 @@ def page_taux_transmission():
         return
 
     st.header("📉 Taux de transmission (observé vs prédit)")
-    # 1) pays disponibles côté API ML
+    # 1) pays disponibles côté API ML (même cache que les autres pages)
     try:
-        resp = requests.get(f"{API_BASE_URL}/ml/available_countries", timeout=10)
-        resp.raise_for_status()
-        countries = resp.json().get("countries", [])
-    except Exception as e:
+        countries = API.fetch("/ml/available_countries").get("countries", [])
+    except ApiError as e:
         st.error(f"Impossible de charger la liste des pays: {e}")
         return
     pays_choisi = st.selectbox("🌍 Choisir un pays", options=countries)
@@ -206,20 +233,16 @@ def page_taux_transmission():
         return
     # 2) série Observé/Prédit
     try:
-        r = requests.get(f"{API_BASE_URL}/ml/predict_series/{pays_choisi}", timeout=15)
-        r.raise_for_status()
-        payload = r.json()
-    except Exception as e:
+        df = API.fetch_frame(f"/ml/predict_series/{pays_choisi}", _series_df, timeout=15)
+    except ApiError as e:
         st.error(f"Erreur API ML: {e}")
         return
-    pts = payload.get("points", [])
-    if not pts:
+    if df.empty:
         st.warning(f"Aucune donnée renvoyée pour {pays_choisi}")
         return
-    df = pd.DataFrame(pts); df["date"] = pd.to_datetime(df["date"])
-    plot_df = df.melt(id_vars=["date"], value_vars=["taux_true","taux_pred"], var_name="type", value_name="taux")
-    plot_df["type"] = plot_df["type"].map({"taux_true": "Observé", "taux_pred": "Prédit"})
-    fig = px.line(plot_df, x="date", y="taux", color="type", labels={"date":"Date","taux":"Taux de transmission"})
+    fig = line_chart(df, x="date", y=["taux_true", "taux_pred"],
+                     labels={"date": "Date", "value": "Taux de transmission",
+                             "taux_true": "Observé", "taux_pred": "Prédit"})
     st.plotly_chart(fig, use_container_width=True)
     if df["taux_true"].notna().any():
         d2 = df.dropna(subset=["taux_true"])
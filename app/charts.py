@@ -0,0 +1,74 @@
+# app/charts.py
+# Rendu des graphiques du dashboard : chaque graphique a un budget de points
+# (CHART_POINT_BUDGET, réparti entre ses courbes) ; les séries plus longues sont
+# sous-échantillonnées par LTTB (Largest-Triangle-Three-Buckets, qui garde pics et
+# creux) et, au-delà de CHART_WEBGL_POINTS points affichés, les courbes passent en
+# WebGL (Scattergl) au lieu du SVG.
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+CHART_POINT_BUDGET = int(os.getenv("CHART_POINT_BUDGET", "2000"))
+CHART_WEBGL_POINTS = int(os.getenv("CHART_WEBGL_POINTS", "1000"))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices des points gardés par LTTB (premier et dernier toujours inclus).
+
+    x doit être croissant (dates en ns ou nombres) ; les NaN de y ne sont jamais choisis
+    quand un autre point du seau est disponible.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 seaux entre les extrémités
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # sommet C du triangle : moyenne du seau suivant (le dernier point pour le dernier seau)
+        nxt = slice(hi, edges[i + 2] if i + 2 < len(edges) else n)
+        finite = y[nxt][np.isfinite(y[nxt])]
+        cx, cy = x[nxt].mean(), finite.mean() if len(finite) else y[a]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        out[i + 1] = a
+    return out
+
+
+def downsample(df: pd.DataFrame, x: str, ys, budget: int) -> pd.DataFrame:
+    """Au plus `budget` lignes ; les points gardés suivent la forme de la première série de `ys`."""
+    if len(df) <= budget:
+        return df
+    xs = df[x]
+    xv = xs.to_numpy(dtype="datetime64[ns]").astype("int64") if pd.api.types.is_datetime64_any_dtype(xs) else xs
+    keep = lttb_indices(np.asarray(xv), df[ys[0]].to_numpy(dtype=float), budget)
+    return df.iloc[keep]
+
+
+def line_chart(df: pd.DataFrame, x: str, y, color: str = None, title: str = None, labels: dict = None,
+               budget: int = CHART_POINT_BUDGET) -> go.Figure:
+    """Courbes (une par valeur de `color`, ou une par colonne si `y` est une liste)."""
+    labels = labels or {}
+    if color is not None:
+        traces = [(str(k), g, y) for k, g in df.groupby(color, sort=False)]
+    elif isinstance(y, (list, tuple)):
+        traces = [(labels.get(c, c), df, c) for c in y]
+    else:
+        traces = [(labels.get(y, y), df, y)]
+
+    per_trace = max(3, budget // len(traces)) if traces else budget
+    parts = [(name, downsample(g.sort_values(x), x, [col], per_trace), col) for name, g, col in traces]
+    shown = sum(len(p) for _, p, _ in parts)
+    scatter = go.Scattergl if shown > CHART_WEBGL_POINTS else go.Scatter
+
+    fig = go.Figure([scatter(x=p[x], y=p[col], mode="lines", name=name) for name, p, col in parts])
+    y_title = labels.get(y, y) if isinstance(y, str) and color is not None else labels.get("value", "")
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=y_title,
+                      showlegend=len(parts) > 1, legend_title_text=labels.get(color, color) if color else None)
+    return fig
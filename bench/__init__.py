@@ -0,0 +1 @@
+# bench/ : scripts de mesure de performance (hors tests)
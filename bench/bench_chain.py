@@ -0,0 +1,169 @@
+# bench/bench_chain.py
+# Chaîne complète sur données synthétiques (bench/synthetic_data.py), chronométrée :
+# génération → ETL → pipeline ML par maladie (collecte, features, entraînement,
+# prédiction) → API servie par uvicorn (démarrage, 1re requête, latences à chaud).
+# Tout est isolé : schéma PostgreSQL jetable (PGOPTIONS), CSV bruts et artefacts dans un
+# dossier temporaire. Nécessite la base locale (variables PG*).
+#   python -m bench.bench_chain --regions 100 --jours 400
+#   python -m bench.bench_chain --regions 2300 --jours 1000 --train-budget 120 --report chain.json
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import requests
+
+from db_config import get_connexion
+from prediction.perf import latency_summary
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _timed(steps: list, name: str, fn):
+    print(f"\n⏱️ {name}")
+    t0 = time.perf_counter()
+    out = fn()
+    steps.append({"etape": name, "secondes": round(time.perf_counter() - t0, 3)})
+    return out
+
+
+def _serve(env: dict, maladies, pays: str, n_requests: int) -> dict:
+    """Démarre l'API, mesure le démarrage, la 1re prédiction (chargement du modèle) et
+    les latences à chaud des endpoints ML et /evolution."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.api_pandemies:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env={**env, "PYTHONPATH": str(ROOT)})
+    try:
+        for _ in range(240):
+            try:
+                if requests.get(f"{base}/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            time.sleep(0.25)
+        else:
+            raise RuntimeError("l'API n'a pas démarré")
+        out = {"demarrage_s": round(time.perf_counter() - t0, 3)}
+        urls = {f"evolution/{m}": f"{base}/evolution/{m}/{pays}?limit=5000" for m in maladies}
+        urls.update({f"predict_series/{m}": f"{base}/ml/{m}/predict_series/{pays}" for m in maladies})
+        for name, url in urls.items():
+            t = time.perf_counter()
+            r = requests.get(url, timeout=600)
+            first = (time.perf_counter() - t) * 1e3
+            if r.status_code != 200:
+                out[name] = {"statut": r.status_code}
+                continue
+            samples = []
+            for _ in range(n_requests):
+                t = time.perf_counter()
+                requests.get(url, timeout=600)
+                samples.append((time.perf_counter() - t) * 1e3)
+            out[name] = {"premiere_ms": round(first, 2), "octets": len(r.content),
+                         **{k: round(v, 2) for k, v in latency_summary(samples).items()}}
+        return out
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--regions", type=int, default=100)
+    ap.add_argument("--jours", type=int, default=400)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--maladies", default="covid_19,monkeypox")
+    ap.add_argument("--train-budget", type=float, default=60, help="TRAIN_BUDGET_S par maladie")
+    ap.add_argument("--requetes", type=int, default=20, help="requêtes à chaud par endpoint")
+    ap.add_argument("--report", type=Path, help="bilan JSON")
+    ap.add_argument("--keep", action="store_true", help="garde le schéma et le dossier de travail")
+    args = ap.parse_args()
+    maladies = [m for m in args.maladies.split(",") if m]
+
+    work = Path(tempfile.mkdtemp(prefix="chain_"))
+    schema = f"chain_{uuid.uuid4().hex[:8]}"
+    admin = get_connexion()
+    with admin.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+    admin.commit()
+    # avant tout import de data_cleaner / prediction.config : lus à l'import
+    env = {
+        "PGOPTIONS": f"-c search_path={schema}",
+        "DATA_DIR": str(work / "raw"),
+        "ARTIFACTS_DIR": str(work / "artifacts"),
+        "CLEAN_DATA_CSV": str(work / "clean_data.csv"),
+        "FEATURES_CSV": str(work / "features_data.csv"),
+        "PREDICTIONS_CSV": str(work / "predictions_resultats_rf.csv"),
+        "TRAIN_BUDGET_S": str(args.train_budget),
+        "MALADIE_CIBLE": maladies[0],
+    }
+    os.environ.update(env)
+    from bench.synthetic_data import generate, regions
+    from data_cleaner import nettoyer_nom_pays
+
+    steps, report = [], {"regions": args.regions, "jours": args.jours, "maladies": maladies}
+    try:
+        rows = _timed(steps, "génération", lambda: generate(work / "raw", args.regions, args.jours,
+                                                                args.seed, maladies))
+        report["lignes_brutes"] = rows
+
+        import etl_main
+        if not _timed(steps, "etl", etl_main.etl_complet):
+            raise RuntimeError("ETL en échec")
+
+        from prediction.pipeline import print_summary, run_many
+        pipeline = _timed(steps, "pipeline", lambda: run_many(maladies, jobs=1))
+        print_summary(pipeline)
+        report["pipeline"] = pipeline
+        if any(r["statut"] == "échec" for r in pipeline):
+            raise RuntimeError("pipeline en échec")
+
+        pays = nettoyer_nom_pays(regions(args.regions, args.seed)["country"].iloc[0])
+        report["api"] = _timed(steps, "api", lambda: _serve(dict(os.environ), maladies, pays, args.requetes))
+    finally:
+        report["etapes"] = steps
+        if not args.keep:
+            with admin.cursor() as cur:
+                cur.execute(f"DROP SCHEMA {schema} CASCADE")
+            admin.commit()
+            shutil.rmtree(work, ignore_errors=True)
+        else:
+            print(f"📁 Conservés : schéma {schema}, dossier {work}")
+        admin.close()
+
+    print(f"\n{'étape':12s} {'durée':>9s}")
+    for s in steps:
+        print(f"{s['etape']:12s} {s['secondes']:8.1f}s")
+    for r in report.get("pipeline", []):
+        print(f"  {r['maladie']:12s} {r['etape']:9s} {r['execution_s']:8.1f}s")
+    print(f"API : démarrage {report['api']['demarrage_s']:.1f}s")
+    for name, r in report["api"].items():
+        if isinstance(r, dict):
+            print(f"  {name:24s} " + (f"1re {r['premiere_ms']:8.1f} ms | p50 {r['p50_ms']:7.1f} ms | "
+                                      f"p99 {r['p99_ms']:7.1f} ms | {r['octets'] / 1e3:.0f} Ko"
+                                      if "p50_ms" in r else f"HTTP {r['statut']}"))
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# bench/bench_collect.py
+# Collecte historique (fetchall + RealDictCursor → DataFrame) vs COPY TO STDOUT en flux :
+# temps total et pic de RSS, chaque mode dans un process neuf.
+# Nécessite la base (variables PG*).
+#   python -m bench.bench_collect --maladie covid_19
+import argparse
+import importlib
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from prediction.perf import peak_rss_mb, rss_mb
+
+
+def _measure(mode: str, maladie: str, out_csv: str, q):
+    os.environ["CLEAN_DATA_CSV"] = out_csv  # lu à l'import de prediction.config
+    os.environ["EXPORT_CSV"] = "1"  # les deux modes écrivent dataset + CSV
+    collecte = importlib.import_module("prediction.1_collecte")
+    rss0 = rss_mb()
+    t0 = time.perf_counter()
+    try:
+        if mode == "copy":
+            collecte.run_collect_stream(maladie)
+        else:
+            collecte.run_collect(maladie)
+    except Exception as e:
+        q.put({"mode": mode, "erreur": str(e)})
+        return
+    q.put({
+        "mode": mode,
+        "wall_s": time.perf_counter() - t0,
+        "rss_base_mb": rss0,
+        "peak_rss_mb": peak_rss_mb(),
+        "csv_mb": Path(out_csv).stat().st_size / 1e6,
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--maladie", default=os.getenv("MALADIE_CIBLE", "covid_19"))
+    ap.add_argument("--modes", default="fetchall,copy")
+    args = ap.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes.split(","):
+            q = ctx.Queue()
+            p = ctx.Process(target=_measure, args=(mode, args.maladie, str(Path(tmp) / f"{mode}.csv"), q))
+            p.start()
+            r = q.get()
+            p.join()
+            if "erreur" in r:
+                print(f"{mode:8s} échec : {r['erreur']}")
+                continue
+            print(f"{mode:8s} {r['wall_s']:7.2f} s | pic RSS {r['peak_rss_mb']:7.1f} Mo "
+                  f"(base {r['rss_base_mb']:.1f} Mo) | CSV {r['csv_mb']:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
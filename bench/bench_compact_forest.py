@@ -0,0 +1,90 @@
+# bench/bench_compact_forest.py
+# Compare le .pkl RandomForest et la forêt compacte : temps de chargement, RSS,
+# latence ligne seule et batch.
+#   python -m bench.bench_compact_forest --trees 600 --rows 40000
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import dump, load
+from sklearn.ensemble import RandomForestRegressor
+
+from prediction.compact_forest import load_compact_forest, save_compact_forest
+from prediction.perf import latency_summary, rss_mb, time_calls
+
+
+def _dir_size_mb(p: Path) -> float:
+    files = [p] if p.is_file() else list(p.rglob("*"))
+    return sum(f.stat().st_size for f in files if f.is_file()) / 1e6
+
+
+def _measure(kind: str, path: str, X: np.ndarray, batch: int, q):
+    """Exécuté dans un process neuf pour isoler le RSS de chaque format."""
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    rss0 = rss_mb()
+    t0 = time.perf_counter()
+    model = load(path) if kind == "pickle" else load_compact_forest(path)
+    load_s = time.perf_counter() - t0
+    if kind == "pickle":
+        model.set_params(n_jobs=1)  # comme dans un worker uvicorn
+    Xb = X[:batch]
+    one = time_calls(lambda: model.predict(X[:1]), n=50)
+    many = time_calls(lambda: model.predict(Xb), n=5, warmup=1)
+    q.put({
+        "format": kind,
+        "load_s": load_s,
+        "rss_delta_mb": rss_mb() - rss0,
+        "single_row": latency_summary(one),
+        f"batch_{batch}": latency_summary(many),
+        "pred": model.predict(Xb[:200]),
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trees", type=int, default=600)
+    ap.add_argument("--max-depth", type=int, default=None)
+    ap.add_argument("--rows", type=int, default=40_000)
+    ap.add_argument("--batch", type=int, default=1000)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    cols = [f"f{i}" for i in range(6)]
+    X = pd.DataFrame(rng.lognormal(size=(args.rows, 6)), columns=cols)
+    y = np.log1p(X["f1"]) * 1e-4 + rng.normal(scale=1e-5, size=args.rows)
+    print(f"Entraînement RF {args.trees} arbres, max_depth={args.max_depth}, {args.rows} lignes...")
+    rf = RandomForestRegressor(n_estimators=args.trees, max_depth=args.max_depth,
+                               max_features="sqrt", random_state=0, n_jobs=-1).fit(X, y)
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        pkl, forest = Path(tmp) / "m.pkl", Path(tmp) / "m.forest"
+        dump(rf, pkl)
+        save_compact_forest(rf, forest, source=pkl)
+        print(f"Taille disque: pickle {_dir_size_mb(pkl):.1f} Mo | compact {_dir_size_mb(forest):.1f} Mo")
+
+        X_np = X.to_numpy()
+        results = []
+        for kind, path in (("pickle", pkl), ("compact", forest)):
+            q = ctx.Queue()
+            p = ctx.Process(target=_measure, args=(kind, str(path), X_np, args.batch, q))
+            p.start()
+            results.append(q.get())
+            p.join()
+
+    np.testing.assert_allclose(results[0]["pred"], results[1]["pred"], rtol=1e-12)
+    print("Prédictions identiques (rtol 1e-12)")
+    for r in results:
+        b = r[f"batch_{args.batch}"]
+        print(f"{r['format']:8s} load {r['load_s']*1e3:8.1f} ms | RSS +{r['rss_delta_mb']:7.1f} Mo | "
+              f"1 ligne p50 {r['single_row']['p50_ms']:7.2f} ms p99 {r['single_row']['p99_ms']:7.2f} ms | "
+              f"batch {args.batch} p50 {b['p50_ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# bench/bench_feature_kernel.py
+# Noyau vectorisé vs implémentation groupby (une passe shift/rolling par feature),
+# sur les features de config.FEATURE_SPECS puis sur un jeu étendu de fenêtres.
+#   python -m bench.bench_feature_kernel --pays 1000 --jours 1000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from prediction.config import FEATURE_SPECS, TARGET_COL
+from prediction.feature_kernel import compute_feature_kernel
+
+EXTENDED_SPECS = FEATURE_SPECS + [
+    (f"{col}_{op}_{k}", op, col, k)
+    for col in ("nouveaux_cas", TARGET_COL)
+    for op, ks in (("lag", (7, 14)), ("mean", (14, 28)), ("sum", (7,)), ("growth", (7,)))
+    for k in ks
+]
+
+
+def groupby_features(df: pd.DataFrame, specs) -> dict:
+    """Référence : l'approche historique de 2_features_engineering (groupby par feature)."""
+    grp = df.groupby("nom_pays", group_keys=False)
+    out = {}
+    for name, op, col, k in specs:
+        if op == "lag":
+            out[name] = grp[col].shift(k)
+        elif op in ("mean", "sum"):
+            r = grp[col].rolling(k, min_periods=k)
+            out[name] = getattr(r, op)().reset_index(level=0, drop=True)
+        else:
+            out[name] = df[col] / grp[col].shift(k)
+    return out
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pays", type=int, default=230)
+    ap.add_argument("--jours", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.pays * args.jours
+    df = pd.DataFrame({
+        "nom_pays": np.repeat([f"pays_{i:04d}" for i in range(args.pays)], args.jours),
+        "nouveaux_cas": rng.poisson(200, n).astype(float),
+    })
+    df[TARGET_COL] = df["nouveaux_cas"] / 1e6
+    print(f"{n:,} lignes ({args.pays} pays x {args.jours} jours)")
+
+    for label, specs in (("config", FEATURE_SPECS), ("étendu", EXTENDED_SPECS)):
+        t_gb = _best_of(lambda: groupby_features(df, specs), args.repeat)
+        t_k = _best_of(lambda: compute_feature_kernel(df, specs), args.repeat)
+        ref, got = groupby_features(df, specs), compute_feature_kernel(df, specs)
+        err = max(np.nanmax(np.abs(got[k] - ref[k].to_numpy()) / np.maximum(np.abs(ref[k].to_numpy()), 1e-12))
+                  for k in ref)
+        print(f"{label:7s} {len(specs):2d} features | groupby {t_gb*1e3:8.1f} ms | noyau {t_k*1e3:7.1f} ms "
+              f"| x{t_gb / t_k:5.1f} | écart relatif max {err:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# bench/bench_inference.py
+# Appels concurrents à predict (comme les threads Starlette de /ml/predict_series) :
+# appel direct vs exécuteur à micro-batching (api/inference.py).
+#   python -m bench.bench_inference --clients 32 --rows 400 --trees 300
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from api.inference import BatchingExecutor
+from prediction.compact_forest import load_compact_forest, save_compact_forest
+from prediction.perf import latency_summary
+
+
+def _run(predict, X: pd.DataFrame, clients: int, requests: int) -> dict:
+    lat = []
+
+    def one(_):
+        t0 = time.perf_counter()
+        predict(X)
+        lat.append((time.perf_counter() - t0) * 1e3)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - t0
+    return {"req_s": requests / wall, **latency_summary(lat)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--rows", type=int, default=400, help="lignes par requête (une série pays)")
+    ap.add_argument("--trees", type=int, default=300)
+    ap.add_argument("--wait-ms", type=float, default=2.0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    cols = [f"f{i}" for i in range(6)]
+    X = pd.DataFrame(rng.lognormal(size=(20_000, 6)), columns=cols)
+    y = np.log1p(X["f1"]) * 1e-4 + rng.normal(scale=1e-5, size=len(X))
+    rf = RandomForestRegressor(n_estimators=args.trees, max_depth=15, random_state=0, n_jobs=-1).fit(X, y)
+    Xq = X.iloc[:args.rows]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = load_compact_forest(save_compact_forest(rf, Path(tmp) / "m.forest"))
+        print(f"{args.clients} clients, {args.requests} requêtes de {args.rows} lignes, {args.trees} arbres")
+        rows = {"direct": _run(model.predict, Xq, args.clients, args.requests)}
+        ex = BatchingExecutor(max_wait_ms=args.wait_ms)
+        rows[f"batching ({args.wait_ms} ms)"] = _run(lambda X: ex.predict(model, X), Xq,
+                                                   args.clients, args.requests)
+        ex.shutdown()
+
+    for name, r in rows.items():
+        print(f"{name:18s} {r['req_s']:8.1f} req/s | p50 {r['p50_ms']:7.1f} ms | p99 {r['p99_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# bench/bench_sql.py
+# Plans et latences des requêtes de l'API (api/queries.py) sur un jeu synthétique à
+# l'échelle, chargé dans un schéma jetable de la base locale (variables PG*) :
+# EXPLAIN (ANALYZE, BUFFERS), p50/p99 et blocs lus, comparés à une référence enregistrée.
+#   python -m bench.bench_sql                    compare à bench/baselines/bench_sql.json
+#   python -m bench.bench_sql --save             (ré)enregistre la référence
+#   python -m bench.bench_sql --pays 2000 --report /tmp/sql.json
+# Code de sortie 1 si régression : plan différent (type de parcours, index), écart au plan
+# attendu (PLAN_CHECKS), ou p50 / blocs au-delà de --tolerance. Les blocs et les plans ne
+# dépendent pas de la machine ; la latence, si : d'où le plancher --min-ms. Ils dépendent
+# en revanche de la version majeure de PostgreSQL, enregistrée avec la référence.
+import argparse
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import db_schema
+from api.queries import PLAN_CHECKS
+from db_config import get_connexion
+from prediction.perf import latency_summary, time_calls
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "bench_sql.json"
+CONTINENTS = ["Africa", "Asia", "Europe", "North America", "South America", "Oceania"]
+
+# Vagues : somme de deux sinusoïdes déphasées par pays et par maladie, cumul par fenêtre.
+# Insertion par date croissante, comme l'ETL (corrélation physique pour le BRIN).
+_LOAD = """
+INSERT INTO pays (nom_pays, continent, population)
+SELECT format('region_%%s', lpad(i::text, 5, '0')), (%(continents)s::text[])[1 + i %% 6],
+       100000 + (i::bigint * 7919) %% 50000000
+FROM generate_series(1, %(pays)s) i;
+
+INSERT INTO statistique (date_stat, id_pays, id_maladie, cas_totaux, nouveaux_cas, deces_totaux, nouveaux_deces)
+SELECT date_stat, id_pays, id_maladie,
+       SUM(nouveaux_cas) OVER w, nouveaux_cas,
+       SUM(nouveaux_cas / 100) OVER w, nouveaux_cas / 100
+FROM (
+    SELECT DATE '2020-01-22' + j AS date_stat, p.id_pays, m.id_maladie,
+           GREATEST(0, round(p.population / 2000.0 / m.id_maladie
+                             * (sin(j / 45.0 + p.id_pays) + 0.6 * sin(j / 130.0 + m.id_maladie) + 0.8)))::bigint
+               AS nouveaux_cas
+    FROM generate_series(0, %(jours)s - 1) j, pays p, maladie m
+) t
+WINDOW w AS (PARTITION BY id_pays, id_maladie ORDER BY date_stat)
+ORDER BY date_stat;
+"""
+
+
+def load_dataset(conn, pays: int, jours: int) -> int:
+    """Schéma du projet (migrations) + données synthétiques ; renvoie le nombre de lignes."""
+    db_schema.migrate(conn)
+    with conn.cursor() as cur:
+        cur.execute(_LOAD, {"pays": pays, "jours": jours, "continents": CONTINENTS})
+        cur.execute("SELECT COUNT(*) FROM statistique")
+        n = cur.fetchone()[0]
+    conn.commit()
+    db_schema.vacuum_analyze(conn)
+    conn.autocommit = False
+    return n
+
+
+def plan_signature(plan, parents) -> list:
+    """Parcours exécutés (type + index ou table) : ce qui change quand un index est perdu."""
+    sig = set()
+    for node in db_schema._walk(plan["Plan"]):
+        if "Scan" not in node["Node Type"] or node.get("Actual Loops", 1) == 0:
+            continue
+        target = node.get("Index Name") or node.get("Relation Name") or ""
+        sig.add(f"{node['Node Type']} {parents.get(target, target)}".strip())
+    return sorted(sig)
+
+
+def measure(conn, params: dict, repeat: int) -> dict:
+    """{requête: latences, blocs, signature de plan, écarts, EXPLAIN texte}."""
+    out = {}
+    with conn.cursor() as cur:
+        parents = db_schema._parent_indexes(cur)
+        by_id, default = db_schema._partitions(cur)
+        partitions = set(by_id.values()) | {default}
+        for name, check in PLAN_CHECKS.items():
+            p = {k: params[k] for k in check["params"]}
+
+            def run():
+                cur.execute(check["sql"], p)
+                cur.fetchall()
+
+            lat = latency_summary(time_calls(run, n=repeat))
+            plan = db_schema.explain(cur, check["sql"], p)
+            root = plan["Plan"]
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + check["sql"], p)
+            out[name] = {
+                **lat,
+                "shared_hit": root.get("Shared Hit Blocks", 0),
+                "shared_read": root.get("Shared Read Blocks", 0),
+                "plan": plan_signature(plan, parents),
+                "issues": db_schema.plan_issues(plan, check, parents, partitions),
+                "explain": "\n".join(r[0] for r in cur.fetchall()),
+            }
+    conn.rollback()
+    return out
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_ms: float) -> list:
+    """Régressions de `current` par rapport à `baseline` (messages lisibles)."""
+    problems = []
+    for name, cur in current.items():
+        problems += [f"{name}: {issue}" for issue in cur["issues"]]
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if cur["plan"] != base["plan"]:
+            lost = sorted(set(base["plan"]) - set(cur["plan"]))
+            new = sorted(set(cur["plan"]) - set(base["plan"]))
+            problems.append(f"{name}: plan modifié (- {', '.join(lost) or '∅'} ; + {', '.join(new) or '∅'})")
+        if cur["p50_ms"] > base["p50_ms"] * (1 + tolerance) and cur["p50_ms"] - base["p50_ms"] > min_ms:
+            problems.append(f"{name}: p50 {base['p50_ms']:.2f} → {cur['p50_ms']:.2f} ms")
+        blocks, base_blocks = cur["shared_hit"] + cur["shared_read"], base["shared_hit"] + base["shared_read"]
+        if blocks > base_blocks * (1 + tolerance) and blocks - base_blocks > 8:
+            problems.append(f"{name}: blocs lus {base_blocks} → {blocks}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pays", type=int, default=200)
+    ap.add_argument("--jours", type=int, default=730)
+    ap.add_argument("--repeat", type=int, default=30)
+    ap.add_argument("--tolerance", type=float, default=0.5, help="hausse relative tolérée (0.5 = +50 %%)")
+    ap.add_argument("--min-ms", type=float, default=1.0, help="écart de p50 ignoré en dessous (ms)")
+    ap.add_argument("--plans-only", action="store_true",
+                    help="ignore la latence (machine différente de la référence, ex. CI)")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="enregistre la mesure comme référence")
+    ap.add_argument("--report", type=Path, help="rapport JSON complet (avec les EXPLAIN)")
+    ap.add_argument("--keep", action="store_true", help="garde le schéma de test")
+    args = ap.parse_args()
+    if args.plans_only:
+        args.min_ms = float("inf")
+
+    schema = f"bench_{uuid.uuid4().hex[:8]}"
+    admin = get_connexion()
+    with admin.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+    admin.commit()
+    conn = get_connexion(options=f"-c search_path={schema}")
+    try:
+        t0 = time.perf_counter()
+        n = load_dataset(conn, args.pays, args.jours)
+        print(f"📦 {n:,} lignes ({args.pays} pays × {args.jours} jours × 2 maladies) "
+              f"chargées en {time.perf_counter() - t0:.1f} s dans {schema}")
+        params = {"maladie": "covid_19", "pays": f"region_{args.pays // 2:05d}", "limit": 5000, "jours": 30}
+        results = measure(conn, params, args.repeat)
+        major = conn.server_version // 10000
+    finally:
+        conn.close()
+        if not args.keep:
+            with admin.cursor() as cur:
+                cur.execute(f"DROP SCHEMA {schema} CASCADE")
+            admin.commit()
+        admin.close()
+
+    for name, r in results.items():
+        print(f"{name:<11} p50 {r['p50_ms']:8.2f} ms | p99 {r['p99_ms']:8.2f} ms | "
+              f"blocs {r['shared_hit']:>6} hit {r['shared_read']:>5} read | {', '.join(r['plan'])}")
+
+    meta = {"pays": args.pays, "jours": args.jours, "lignes": n, "postgres": major}
+    if args.report:
+        args.report.write_text(json.dumps({"meta": meta, "params": params, "queries": results}, indent=2))
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        stored = {k: {f: round(v, 3) if isinstance(v, float) else v for f, v in r.items() if f != "explain"}
+                  for k, r in results.items()}
+        args.baseline.write_text(json.dumps({"meta": meta, "queries": stored}, indent=2) + "\n")
+        print(f"💾 Référence enregistrée : {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print("⚠️ Pas de référence (--save pour en enregistrer une)")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if (baseline["meta"]["pays"], baseline["meta"]["jours"]) != (args.pays, args.jours):
+        print(f"⚠️ Référence mesurée à une autre échelle ({baseline['meta']}) : comparaison impossible")
+        sys.exit(2)
+    if baseline["meta"].get("postgres", major) != major:
+        # planificateur et format des plans changent d'une version majeure à l'autre
+        print(f"⚠️ Référence mesurée sur PostgreSQL {baseline['meta']['postgres']}, serveur en {major} : "
+              f"comparaison impossible (--save pour une nouvelle référence)")
+        sys.exit(2)
+    problems = compare(results, baseline["queries"], args.tolerance, args.min_ms)
+    for p in problems:
+        print(f"❌ {p}")
+    if problems:
+        for name in sorted({p.split(":")[0] for p in problems}):
+            print(f"\n--- EXPLAIN (ANALYZE, BUFFERS) {name}\n{results[name]['explain']}")
+        sys.exit(1)
+    print(f"✅ Aucune régression (tolérance {args.tolerance:.0%}, plancher {args.min_ms} ms)")
+
+
+if __name__ == "__main__":
+    main()
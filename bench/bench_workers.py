@@ -0,0 +1,136 @@
+# bench/bench_workers.py
+# RSS / PSS par worker uvicorn selon le nombre de workers, avec le modèle et les
+# features chargés classiquement (.pkl + CSV) ou ouverts en mmap (.forest + .store).
+#   python -m bench.bench_workers --workers 2 4 8
+# PSS (proportional set size) répartit les pages partagées entre les process : c'est
+# la bonne mesure du coût réel d'un worker supplémentaire.
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+from joblib import dump
+from sklearn.ensemble import RandomForestRegressor
+
+from prediction.compact_forest import compact_path, save_compact_forest
+from prediction.config import FEATURE_COLS, TARGET_COL
+from prediction.feature_store import export_feature_store, feature_store_path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _make_artifacts(tmp: Path, n_pays: int, n_jours: int, trees: int):
+    rng = np.random.default_rng(0)
+    n = n_pays * n_jours
+    df = pd.DataFrame({
+        "date_stat": np.tile(pd.date_range("2020-03-01", periods=n_jours), n_pays),
+        "nom_pays": np.repeat([f"pays_{i:03d}" for i in range(n_pays)], n_jours),
+        "population": np.repeat(rng.integers(1e5, 1e8, n_pays), n_jours).astype(float),
+    })
+    for c in FEATURE_COLS[1:]:
+        df[c] = rng.lognormal(size=n)
+    df[TARGET_COL] = rng.lognormal(size=n) * 1e-5
+    csv = tmp / "features_data.csv"
+    df.to_csv(csv, index=False)
+    model = RandomForestRegressor(n_estimators=trees, random_state=0, n_jobs=-1)
+    model.fit(df[FEATURE_COLS], df[TARGET_COL])
+    model.set_params(n_jobs=1)
+    pkl = tmp / "model.pkl"
+    dump(model, pkl)
+    return df["nom_pays"].unique().tolist(), csv, pkl
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _mem_kb(pid: int, key: str) -> int:
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        if line.startswith(key + ":"):
+            return int(line.split()[1])
+    return 0
+
+
+def _workers_of(pid: int) -> list:
+    kids = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return [int(k) for k in kids
+            if "resource_tracker" not in Path(f"/proc/{k}/cmdline").read_text()]
+
+
+def _measure(workers: int, csv: Path, pkl: Path, countries: list, per_worker: int) -> dict:
+    port = _free_port()
+    env = dict(os.environ, MODEL_PATH=str(pkl), FEATURES_CSV=str(csv), PYTHONPATH=str(ROOT))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.api_pandemies:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(120):
+            try:
+                if requests.get(f"{base}/docs", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                time.sleep(0.5)
+        # charge concurrente pour que chaque worker charge modèle + features
+        urls = [f"{base}/ml/predict_series/{countries[i % len(countries)]}" for i in range(workers * per_worker)]
+        with ThreadPoolExecutor(workers * 2) as ex:
+            assert all(r.status_code == 200 for r in ex.map(lambda u: requests.get(u, timeout=600), urls))
+        pids = _workers_of(proc.pid)
+        rss = [_mem_kb(p, "Rss") / 1e3 for p in pids]
+        pss = [_mem_kb(p, "Pss") / 1e3 for p in pids]
+        return {"workers": len(pids), "rss_mb": float(np.mean(rss)), "pss_mb": float(np.mean(pss)),
+                "rss_total_mb": float(np.sum(rss)), "pss_total_mb": float(np.sum(pss))}
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    ap.add_argument("--pays", type=int, default=200)
+    ap.add_argument("--jours", type=int, default=800)
+    ap.add_argument("--trees", type=int, default=100)
+    ap.add_argument("--requetes-par-worker", type=int, default=4)
+    ap.add_argument("--modes", nargs="+", choices=["pkl+csv", "mmap"], default=["pkl+csv", "mmap"])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"Artefacts synthétiques: {args.pays} pays x {args.jours} jours, RF {args.trees} arbres")
+        countries, csv, pkl = _make_artifacts(tmp, args.pays, args.jours, args.trees)
+        for mode in args.modes:
+            if mode == "mmap":
+                from joblib import load
+                save_compact_forest(load(pkl), compact_path(pkl), source=pkl)
+                export_feature_store(pd.read_csv(csv, parse_dates=["date_stat"]),
+                                     feature_store_path(csv), source=csv)
+            for w in args.workers:
+                try:
+                    r = _measure(w, csv, pkl, countries, args.requetes_par_worker)
+                except (requests.RequestException, AssertionError) as e:
+                    # typiquement un worker tué par l'OOM killer
+                    print(f"{mode:8s} workers={w}  échec: {type(e).__name__}")
+                    continue
+                print(f"{mode:8s} workers={r['workers']}  RSS/worker {r['rss_mb']:7.1f} Mo  "
+                      f"PSS/worker {r['pss_mb']:7.1f} Mo  PSS total {r['pss_total_mb']:8.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
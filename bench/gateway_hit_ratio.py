@@ -0,0 +1,43 @@
+# bench/gateway_hit_ratio.py
+# Taux de hit du micro-cache de la passerelle, par port, à partir du journal nginx
+# (log_format `cache` de gateway/nginx.conf).
+#   docker compose logs --no-log-prefix gateway | python -m bench.gateway_hit_ratio
+import argparse
+import re
+import sys
+from collections import Counter, defaultdict
+
+_LINE = re.compile(r"port=(\d+) status=(\d+) cache=(\S+)")
+# servi depuis le cache (STALE / UPDATING : périmé pendant la revalidation en fond ;
+# REVALIDATED : 304 de l'API, corps repris du cache)
+SERVED_FROM_CACHE = {"HIT", "STALE", "UPDATING", "REVALIDATED"}
+
+
+def hit_ratios(lines) -> dict:
+    """{port: Counter des statuts de cache} (requêtes non cacheables, cache=-, exclues)."""
+    stats = defaultdict(Counter)
+    for line in lines:
+        m = _LINE.search(line)
+        if m and m.group(3) != "-":
+            stats[m.group(1)][m.group(3)] += 1
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("log", nargs="?", help="fichier de journal (défaut : entrée standard)")
+    args = ap.parse_args()
+    with (open(args.log, encoding="utf-8") if args.log else sys.stdin) as f:
+        stats = hit_ratios(f)
+    if not stats:
+        print("Aucune requête passée par le cache")
+        return
+    for port, c in sorted(stats.items()):
+        total = sum(c.values())
+        served = sum(n for s, n in c.items() if s in SERVED_FROM_CACHE)
+        detail = " ".join(f"{s}={n}" for s, n in c.most_common())
+        print(f"port {port}: {served / total:6.1%} servies par le cache ({total} requêtes) | {detail}")
+
+
+if __name__ == "__main__":
+    main()
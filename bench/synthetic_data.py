@@ -0,0 +1,245 @@
+# bench/synthetic_data.py
+# Jeu de données épidémiques synthétique, au format EXACT des CSV bruts lus par
+# data_cleaner (worldometer quotidien + résumé pour covid_19, OWID pour monkeypox), à
+# n'importe quelle échelle : N régions × M jours, reproductible (graine).
+#   python -m bench.synthetic_data --regions 2300 --jours 1000 --out /tmp/raw
+#   DATA_DIR=/tmp/raw python etl_main.py
+# Réalisme visé (ce qui fait réagir nettoyage, ETL, features et modèle) :
+# - vagues gaussiennes (pic, largeur, taux d'attaque tirés par région), bruit
+#   gamma-Poisson surdispersé, sous-déclaration du week-end rattrapée le lundi ;
+# - trous de déclaration (NaN), le retard étant publié en bloc au retour ;
+# - révisions : baisses ponctuelles du cumul, donc nouveaux cas négatifs ce jour-là ;
+# - décès = cas décalés × létalité ; lignes agrégées (World, continents) côté OWID.
+# Les régions sont générées par blocs de CHUNK : mémoire bornée quelle que soit l'échelle.
+# Seules covid_19 et monkeypox ont un format brut et un chargement dans l'ETL (id_maladie
+# 1 et 2) : d'autres maladies demanderaient d'abord leur chargeur dans etl_main.
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_cleaner import COVID_DAILY_CSV, COVID_SUMMARY_CSV, MONKEYPOX_CSV
+
+CHUNK = 500  # régions par bloc (fixe : le résultat ne dépend que de la graine)
+CONTINENTS = ["Africa", "Asia", "Europe", "North America", "South America", "Oceania"]
+_PREFIXES = ["Région", "Province", "Côte", "Île", "Comté", "Vallée"]  # accents : nettoyer_nom_pays
+COVID_START, MONKEYPOX_START = "2020-01-22", "2022-05-01"
+# lundi → dimanche : creux du week-end, rattrapage le lundi
+_WEEKDAY = np.array([1.25, 1.1, 1.05, 1.0, 1.0, 0.85, 0.75])
+_WEEKDAY = _WEEKDAY / _WEEKDAY.mean()
+
+OWID_COLUMNS = [
+    "location", "iso_code", "date", "total_cases", "total_deaths", "new_cases", "new_deaths",
+    "new_cases_smoothed", "new_deaths_smoothed", "new_cases_per_million", "total_cases_per_million",
+    "new_cases_smoothed_per_million", "new_deaths_per_million", "total_deaths_per_million",
+    "new_deaths_smoothed_per_million",
+]
+
+
+def regions(n: int, seed: int = 0) -> pd.DataFrame:
+    """Nom, continent, population et code des N régions (noms uniques après nettoyage)."""
+    rng = np.random.default_rng([seed, 0])
+    i = np.arange(1, n + 1)
+    return pd.DataFrame({
+        "country": [f"{_PREFIXES[k % len(_PREFIXES)]} {k:05d}" for k in i],
+        "continent": np.array(CONTINENTS)[rng.integers(0, len(CONTINENTS), n)],
+        "population": rng.lognormal(np.log(5e6), 1.3, n).clip(1e4, 1.5e9).round().astype(np.int64),
+        "iso_code": [f"R{k:05d}" for k in i],
+    })
+
+
+def _waves(rng, population, jours, vagues, attaque) -> np.ndarray:
+    """Cas attendus par jour (régions × jours) : somme de vagues gaussiennes."""
+    n, t = len(population), np.arange(jours)
+    total = population[:, None] * rng.uniform(*attaque, (n, 1)) * rng.dirichlet(np.ones(vagues), n)
+    peaks = rng.uniform(0.05 * jours, jours, (n, vagues))  # départ proche de zéro
+    widths = rng.uniform(8, 45, (n, vagues))
+    mu = np.zeros((n, jours))
+    for w in range(vagues):  # une vague à la fois : pas de tableau régions × vagues × jours
+        z = (t[None, :] - peaks[:, w, None]) / widths[:, w, None]
+        mu += total[:, w, None] * np.exp(-0.5 * z * z) / (widths[:, w, None] * np.sqrt(2 * np.pi))
+    return mu
+
+
+def _noisy(rng, mu, dispersion=8.0) -> np.ndarray:
+    """Comptes gamma-Poisson (binomiale négative) de moyenne mu."""
+    return rng.poisson(rng.gamma(dispersion, mu / dispersion)).astype(float)
+
+
+def _shift(a, k, fill=0.0) -> np.ndarray:
+    out = np.full_like(a, fill)
+    out[:, k:] = a[:, :a.shape[1] - k]
+    return out
+
+
+def _ffill(a) -> np.ndarray:
+    """Report de la dernière valeur connue le long des jours (NaN en tête conservés)."""
+    idx = np.where(np.isnan(a), 0, np.arange(a.shape[1])[None, :])
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return a[np.arange(a.shape[0])[:, None], idx]
+
+
+def _gaps(rng, shape, p, mean_len=3) -> np.ndarray:
+    """Jours non déclarés : départs rares, durées géométriques (≤ 4 × la moyenne)."""
+    if p <= 0:
+        return np.zeros(shape, dtype=bool)
+    start = rng.random(shape) < p
+    length = rng.geometric(1 / mean_len, shape)
+    mask = np.zeros(shape, dtype=bool)
+    for k in range(4 * mean_len):
+        mask[:, k:] |= start[:, :shape[1] - k] & (length[:, :shape[1] - k] > k)
+    return mask
+
+
+def _report(rng, daily, gaps, p_revision):
+    """(cumul publié, nouveaux publiés) : révisions du cumul, NaN sur les trous et retard
+    publié en bloc le premier jour déclaré suivant."""
+    cum = np.cumsum(daily, axis=1)
+    rev = rng.random(daily.shape) < p_revision
+    cum = np.maximum(cum - np.cumsum(np.where(rev, np.floor(cum * rng.uniform(0.002, 0.03, daily.shape)), 0),
+                                     axis=1), 0)
+    cum = np.where(gaps, np.nan, cum)
+    prev = np.nan_to_num(_shift(_ffill(cum), 1, fill=np.nan), nan=0.0)
+    return cum, cum - prev
+
+
+def _smoothed(daily) -> np.ndarray:
+    """Moyenne glissante 7 jours (NaN avant le 7e jour), comme new_cases_smoothed d'OWID."""
+    cs = np.cumsum(np.nan_to_num(daily), axis=1)
+    out = np.full_like(daily, np.nan)
+    out[:, 6:] = (cs[:, 6:] - _shift(cs, 1)[:, :-6]) / 7  # somme des jours t-6..t
+    return out
+
+
+def _epidemic(rng, pop, dates, vagues, attaque, letalite, p_gap, p_revision):
+    mu = _waves(rng, pop, len(dates), vagues, attaque) * _WEEKDAY[dates.dayofweek.to_numpy()][None, :]
+    cases = _noisy(rng, mu)
+    deaths = _noisy(rng, _shift(cases, 14) * rng.uniform(*letalite, (len(pop), 1)))
+    gaps = _gaps(rng, cases.shape, p_gap)
+    cum_cases, new_cases = _report(rng, cases, gaps, p_revision)
+    cum_deaths, new_deaths = _report(rng, deaths, gaps, p_revision / 2)
+    return cum_cases, new_cases, cum_deaths, new_deaths
+
+
+def _long(reg, dates, **cols) -> dict:
+    """Colonnes (régions × jours) → format long, une ligne par (région, date)."""
+    n, m = len(reg), len(dates)
+    return {"country": np.repeat(reg["country"].to_numpy(), m),
+            "date": np.tile(dates.strftime("%Y-%m-%d").to_numpy(), n),
+            **{k: v.ravel() for k, v in cols.items()}}
+
+
+def _covid_chunk(rng, reg, dates, p_gap, p_revision):
+    pop = reg["population"].to_numpy(float)
+    cum, new, cum_d, new_d = _epidemic(rng, pop, dates, 4, (0.05, 0.35), (0.003, 0.02), p_gap, p_revision)
+    recovered = _shift(_ffill(cum), 14)
+    active = np.where(np.isnan(cum), np.nan, np.maximum(cum - np.nan_to_num(recovered) - _ffill(cum_d), 0))
+    daily = pd.DataFrame(_long(reg, dates, cumulative_total_cases=cum, daily_new_cases=new,
+                               active_cases=active, cumulative_total_deaths=cum_d, daily_new_deaths=new_d))
+    last = lambda a: np.nan_to_num(_ffill(a)[:, -1])  # noqa: E731
+    confirmed, dead = last(cum), last(cum_d)
+    rec = np.clip(np.nan_to_num(recovered[:, -1]), 0, np.maximum(confirmed - dead, 0))  # cumul révisé
+    act = np.maximum(confirmed - rec - dead, 0)
+    tests = np.round(confirmed * rng.uniform(4, 30, len(reg)))
+    summary = pd.DataFrame({
+        "country": reg["country"], "continent": reg["continent"],
+        "total_confirmed": confirmed.astype(np.int64), "total_deaths": dead, "total_recovered": rec,
+        "active_cases": act, "serious_or_critical": np.round(act * 0.005),
+        "total_cases_per_1m_population": np.round(confirmed / pop * 1e6).astype(np.int64),
+        "total_deaths_per_1m_population": np.round(dead / pop * 1e6, 1),
+        "total_tests": tests, "total_tests_per_1m_population": np.round(tests / pop * 1e6),
+        "population": reg["population"],
+    })
+    return daily, summary
+
+
+def _owid(location, iso, dates, pop, cum, new, cum_d, new_d) -> pd.DataFrame:
+    """Lignes OWID (mêmes colonnes et ordre que owid-monkeypox-data.csv)."""
+    per_m = 1e6 / np.asarray(pop, float)[:, None]
+    sm, sm_d = _smoothed(new), _smoothed(new_d)
+    df = pd.DataFrame(_long(pd.DataFrame({"country": location}), dates,
+                            total_cases=cum, total_deaths=cum_d, new_cases=new, new_deaths=new_d,
+                            new_cases_smoothed=sm.round(3), new_deaths_smoothed=sm_d.round(3),
+                            new_cases_per_million=(new * per_m).round(3),
+                            total_cases_per_million=(cum * per_m).round(3),
+                            new_cases_smoothed_per_million=(sm * per_m).round(3),
+                            new_deaths_per_million=(new_d * per_m).round(3),
+                            total_deaths_per_million=(cum_d * per_m).round(3),
+                            new_deaths_smoothed_per_million=(sm_d * per_m).round(3)))
+    df = df.rename(columns={"country": "location"})
+    df.insert(1, "iso_code", np.repeat(np.asarray(iso), len(dates)))
+    return df[OWID_COLUMNS]
+
+
+def generate(out_dir, n_regions: int = 230, jours: int = 900, seed: int = 0,
+             maladies=("covid_19", "monkeypox"), part_monkeypox: float = 0.5,
+             p_gap: float = 0.004, p_revision: float = 0.002) -> dict:
+    """Écrit les CSV bruts dans out_dir ; renvoie {fichier: nombre de lignes}."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    reg = regions(n_regions, seed)
+    rows = {}
+
+    if "covid_19" in maladies:
+        dates = pd.date_range(COVID_START, periods=jours)
+        daily_path, summaries = out / COVID_DAILY_CSV, []
+        for b, start in enumerate(range(0, n_regions, CHUNK)):
+            rng = np.random.default_rng([seed, 1, b])
+            daily, summary = _covid_chunk(rng, reg.iloc[start:start + CHUNK], dates, p_gap, p_revision)
+            daily.to_csv(daily_path, mode="w" if b == 0 else "a", header=b == 0, index=False)
+            summaries.append(summary)
+        rows[COVID_DAILY_CSV] = n_regions * jours
+        summary = pd.concat(summaries, ignore_index=True)
+        summary.to_csv(out / COVID_SUMMARY_CSV, index=False)
+        rows[COVID_SUMMARY_CSV] = len(summary)
+
+    if "monkeypox" in maladies:
+        dates = pd.date_range(MONKEYPOX_START, periods=jours)
+        touched = reg[np.random.default_rng([seed, 2]).random(n_regions) < part_monkeypox].reset_index(drop=True)
+        path = out / MONKEYPOX_CSV
+        agg = {}  # {(location, iso): [population, cumul, nouveaux, cumul décès, nouveaux décès]}
+        for b, start in enumerate(range(0, len(touched), CHUNK)):
+            rng = np.random.default_rng([seed, 3, b])
+            part = touched.iloc[start:start + CHUNK]
+            pop = part["population"].to_numpy(float)
+            series = _epidemic(rng, pop, dates, 2, (2e-6, 1e-4), (0.0005, 0.005), 0.0, p_revision)
+            _owid(part["country"], part["iso_code"], dates, pop, *series).to_csv(
+                path, mode="w" if b == 0 else "a", header=b == 0, index=False)
+            for key, mask in [(("World", "OWID_WRL"), np.ones(len(part), bool))] + [
+                    ((c, f"OWID_{c[:3].upper()}"), (part["continent"] == c).to_numpy()) for c in CONTINENTS]:
+                sums = [pop[mask].sum()] + [np.nansum(s[mask], axis=0) for s in series]
+                agg[key] = sums if key not in agg else [a + s for a, s in zip(agg[key], sums)]
+        # agrégats comme dans OWID (supprimés par nettoyer_monkeypox)
+        keys = [k for k in agg if agg[k][0] > 0]
+        if keys:
+            pop = np.array([agg[k][0] for k in keys])
+            series = [np.vstack([agg[k][i] for k in keys]) for i in range(1, 5)]
+            _owid([k[0] for k in keys], [k[1] for k in keys], dates, pop, *series).to_csv(
+                path, mode="a", header=False, index=False)
+        rows[MONKEYPOX_CSV] = (len(touched) + len(keys)) * jours
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--regions", type=int, default=230)
+    ap.add_argument("--jours", type=int, default=900)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--maladies", default="covid_19,monkeypox")
+    ap.add_argument("--out", type=Path, required=True)
+    args = ap.parse_args()
+    maladies = [m for m in args.maladies.split(",") if m]
+    unknown = set(maladies) - {"covid_19", "monkeypox"}
+    if unknown:
+        ap.error(f"pas de format brut pour: {', '.join(sorted(unknown))}")
+    t0 = time.perf_counter()
+    rows = generate(args.out, args.regions, args.jours, args.seed, maladies)
+    for name, n in rows.items():
+        print(f"📄 {name}: {n:,} lignes ({(args.out / name).stat().st_size / 1e6:.1f} Mo)")
+    print(f"✅ Généré en {time.perf_counter() - t0:.1f} s dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 # data_cleaner.py - Nettoyage des données
 
+import os
 import pandas as pd
 import unicodedata
+from pathlib import Path
+
+# Dossier des CSV bruts (ex. jeu synthétique de bench/synthetic_data.py)
+DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
+COVID_DAILY_CSV = "worldometer_coronavirus_daily_data.csv"
+MONKEYPOX_CSV = "owid-monkeypox-data.csv"
+COVID_SUMMARY_CSV = "worldometer_coronavirus_summary_data.csv"
 
 def nettoyer_nom_pays(nom):
     """Enlève accents et normalise le nom"""
@@ -22,7 +30,7 @@ def nettoyer_covid_daily():
     """Nettoie le fichier COVID quotidien"""
     print("🧹 Nettoyage COVID daily...")
     
-    df = pd.read_csv("data/worldometer_coronavirus_daily_data.csv")
+    df = pd.read_csv(DATA_DIR / COVID_DAILY_CSV)
     print(f"📊 Lignes avant: {len(df)}")
     
     # Garder colonnes utiles
@@ -53,7 +61,7 @@ def nettoyer_monkeypox():
     """Nettoie le fichier Monkeypox"""
     print("🧹 Nettoyage Monkeypox...")
     
-    df = pd.read_csv("data/owid-monkeypox-data.csv")
+    df = pd.read_csv(DATA_DIR / MONKEYPOX_CSV)
     print(f"📊 Lignes avant: {len(df)}")
     
     # Garder colonnes utiles
@@ -85,7 +93,7 @@ def nettoyer_covid_summary():
     """Nettoie le fichier COVID résumé"""
     print("🧹 Nettoyage COVID summary...")
     
-    df = pd.read_csv("data/worldometer_coronavirus_summary_data.csv")
+    df = pd.read_csv(DATA_DIR / COVID_SUMMARY_CSV)
     print(f"📊 Lignes avant: {len(df)}")
     
     # Garder colonnes utiles
@@ -0,0 +1,64 @@
+# data_version.py - Version des données
+# Compteur unique en base, incrémenté par chaque écriture qui change ce que servent
+# l'API et le dashboard (ETL, vue features, prédictions publiées). Le NOTIFY part dans
+# la même transaction : PostgreSQL ne le délivre qu'au commit, jamais sur un rollback.
+# Les écouteurs (api/data_events.py) invalident leurs caches sur réception.
+# Table data_version créée par les migrations (db_schema.py).
+# Chargement hors etl_main (script, import manuel) : publier à la fin avec
+#   python data_version.py <source>
+
+from datetime import datetime
+
+CHANNEL = "data_version"
+
+
+def bump_version(cur, source: str) -> int:
+    """Incrémente la version et programme le NOTIFY, dans la transaction de `cur`."""
+    cur.execute("""
+        INSERT INTO data_version (id, version, source) VALUES (true, 1, %s)
+        ON CONFLICT (id) DO UPDATE
+        SET version = data_version.version + 1, source = EXCLUDED.source, updated_at = now()
+        RETURNING version, updated_at
+    """, (source,))
+    version, updated_at = cur.fetchone()
+    cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, f"{version} {updated_at.isoformat()}"))
+    return version
+
+
+def parse_payload(payload: str):
+    """(version, updated_at) d'un NOTIFY publié par bump_version."""
+    version, _, updated_at = payload.partition(" ")
+    return int(version), (datetime.fromisoformat(updated_at) if updated_at else None)
+
+
+def publish_version(source: str, conn=None) -> int:
+    """Nouvelle version dans sa propre transaction (ex. en fin d'ETL)."""
+    from db_config import get_connexion
+    own = conn is None
+    conn = conn or get_connexion()
+    try:
+        with conn.cursor() as cur:
+            version = bump_version(cur, source)
+        conn.commit()
+        return version
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own:
+            conn.close()
+
+
+def read_version(cur):
+    """(version, updated_at) courants ; (None, None) si aucune écriture n'a encore été publiée."""
+    cur.execute("SELECT to_regclass('data_version') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return None, None
+    cur.execute("SELECT version, updated_at FROM data_version")
+    row = cur.fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+
+if __name__ == "__main__":
+    import sys
+    print(f"📣 Version des données: {publish_version(sys.argv[1] if len(sys.argv) > 1 else 'manuel')}")
@@ -21,8 +21,13 @@
 import os
 import psycopg2
 
-def get_connexion():
-    return psycopg2.connect(
+# Réplique en lecture optionnelle (DSN libpq, ex. "host=db-replica") : les endpoints en
+# lecture seule de l'API y vont (readonly=True), les écritures (ETL, vue features,
+# prédictions, NOTIFY) restent sur le primaire. Champs absents du DSN : ceux du primaire.
+PG_READ_DSN = os.getenv("PG_READ_DSN", "")
+
+def get_connexion(readonly=False, **kwargs):
+    params = dict(
         dbname=os.getenv("PGDATABASE", "pandemies_db"),
         user=os.getenv("PGUSER", "postgres"),
         password=os.getenv("PGPASSWORD", "Admin"),
@@ -30,6 +35,10 @@ def get_connexion():
         port=os.getenv("PGPORT", "5432"),
         connect_timeout=5
     )
+    if readonly and PG_READ_DSN:
+        params.update(psycopg2.extensions.parse_dsn(PG_READ_DSN))
+    params.update(kwargs)
+    return psycopg2.connect(**params)
 
 
 if __name__ == "__main__":
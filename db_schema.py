@@ -0,0 +1,387 @@
+# db_schema.py - Schéma de la base et migrations
+# Tables pays / maladie / statistique, index et partitionnement, registre des modèles et
+# prédictions publiées, version des données : appliqués au démarrage
+# de l'ETL (etl_main.etl_complet) ou à la main :
+#   python db_schema.py                 applique les migrations manquantes
+#   python db_schema.py --check-plans   EXPLAIN ANALYZE des requêtes de l'API (api/queries.py)
+# Chaque migration s'exécute une seule fois, dans sa transaction, sous un verrou consultatif
+# (deux ETL lancés ensemble ne migrent pas en parallèle) ; schema_migrations garde la trace.
+#
+# statistique est partitionnée par liste sur id_maladie (une partition par maladie + une
+# partition DEFAULT). La clé primaire (id_maladie, id_pays, date_stat) inclut les colonnes
+# de /evolution : l'historique d'un pays se lit par index-only scan. Elle sert aussi de
+# cible à ON CONFLICT (date_stat, id_pays, id_maladie) de l'ETL (même ensemble de colonnes).
+import re
+import time
+
+from psycopg2 import sql
+
+from db_config import get_connexion
+
+_LOCK_KEY = 4_710_047  # pg_advisory_xact_lock : migrations sérialisées
+
+_LEDGER = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     integer PRIMARY KEY,
+    nom         text NOT NULL,
+    applied_at  timestamptz NOT NULL DEFAULT now()
+);
+"""
+
+# id_maladie 1 et 2 sont ceux qu'insère l'ETL
+_TABLES = """
+CREATE TABLE IF NOT EXISTS pays (
+    id_pays     serial PRIMARY KEY,
+    nom_pays    text NOT NULL UNIQUE,
+    continent   text,
+    population  bigint
+);
+
+CREATE TABLE IF NOT EXISTS maladie (
+    id_maladie  serial PRIMARY KEY,
+    nom_maladie text NOT NULL UNIQUE
+);
+INSERT INTO maladie (id_maladie, nom_maladie) VALUES (1, 'covid_19'), (2, 'monkeypox')
+ON CONFLICT DO NOTHING;
+SELECT setval(pg_get_serial_sequence('maladie', 'id_maladie'), (SELECT MAX(id_maladie) FROM maladie));
+
+CREATE SEQUENCE IF NOT EXISTS statistique_id_statistique_seq;
+CREATE TABLE IF NOT EXISTS statistique (
+    id_statistique  bigint NOT NULL DEFAULT nextval('statistique_id_statistique_seq'),
+    date_stat       date NOT NULL,
+    id_pays         integer NOT NULL REFERENCES pays (id_pays),
+    id_maladie      integer NOT NULL REFERENCES maladie (id_maladie),
+    cas_totaux      bigint,
+    nouveaux_cas    bigint,
+    cas_actifs      bigint,
+    deces_totaux    bigint,
+    nouveaux_deces  bigint,
+    nouveaux_cas_lisses              double precision,
+    nouveaux_cas_lisses_par_million  double precision,
+    CONSTRAINT statistique_pkey PRIMARY KEY (id_maladie, id_pays, date_stat)
+        INCLUDE (cas_totaux, nouveaux_cas, deces_totaux, nouveaux_deces)
+) PARTITION BY LIST (id_maladie);
+ALTER SEQUENCE statistique_id_statistique_seq OWNED BY statistique.id_statistique;
+
+-- bases créées avant ce module : colonnes insérées par l'ETL Monkeypox
+ALTER TABLE statistique ADD COLUMN IF NOT EXISTS nouveaux_cas_lisses double precision;
+ALTER TABLE statistique ADD COLUMN IF NOT EXISTS nouveaux_cas_lisses_par_million double precision;
+"""
+
+# /recent : dernière date puis fenêtre récente d'une maladie, colonnes renvoyées incluses.
+# BRIN : plages de dates toutes maladies confondues (quelques pages d'index ; efficace car
+# l'ETL insère par date croissante).
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS statistique_recent_idx ON statistique (id_maladie, date_stat DESC)
+    INCLUDE (id_pays, cas_totaux, nouveaux_cas, deces_totaux);
+CREATE INDEX IF NOT EXISTS statistique_date_brin ON statistique USING brin (date_stat)
+    WITH (pages_per_range = 32);
+"""
+
+# Prédictions batch (prediction/predictions_db.py) : une version active par maladie ;
+# la clé primaire de prediction sert aussi la lecture d'une série par pays.
+# IF NOT EXISTS : bases où les tables étaient créées à la première publication
+_PREDICTIONS = """
+CREATE TABLE IF NOT EXISTS model_registry (
+    model_version  text PRIMARY KEY,
+    nom_maladie    text NOT NULL,
+    model_path     text,
+    created_at     timestamptz NOT NULL DEFAULT now(),
+    n_predictions  bigint,
+    actif          boolean NOT NULL DEFAULT false
+);
+CREATE UNIQUE INDEX IF NOT EXISTS model_registry_actif ON model_registry (nom_maladie) WHERE actif;
+
+CREATE TABLE IF NOT EXISTS prediction (
+    model_version      text NOT NULL REFERENCES model_registry ON DELETE CASCADE,
+    id_pays            integer NOT NULL,
+    date_stat          date NOT NULL,
+    taux_true          double precision,
+    taux_pred          double precision,
+    nouveaux_cas_pred  double precision,
+    PRIMARY KEY (model_version, id_pays, date_stat)
+);
+"""
+
+# Compteur unique incrémenté par data_version.bump_version
+_DATA_VERSION = """
+CREATE TABLE IF NOT EXISTS data_version (
+    id          boolean PRIMARY KEY DEFAULT true CHECK (id),  -- une seule ligne
+    version     bigint NOT NULL,
+    source      text,
+    updated_at  timestamptz NOT NULL DEFAULT now()
+);
+"""
+
+# Une même empreinte de modèle peut servir deux maladies (ex. persistence, sans état
+# appris) : versions et prédictions sont clés par maladie. Index sur le nom normalisé
+# (même règle que ml_router._norm) : /predict_series résout id_pays sans parcourir pays.
+_PREDICTIONS_PAR_MALADIE = """
+ALTER TABLE prediction ADD COLUMN IF NOT EXISTS nom_maladie text;
+UPDATE prediction pr SET nom_maladie = r.nom_maladie
+FROM model_registry r WHERE r.model_version = pr.model_version AND pr.nom_maladie IS NULL;
+ALTER TABLE prediction ALTER COLUMN nom_maladie SET NOT NULL;
+
+ALTER TABLE prediction DROP CONSTRAINT prediction_model_version_fkey;
+ALTER TABLE prediction DROP CONSTRAINT prediction_pkey;
+ALTER TABLE model_registry DROP CONSTRAINT model_registry_pkey;
+ALTER TABLE model_registry ADD CONSTRAINT model_registry_pkey PRIMARY KEY (nom_maladie, model_version);
+ALTER TABLE prediction ADD CONSTRAINT prediction_pkey
+    PRIMARY KEY (nom_maladie, model_version, id_pays, date_stat);
+ALTER TABLE prediction ADD CONSTRAINT prediction_model_fkey FOREIGN KEY (nom_maladie, model_version)
+    REFERENCES model_registry (nom_maladie, model_version) ON DELETE CASCADE;
+
+CREATE INDEX IF NOT EXISTS pays_nom_norm ON pays ((lower(replace(trim(nom_pays), ' ', '_'))));
+"""
+
+
+def _relkind(cur, name):
+    cur.execute("SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(%s)", (name,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _columns(cur, table):
+    cur.execute("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+    """, (table,))
+    return [r[0] for r in cur.fetchall()]
+
+
+def _partition_table(cur):
+    """Convertit une table statistique classique (base antérieure) en table partitionnée."""
+    if _relkind(cur, "statistique") != "r":
+        return
+    print("🧱 Conversion de statistique en table partitionnée (id_maladie)...")
+    # la vue matérialisée dépend de l'ancienne table ; le pipeline la recrée (features_sql)
+    cur.execute("DROP MATERIALIZED VIEW IF EXISTS features")
+    cur.execute("ALTER TABLE statistique RENAME TO statistique_old")
+    # libère les noms (statistique_pkey, ...) pour la nouvelle table
+    cur.execute("""
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass('statistique_old')
+    """)
+    for (index,) in cur.fetchall():
+        cur.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+            sql.Identifier(index), sql.Identifier(f"{index}_old")))
+    cur.execute("SELECT to_regclass(pg_get_serial_sequence('statistique_old', 'id_statistique'))::oid")
+    seq = cur.fetchone()[0]
+    if seq:  # la séquence suit la colonne : sans ça, DROP TABLE l'emporterait
+        cur.execute("SELECT relname FROM pg_class WHERE oid = %s", (seq,))
+        seq_name = cur.fetchone()[0]
+        cur.execute(sql.SQL("ALTER SEQUENCE {} OWNED BY NONE").format(sql.Identifier(seq_name)))
+        if seq_name != "statistique_id_statistique_seq":
+            cur.execute(sql.SQL("ALTER SEQUENCE {} RENAME TO statistique_id_statistique_seq").format(
+                sql.Identifier(seq_name)))
+
+    cur.execute(_TABLES)
+    _ensure_partitions(cur)
+    cols = [c for c in _columns(cur, "statistique_old") if c in set(_columns(cur, "statistique"))]
+    ident = sql.SQL(", ").join(map(sql.Identifier, cols))
+    cur.execute(sql.SQL("INSERT INTO statistique ({0}) SELECT {0} FROM statistique_old").format(ident))
+    print(f"   {cur.rowcount} lignes recopiées")
+    cur.execute("DROP TABLE statistique_old")
+    if "id_statistique" in cols:
+        cur.execute("""
+            SELECT setval('statistique_id_statistique_seq',
+                          COALESCE((SELECT MAX(id_statistique) FROM statistique), 0) + 1, false)
+        """)
+
+
+def _partitions(cur):
+    """{id_maladie: partition} et le nom de la partition DEFAULT (ou None)."""
+    cur.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('statistique')
+    """)
+    by_id, default = {}, None
+    for name, bound in cur.fetchall():
+        if bound == "DEFAULT":
+            default = name
+        else:
+            by_id.update({int(v): name for v in re.findall(r"\d+", bound)})
+    return by_id, default
+
+
+def _ensure_partitions(cur):
+    """Une partition par maladie connue, plus la partition DEFAULT."""
+    if _relkind(cur, "statistique") != "p":
+        return
+    by_id, default = _partitions(cur)
+    if default is None:
+        default = "statistique_autres"
+        cur.execute("CREATE TABLE statistique_autres PARTITION OF statistique DEFAULT")
+    cur.execute("SELECT id_maladie, nom_maladie FROM maladie ORDER BY id_maladie")
+    for id_maladie, nom in cur.fetchall():
+        if id_maladie in by_id:
+            continue
+        cur.execute(sql.SQL("SELECT EXISTS (SELECT 1 FROM {} WHERE id_maladie = %s)").format(
+            sql.Identifier(default)), (id_maladie,))
+        if cur.fetchone()[0]:
+            print(f"⚠️ Données {nom} dans {default} : partition dédiée non créée")
+            continue
+        name = "statistique_" + re.sub(r"\W+", "_", nom.lower()).strip("_")
+        print(f"🧱 Partition {name} (id_maladie = {id_maladie})")
+        cur.execute(sql.SQL("CREATE TABLE {} PARTITION OF statistique FOR VALUES IN ({})").format(
+            sql.Identifier(name), sql.Literal(id_maladie)))
+
+
+# (version, nom, SQL ou fonction(cur)) — ne jamais modifier une migration publiée : en ajouter une
+MIGRATIONS = [
+    (1, "tables", _TABLES),
+    (2, "partitionnement statistique", _partition_table),
+    (3, "index /recent et BRIN date_stat", _INDEXES),
+    (4, "registre des modèles et prédictions", _PREDICTIONS),
+    (5, "version des données", _DATA_VERSION),
+    (6, "prédictions clées par maladie", _PREDICTIONS_PAR_MALADIE),
+]
+
+
+def migrate(conn=None) -> int:
+    """Applique les migrations manquantes ; renvoie leur nombre."""
+    own = conn is None
+    conn = conn or get_connexion()
+    applied = 0
+    try:
+        for version, nom, step in MIGRATIONS:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_KEY,))
+                cur.execute(_LEDGER)
+                cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cur.fetchone():
+                    conn.rollback()
+                    continue
+                print(f"🧱 Migration {version:03d} : {nom}")
+                step(cur) if callable(step) else cur.execute(step)
+                cur.execute("INSERT INTO schema_migrations (version, nom) VALUES (%s, %s)", (version, nom))
+            conn.commit()
+            applied += 1
+        with conn.cursor() as cur:  # maladies ajoutées depuis
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_KEY,))
+            _ensure_partitions(cur)
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own:
+            conn.close()
+
+
+def vacuum_analyze(conn=None):
+    """Après un chargement : statistiques du planificateur et carte de visibilité à jour
+    (sans elle, les index-only scans relisent la table)."""
+    own = conn is None
+    conn = conn or get_connexion()
+    try:
+        conn.autocommit = True  # VACUUM hors transaction
+        with conn.cursor() as cur:
+            cur.execute("VACUUM (ANALYZE) statistique")
+            cur.execute("ANALYZE pays")
+            cur.execute("ANALYZE maladie")
+    finally:
+        if own:
+            conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Vérification des plans
+# ---------------------------------------------------------------------------
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _parent_indexes(cur):
+    """{index de partition: index de la table partitionnée} (noms affichés par EXPLAIN)."""
+    cur.execute("""
+        SELECT c.relname, p.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE c.relkind = 'i'
+    """)
+    return dict(cur.fetchall())
+
+
+def _sample_params(cur):
+    """Maladie et pays les plus fournis : le cas le plus lourd servi par l'API."""
+    cur.execute("""
+        SELECT m.nom_maladie, p.nom_pays
+        FROM statistique s
+        JOIN maladie m ON m.id_maladie = s.id_maladie
+        JOIN pays p    ON p.id_pays = s.id_pays
+        GROUP BY m.nom_maladie, p.nom_pays
+        ORDER BY COUNT(*) DESC
+        LIMIT 1
+    """)
+    row = cur.fetchone()
+    if row is None:
+        raise RuntimeError("statistique est vide : rien à vérifier")
+    return {"maladie": row[0], "pays": row[1], "limit": 100, "jours": 30}
+
+
+def explain(cur, query, params):
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+    res = cur.fetchone()[0]
+    return res[0] if isinstance(res, list) else res
+
+
+def plan_issues(plan, expected, parents, partitions) -> list:
+    """Écarts entre un plan (EXPLAIN JSON) et ce qu'attend api.queries.PLAN_CHECKS."""
+    nodes = list(_walk(plan["Plan"]))
+    issues = []
+    scanned = {n["Relation Name"] for n in nodes
+               if n.get("Relation Name") in partitions and n.get("Actual Loops", 1) > 0}
+    if "partitions" in expected and len(scanned) > expected["partitions"]:
+        issues.append(f"{len(scanned)} partitions lues ({', '.join(sorted(scanned))})")
+    index = expected.get("index")
+    if index:
+        scans = [n for n in nodes if parents.get(n.get("Index Name"), n.get("Index Name")) == index]
+        if not scans:
+            issues.append(f"{index} non utilisé")
+        elif expected.get("index_only") and not any(n["Node Type"] == "Index Only Scan" for n in scans):
+            issues.append(f"{index} utilisé sans index-only scan")
+    return issues
+
+
+def check_plans(conn=None, params=None) -> list:
+    """EXPLAIN ANALYZE de chaque requête de l'API ; [(nom, durée ms, écarts)]."""
+    from api.queries import PLAN_CHECKS
+    own = conn is None
+    conn = conn or get_connexion(readonly=True)
+    try:
+        with conn.cursor() as cur:
+            params = params or _sample_params(cur)
+            parents = _parent_indexes(cur)
+            by_id, default = _partitions(cur)
+            partitions = set(by_id.values()) | {default}
+            report = []
+            for name, check in PLAN_CHECKS.items():
+                t0 = time.perf_counter()
+                plan = explain(cur, check["sql"], {k: params[k] for k in check["params"]})
+                ms = plan.get("Execution Time", (time.perf_counter() - t0) * 1000)
+                report.append((name, ms, plan_issues(plan, check, parents, partitions)))
+        conn.rollback()
+        return report
+    finally:
+        if own:
+            conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+    if "--check-plans" in sys.argv:
+        report = check_plans()
+        for name, ms, issues in report:
+            status = "✅" if not issues else "❌"
+            print(f"{status} {name:<11} {ms:8.2f} ms  {'; '.join(issues)}")
+        sys.exit(1 if any(issues for _, _, issues in report) else 0)
+    n = migrate()
+    print(f"✅ Schéma à jour ({n} migration(s) appliquée(s))")
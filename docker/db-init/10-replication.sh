@@ -0,0 +1,9 @@
+#!/bin/sh
+# docker/db-init/10-replication.sh
+# Connexions de réplication (service db-replica) sur le primaire. Lancé par l'image à la
+# création du volume db_data, et par l'entrypoint du service db à chaque démarrage (volume
+# existant, créé avant ce script) : l'entrée n'est ajoutée qu'une fois.
+set -e
+HBA="$PGDATA/pg_hba.conf"
+LINE="host replication all all scram-sha-256"
+grep -qxF "$LINE" "$HBA" || echo "$LINE" >> "$HBA"
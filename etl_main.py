@@ -1,8 +1,14 @@
 # etl_main.py - ETL Principal
 
 from db_config import get_connexion
+from data_version import publish_version
+from db_schema import migrate, vacuum_analyze
 from data_cleaner import nettoyer_covid_daily, nettoyer_monkeypox, nettoyer_covid_summary
 
+def _sans_nan(df):
+    """Valeurs non publiées (NaN) → None : NULL en base, colonnes de comptage entières"""
+    return df.astype(object).where(df.notna(), None)
+
 def inserer_pays(df_list):
     """Insère tous les pays uniques"""
     print("🌍 Insertion des pays...")
@@ -50,7 +56,8 @@ def inserer_statistiques_covid(df_covid):
     compteur = 0
     erreurs = 0
     
-    for _, ligne in df_covid.iterrows():
+    # ordre chronologique : les blocs de la table suivent date_stat (index BRIN)
+    for _, ligne in _sans_nan(df_covid.sort_values('date_stat', kind='stable')).iterrows():
         try:
             # Récupérer ID pays
             cursor.execute("SELECT id_pays FROM pays WHERE nom_pays = %s", (ligne['nom_pays'],))
@@ -101,7 +108,7 @@ def inserer_statistiques_monkeypox(df_monkey):
     cursor = conn.cursor()
     compteur = 0
     
-    for _, ligne in df_monkey.iterrows():
+    for _, ligne in _sans_nan(df_monkey.sort_values('date_stat', kind='stable')).iterrows():
         try:
             # Récupérer ID pays
             cursor.execute("SELECT id_pays FROM pays WHERE nom_pays = %s", (ligne['nom_pays'],))
@@ -150,7 +157,7 @@ def enrichir_pays_summary(df_summary):
     cursor = conn.cursor()
     compteur = 0
     
-    for _, ligne in df_summary.iterrows():
+    for _, ligne in _sans_nan(df_summary).iterrows():
         try:
             cursor.execute("""
                 UPDATE pays 
@@ -170,11 +177,30 @@ def enrichir_pays_summary(df_summary):
     print(f"✅ {compteur} pays enrichis")
     return True
 
+def _entretenir():
+    try:
+        vacuum_analyze()
+    except Exception as e:
+        print(f"⚠️ VACUUM ANALYZE non effectué: {e}")
+
+def _publier_version():
+    try:
+        print(f"📣 Version des données: {publish_version('etl')}")
+    except Exception as e:
+        print(f"⚠️ Version des données non publiée: {e}")
+
 def etl_complet():
     """Lance l'ETL complet"""
     print("🚀 DEBUT ETL PANDEMIES")
     print("=" * 40)
     
+    # 0. Schéma (tables, partitions, index) à jour
+    try:
+        migrate()
+    except Exception as e:
+        print(f"❌ Erreur migration du schéma: {e}")
+        return False
+    
     # 1. Nettoyer les données
     try:
         covid_daily = nettoyer_covid_daily()
@@ -184,25 +210,30 @@ def etl_complet():
         print(f"❌ Erreur nettoyage: {e}")
         return False
     
-    # 2. Insérer les pays
-    if not inserer_pays([covid_daily, monkeypox, covid_summary]):
-        print("❌ Erreur insertion pays")
-        return False
-    
-    # 3. Enrichir les pays
-    if not enrichir_pays_summary(covid_summary):
-        print("❌ Erreur enrichissement pays")
-        return False
-    
-    # 4. Insérer les statistiques
-    if not inserer_statistiques_covid(covid_daily):
-        print("❌ Erreur insertion COVID")
-        return False
-    
-    if not inserer_statistiques_monkeypox(monkeypox):
-        print("❌ Erreur insertion Monkeypox")
-        return False
-    
+    try:
+        # 2. Insérer les pays
+        if not inserer_pays([covid_daily, monkeypox, covid_summary]):
+            print("❌ Erreur insertion pays")
+            return False
+        
+        # 3. Enrichir les pays
+        if not enrichir_pays_summary(covid_summary):
+            print("❌ Erreur enrichissement pays")
+            return False
+        
+        # 4. Insérer les statistiques
+        if not inserer_statistiques_covid(covid_daily):
+            print("❌ Erreur insertion COVID")
+            return False
+        
+        if not inserer_statistiques_monkeypox(monkeypox):
+            print("❌ Erreur insertion Monkeypox")
+            return False
+    finally:
+        _entretenir()  # statistiques du planificateur à jour avant d'annoncer la version
+        # données (même partiellement) commitées : API et dashboard invalident leurs caches
+        _publier_version()
+
     print("=" * 40)
     print("🎉 ETL TERMINE AVEC SUCCES !")
     
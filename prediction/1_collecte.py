@@ -1,12 +1,17 @@
 # prediction/1_collecte.py
+import argparse
 import os
+import time
+from pathlib import Path
+
 import pandas as pd
 import psycopg2
 import psycopg2.extras
 from datetime import datetime
 from dotenv import load_dotenv
 
-from prediction.config import CLEAN_DATA_CSV, MALADIE_CIBLE
+from prediction.config import CLEAN_DATA_CSV, COLLECT_MODE, EXPORT_CSV, MALADIE_CIBLE
+from prediction.datasets import CLEAN_SCHEMA, csv_to_dataset, dataset_path, write_table
 
 load_dotenv() 
 
@@ -36,6 +41,56 @@ WHERE m.nom_maladie = %s
 ORDER BY p.nom_pays, s.date_stat;
 """
 
+# Même requête, nettoyage minimal fait côté serveur : le résultat peut partir tel quel
+# dans un COPY ... TO STDOUT, sans jamais être matérialisé en Python.
+SQL_STREAM = """
+SELECT
+    s.date_stat,
+    p.nom_pays,
+    p.continent,
+    p.population,
+    COALESCE(s.nouveaux_cas, 0)::bigint AS nouveaux_cas,
+    COALESCE(s.cas_totaux, 0)::bigint   AS cas_totaux
+FROM statistique s
+JOIN pays p    ON s.id_pays = p.id_pays
+JOIN maladie m ON s.id_maladie = m.id_maladie
+WHERE m.nom_maladie = %s
+  AND p.population > 0
+  AND COALESCE(s.nouveaux_cas, 0) >= 0
+  AND COALESCE(s.cas_totaux, 0) >= 0
+ORDER BY p.nom_pays, s.date_stat
+"""
+
+COPY_BUFFER = 1 << 20  # octets lus/écrits par bloc pendant le COPY
+
+
+def run_collect_stream(maladie: str = MALADIE_CIBLE, export_csv: bool = EXPORT_CSV) -> int:
+    """Collecte en flux : COPY (SELECT ...) TO STDOUT vers un CSV, converti par blocs en
+    dataset Parquet partitionné. Aucune ligne ne passe par un dict Python ; la mémoire
+    ne dépend pas du volume. Le CSV n'est conservé que si export_csv."""
+    print(f" Collecte (COPY streaming) depuis PostgreSQL pour: {maladie}")
+    t0 = time.perf_counter()
+    tmp = Path(str(CLEAN_DATA_CSV) + ".tmp")
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            query = cur.mogrify(SQL_STREAM, (maladie,)).decode()
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", f, size=COPY_BUFFER)
+            n = cur.rowcount
+        out = dataset_path(CLEAN_DATA_CSV)
+        csv_to_dataset(tmp, out, column_types=CLEAN_SCHEMA)
+    finally:
+        conn.close()
+    if export_csv:
+        os.replace(tmp, CLEAN_DATA_CSV)
+        print(f"clean_data.csv écrit → {CLEAN_DATA_CSV.resolve()}")
+    else:
+        tmp.unlink(missing_ok=True)
+    print(f"clean_data écrit → {out.resolve()}  ({n:,} lignes, {time.perf_counter() - t0:.1f}s)")
+    return n
+
+
 def run_collect(maladie: str = MALADIE_CIBLE):
     print(f" Collecte depuis PostgreSQL pour: {maladie}")
     with get_conn() as conn:
@@ -51,9 +106,17 @@ def run_collect(maladie: str = MALADIE_CIBLE):
     df = df[df["cas_totaux"].fillna(0) >= 0]
 
     df.sort_values(["nom_pays", "date_stat"], inplace=True)
-    df.to_csv(CLEAN_DATA_CSV, index=False)
-    print(f"clean_data.csv écrit → {CLEAN_DATA_CSV.resolve()}  ({len(df):,} lignes)")
+    out = write_table(df, CLEAN_DATA_CSV)
+    print(f"clean_data écrit → {out.resolve()}  ({len(df):,} lignes)")
     return df
 
 if __name__ == "__main__":
-    run_collect()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["copy", "fetchall"], default=COLLECT_MODE,
+                    help="copy : COPY TO STDOUT en flux ; fetchall : DataFrame en mémoire (historique)")
+    ap.add_argument("--maladie", default=MALADIE_CIBLE)
+    args = ap.parse_args()
+    if args.mode == "copy":
+        run_collect_stream(args.maladie)
+    else:
+        run_collect(args.maladie)
@@ -1,35 +1,171 @@
 # prediction/2_features_engineering.py
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-from prediction.config import CLEAN_DATA_CSV, FEATURES_CSV, TARGET_COL
+from prediction.config import CLEAN_DATA_CSV, EXPORT_CSV, FEATURES_CSV, TARGET_COL, FEATURE_SPECS
+from prediction.datasets import (
+    append_dataset, dataset_path, has_dataset, iter_table, primary_source, read_table, write_table,
+)
+from prediction.feature_kernel import compute_feature_kernel, history_needed
+from prediction.feature_store import append_feature_store, export_feature_store, feature_store_path
 
-ROLL = 7  # fenêtre des moyennes mobiles
+TAIL = history_needed(FEATURE_SPECS)  # lignes d'historique nécessaires pour une nouvelle ligne
+FEATURE_NAMES = [name for name, *_ in FEATURE_SPECS]
+CHUNK_ROWS = 200_000
+
+
+def state_path(features_csv) -> Path:
+    """Dernière date de clean_data traitée par pays, et date de début de ses TAIL dernières
+    lignes (historique à relire), pour le mode incrémental."""
+    return Path(features_csv).with_suffix(".state.json")
 
-def run_features():
-    print("🧪 Feature engineering à partir de clean_data.csv")
-    df = pd.read_csv(CLEAN_DATA_CSV, parse_dates=["date_stat"])
 
+def compute_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Cible + features de FEATURE_SPECS sur un df trié par (pays, date). Ne supprime aucune ligne."""
     # Cible: taux = nouveaux_cas / population
     df[TARGET_COL] = (df["nouveaux_cas"] / df["population"]).clip(lower=0)
 
-    # Groupby pays pour calculer lags et rollings
-    df = df.sort_values(["nom_pays", "date_stat"]).copy()
-    grp = df.groupby("nom_pays", group_keys=False)
+    # Lags / fenêtres de tous les pays en une passe (bornes de groupe + cumsum)
+    for name, values in compute_feature_kernel(df, FEATURE_SPECS, group_col="nom_pays").items():
+        df[name] = values
+    return df
+
 
-    df["nouveaux_cas_j-1"]      = grp["nouveaux_cas"].shift(1)
-    df["taux_transmission_j-1"] = grp[TARGET_COL].shift(1)
+def _tail_from(df: pd.DataFrame) -> pd.Series:
+    """Date de la plus ancienne des TAIL dernières lignes de chaque pays (df trié)."""
+    return df.groupby("nom_pays").tail(TAIL).groupby("nom_pays")["date_stat"].min()
 
-    df["moyenne_7j_nouveaux_cas"] = grp["nouveaux_cas"].rolling(ROLL, min_periods=ROLL).mean().reset_index(level=0, drop=True)
-    df["moyenne_7j_taux"]         = grp[TARGET_COL].rolling(ROLL, min_periods=ROLL).mean().reset_index(level=0, drop=True)
+
+def _write_state(last_dates: pd.Series, tail_from: pd.Series):
+    day = lambda s: {p: d.strftime("%Y-%m-%d") for p, d in s.items()}  # noqa: E731
+    state = {"specs": [list(s) for s in FEATURE_SPECS], "last_dates": day(last_dates), "tail_from": day(tail_from)}
+    state_path(FEATURES_CSV).write_text(json.dumps(state, indent=1), encoding="utf-8")
+
+
+def _read_state():
+    p = state_path(FEATURES_CSV)
+    if not p.exists():
+        return None
+    state = json.loads(p.read_text(encoding="utf-8"))
+    if state.get("specs") != [list(s) for s in FEATURE_SPECS]:
+        return None  # features changées : tout est à recalculer
+    dates = lambda d: pd.to_datetime(pd.Series(d, dtype=object))  # noqa: E731
+    # état d'avant tail_from : clean_data relu en entier
+    return dates(state["last_dates"]), dates(state["tail_from"]) if "tail_from" in state else None
+
+
+def run_features():
+    print("🧪 Feature engineering à partir de clean_data")
+    df = read_table(CLEAN_DATA_CSV)
+    df = df.sort_values(["nom_pays", "date_stat"]).copy()
+    df = compute_features(df)
+    last_dates = df.groupby("nom_pays")["date_stat"].max()
+    tail_from = _tail_from(df)
 
     # Drop NA (causés par shift/rolling au début des séries)
     before = len(df)
-    df = df.dropna(subset=["nouveaux_cas_j-1", "taux_transmission_j-1", "moyenne_7j_nouveaux_cas", "moyenne_7j_taux"])
+    df = df.dropna(subset=FEATURE_NAMES)
     after = len(df)
     print(f"🔧 Drop lignes incomplètes: {before - after} lignes supprimées")
 
-    df.to_csv(FEATURES_CSV, index=False)
-    print(f" features_data.csv écrit → {FEATURES_CSV.resolve()}  ({len(df):,} lignes)")
+    out = write_table(df, FEATURES_CSV)
+    _write_state(last_dates, tail_from)
+    print(f" features_data écrit → {out.resolve()}  ({len(df):,} lignes)")
+    # Copie mmap (colonnes .npy) lue par l'API, partagée entre workers
+    export_feature_store(df, feature_store_path(FEATURES_CSV), source=primary_source(FEATURES_CSV))
     return df
 
+
+def _scan_new_rows(last_dates: pd.Series, tail_from: pd.Series = None):
+    """Parcourt clean_data par blocs et ne garde que :
+    - les lignes postérieures à la dernière date traitée de leur pays (ou pays nouveau) ;
+    - par pays, les TAIL dernières lignes déjà traitées (historique des fenêtres).
+    Seules les lignes datées d'après le plus ancien début d'historique (tail_from) sont
+    lues, plus celles des pays nouveaux : filtre poussé à Arrow pour le dataset.
+    """
+    since = tail_from.min() if tail_from is not None and len(tail_from) else None
+    new_parts, tail = [], None
+    for chunk in iter_table(CLEAN_DATA_CSV, CHUNK_ROWS, since=since, known=list(last_dates.index)):
+        last = chunk["nom_pays"].map(last_dates)
+        is_new = last.isna() | (chunk["date_stat"] > last)
+        new_parts.append(chunk[is_new])
+        old = chunk[~is_new]
+        tail = old if tail is None else pd.concat([tail, old])
+        tail = tail.sort_values(["nom_pays", "date_stat"]).groupby("nom_pays").tail(TAIL)
+    return pd.concat(new_parts), tail
+
+
+def run_features_incremental():
+    """Ajoute au feature store uniquement les jours nouveaux de chaque pays.
+
+    Suppose clean_data en ajout seul (pas de révision des jours déjà traités) ;
+    `check_consistency()` vérifie l'équivalence avec un recalcul complet.
+    """
+    state = _read_state()
+    if state is None or not primary_source(FEATURES_CSV).exists():
+        print("ℹ️ Pas d'état incrémental exploitable → recalcul complet")
+        return run_features()
+
+    print("🧪 Feature engineering incrémental à partir de clean_data")
+    last_dates, tail_from = state
+    new, tail = _scan_new_rows(last_dates, tail_from)
+    if new.empty:
+        print(" Aucune nouvelle ligne.")
+        return new
+
+    # Historique + nouvelles lignes, puis on ne garde que les nouvelles
+    new = new.assign(_new=True)
+    work = pd.concat([tail.assign(_new=False), new]).sort_values(["nom_pays", "date_stat"])
+    work = compute_features(work)
+    out = work[work["_new"]].drop(columns="_new").dropna(subset=FEATURE_NAMES)
+
+    if has_dataset(FEATURES_CSV):
+        append_dataset(out, dataset_path(FEATURES_CSV))
+    if FEATURES_CSV.exists() and (EXPORT_CSV or not has_dataset(FEATURES_CSV)):
+        header = pd.read_csv(FEATURES_CSV, nrows=0).columns
+        out[header].to_csv(FEATURES_CSV, mode="a", header=False, index=False)
+    last_dates = pd.concat([last_dates, new.groupby("nom_pays")["date_stat"].max()])
+    tail_from = pd.concat([tail_from if tail_from is not None else _tail_from(tail), _tail_from(work)])
+    _write_state(last_dates.groupby(level=0).max(), tail_from.groupby(level=0).max())
+    print(f" {len(out):,} lignes ajoutées à {primary_source(FEATURES_CSV).resolve()} ({len(new):,} nouvelles lignes lues)")
+
+    # Store mmap : nouvelle partie avec les seules lignes ajoutées
+    store = feature_store_path(FEATURES_CSV)
+    if store.exists():
+        append_feature_store(out, store, source=primary_source(FEATURES_CSV))
+    return out
+
+
+def check_consistency(rtol: float = 1e-9) -> bool:
+    """Compare features_data (éventuellement incrémental) à un recalcul complet en mémoire."""
+    ref = read_table(CLEAN_DATA_CSV).sort_values(["nom_pays", "date_stat"])
+    ref = compute_features(ref).dropna(subset=FEATURE_NAMES)
+    cur = read_table(FEATURES_CSV)
+
+    key = ["nom_pays", "date_stat"]
+    ref = ref.sort_values(key).reset_index(drop=True)
+    cur = cur.sort_values(key).reset_index(drop=True)[ref.columns]
+    if len(ref) != len(cur) or not ref[key].equals(cur[key]):
+        print(f"❌ Lignes différentes: store {len(cur):,} vs recalcul {len(ref):,}")
+        return False
+    num = ref.select_dtypes("number").columns
+    a, b = cur[num].to_numpy(float), ref[num].to_numpy(float)
+    ok = bool(np.all(np.isclose(a, b, rtol=rtol, atol=0, equal_nan=True)))
+    print("✅ Store identique au recalcul complet" if ok else "❌ Valeurs différentes du recalcul complet")
+    return ok
+
+
 if __name__ == "__main__":
-    run_features()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--incremental", action="store_true", help="n'ajoute que les jours nouveaux")
+    ap.add_argument("--check", action="store_true", help="vérifie le store contre un recalcul complet")
+    args = ap.parse_args()
+    if args.incremental:
+        run_features_incremental()
+    else:
+        run_features()
+    if args.check:
+        raise SystemExit(0 if check_consistency() else 1)
@@ -1,12 +1,18 @@
 # prediction/4_prediction_rf.py
+import argparse
+
 import pandas as pd
 from joblib import load
-from prediction.config import FEATURES_CSV, PREDICTIONS_CSV, MODEL_PATH, FEATURE_COLS, TARGET_COL
+from prediction.config import (
+    FEATURES_CSV, PREDICTIONS_CSV, PREDICTIONS_DB, MALADIE_CIBLE, MODEL_PATH, FEATURE_COLS, TARGET_COL,
+)
+from prediction.datasets import read_table, write_table
 
-def run_predict_batch():
+def run_predict_batch(to_db: bool = PREDICTIONS_DB):
     print("🔮 Inférence batch pour contrôle")
     model = load(MODEL_PATH)
-    data = pd.read_csv(FEATURES_CSV, parse_dates=["date_stat"])
+    cols = list(dict.fromkeys(["date_stat", "nom_pays", "population", TARGET_COL, *FEATURE_COLS]))
+    data = read_table(FEATURES_CSV, columns=cols)
 
     X = data[FEATURE_COLS].copy()
     y_true = data[TARGET_COL].astype(float).values
@@ -18,9 +24,15 @@ def run_predict_batch():
     out["taux_pred"] = y_pred
     out["nouveaux_cas_pred"] = (out["taux_pred"] * out["population"]).clip(lower=0)
 
-    out.to_csv(PREDICTIONS_CSV, index=False)
-    print(f"✅ Fichier écrit → {PREDICTIONS_CSV.resolve()}  ({len(out):,} lignes)")
+    path = write_table(out, PREDICTIONS_CSV)
+    print(f"✅ Prédictions écrites → {path.resolve()}  ({len(out):,} lignes)")
+    if to_db:
+        from prediction.predictions_db import publish_file
+        publish_file(MODEL_PATH, out, MALADIE_CIBLE)
     return out
 
 if __name__ == "__main__":
-    run_predict_batch()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", action="store_true", default=PREDICTIONS_DB,
+                    help="publie aussi les prédictions dans PostgreSQL (table prediction)")
+    run_predict_batch(ap.parse_args().db)
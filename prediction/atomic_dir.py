@@ -0,0 +1,58 @@
+# prediction/atomic_dir.py
+# Remplacement atomique des artefacts en dossier (datasets Parquet, .forest, .store) lus
+# par les workers de l'API pendant qu'on les réécrit. Le chemin publié est un lien
+# symbolique vers une version <nom>@<id> ; la bascule est un os.replace du lien (rename
+# atomique) : un lecteur voit l'ancienne version ou la nouvelle, jamais aucune.
+# La version remplacée est gardée jusqu'à la bascule suivante, pour un lecteur qui a
+# résolu le lien juste avant et ouvre encore ses fichiers (meta.json puis les .npy) ;
+# les mmaps déjà ouverts restent valides après sa suppression.
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+
+def _versions(path: Path) -> list:
+    return list(path.parent.glob(f"{path.name}@*"))
+
+
+def _current(path: Path):
+    return path.with_name(os.readlink(path)) if path.is_symlink() else None
+
+
+def replace_dir(tmp, path) -> Path:
+    """Publie le dossier `tmp` sous `path` ; supprime les versions antérieures à la
+    version remplacée."""
+    tmp, path = Path(tmp), Path(path)
+    previous = _current(path)
+    target = path.with_name(f"{path.name}@{uuid.uuid4().hex[:12]}")
+    os.replace(tmp, target)
+    link = path.with_name(path.name + ".link")
+    if link.is_symlink():
+        link.unlink()
+    os.symlink(target.name, link)  # relatif : le dossier parent peut être déplacé
+    aside = None
+    if path.is_dir() and not path.is_symlink():
+        # dossier réel (écrit avant les liens) : mis de côté juste avant la bascule,
+        # seul instant (deux renames) où `path` manque
+        aside = path.with_name(path.name + ".old")
+        shutil.rmtree(aside, ignore_errors=True)
+        os.replace(path, aside)
+    os.replace(link, path)
+    if aside is not None:
+        shutil.rmtree(aside, ignore_errors=True)
+    for old in _versions(path):  # avant-dernière version, restes d'une bascule interrompue
+        if old not in (target, previous):
+            shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def remove_dir(path):
+    """Supprime un artefact publié par replace_dir (lien et version) ou un dossier réel."""
+    path = Path(path)
+    if path.is_symlink():
+        path.unlink()
+    else:
+        shutil.rmtree(path, ignore_errors=True)
+    for old in _versions(path):
+        shutil.rmtree(old, ignore_errors=True)
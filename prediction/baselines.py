@@ -0,0 +1,23 @@
+# prediction/baselines.py
+# Modèles de référence (API sklearn) : module à part pour que les .pkl référencent
+# prediction.baselines.* et se rechargent dans l'API, quel que soit le script d'entraînement.
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+
+from prediction.config import TARGET_COL
+
+
+class PersistenceRegressor(RegressorMixin, BaseEstimator):
+    """Prédit la valeur de la veille (colonne `column` des features) : le score à battre."""
+
+    def __init__(self, column: str = f"{TARGET_COL}_j-1"):
+        self.column = column
+
+    def fit(self, X, y=None):
+        self.n_features_in_ = X.shape[1]
+        self.col_ = list(X.columns).index(self.column)
+        return self
+
+    def predict(self, X):
+        X = X.to_numpy() if hasattr(X, "to_numpy") else np.asarray(X)
+        return X[:, self.col_].astype(float)
@@ -0,0 +1,168 @@
+# prediction/compact_forest.py
+# Forêt "compilée" : tous les arbres à plat dans quelques tableaux numpy contigus
+# (feature, threshold, children, value), sauvegardés en .npy pour être ouverts
+# en mmap. L'évaluation parcourt tous les arbres et toutes les lignes d'un coup.
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from prediction.atomic_dir import replace_dir
+from prediction.stamps import source_stamp
+
+FORMAT_VERSION = 1
+_ARRAYS = ("feature", "threshold", "children", "value", "missing_left", "roots")
+
+
+def compact_path(model_path) -> Path:
+    """Emplacement du format compact associé à un .pkl (même nom, suffixe .forest)."""
+    return Path(model_path).with_suffix(".forest")
+
+
+def _trees_of(model):
+    if hasattr(model, "estimators_") and all(hasattr(e, "tree_") for e in np.ravel(model.estimators_)):
+        return [e.tree_ for e in np.ravel(model.estimators_)]
+    if hasattr(model, "tree_"):
+        return [model.tree_]
+    raise TypeError(f"Modèle non compilable (forêt/arbre sklearn attendu): {type(model).__name__}")
+
+
+def compile_forest(model) -> dict:
+    """Aplatit les arbres sklearn en tableaux globaux (indices de noeuds concaténés).
+
+    `children[i] = (gauche, droite)` ; les feuilles pointent sur elles-mêmes, ce qui
+    permet de les repérer pendant l'évaluation (enfant == noeud courant).
+    """
+    trees = _trees_of(model)
+    sizes = np.array([t.node_count for t in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+
+    feature, threshold, children, value, missing_left = [], [], [], [], []
+    for off, t in zip(roots, trees):
+        ids = np.arange(t.node_count, dtype=np.int64)
+        leaf = t.children_left == -1
+        feature.append(np.where(leaf, 0, t.feature))
+        threshold.append(np.where(leaf, 0.0, t.threshold))
+        children.append(np.column_stack([np.where(leaf, ids, t.children_left),
+                                         np.where(leaf, ids, t.children_right)]) + off)
+        value.append(t.value[:, 0, 0])
+        mgl = getattr(t, "missing_go_to_left", None)
+        missing_left.append(np.zeros(t.node_count, bool) if mgl is None else (np.asarray(mgl) != 0) & ~leaf)
+
+    arrays = {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "children": np.concatenate(children).astype(np.int32),
+        "value": np.concatenate(value).astype(np.float64),
+        "missing_left": np.concatenate(missing_left).astype(bool),
+        "roots": roots,
+    }
+    names = getattr(model, "feature_names_in_", None)
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_trees": len(trees),
+        "n_nodes": int(sizes.sum()),
+        "max_depth": int(max(t.max_depth for t in trees)),
+        "n_features": int(model.n_features_in_),
+        "feature_names": None if names is None else [str(n) for n in names],
+    }
+    return {"arrays": arrays, "meta": meta}
+
+
+def save_compact_forest(model, path, source=None) -> Path:
+    """Compile et écrit le répertoire .forest (écriture atomique via un dossier temporaire).
+
+    `source` (le .pkl d'origine) sert à détecter un format compact périmé au chargement.
+    """
+    path = Path(path)
+    compiled = compile_forest(model)
+    meta = compiled["meta"]
+    if source is not None:
+        meta["source"] = source_stamp(source)
+
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, arr in compiled["arrays"].items():
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(arr))
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    replace_dir(tmp, path)
+    return path
+
+
+class CompactForest:
+    """Évaluateur vectorisé d'une forêt compilée (même API `predict` que sklearn)."""
+
+    def __init__(self, arrays: dict, meta: dict):
+        self.meta = meta
+        self.feature_names = meta.get("feature_names")
+        self.n_features_in_ = meta["n_features"]
+        for name in _ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def predict(self, X, chunk_rows: int = 2048) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names] if self.feature_names else X
+            X = X.to_numpy()
+        # sklearn compare en float32 (DTYPE des arbres) : on reproduit la même conversion
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X doit avoir {self.n_features_in_} colonnes, reçu {X.shape}")
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_rows):
+            out[start:start + chunk_rows] = self._predict_chunk(X[start:start + chunk_rows])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        # Une paire (ligne, arbre) par élément ; les paires arrivées en feuille sont
+        # accumulées puis retirées, le travail suit donc la profondeur réelle des chemins.
+        n, n_feat = X.shape
+        flat = X.ravel()
+        has_nan = np.isnan(flat).any()
+        row = np.repeat(np.arange(n, dtype=np.int64), self.roots.size)
+        node = np.tile(self.roots, n)
+        total = np.zeros(n)
+        for _ in range(self.meta["max_depth"] + 1):
+            x = flat.take(row * n_feat + self.feature.take(node))
+            go_left = x <= self.threshold.take(node)
+            if has_nan:
+                go_left |= np.isnan(x) & self.missing_left.take(node)
+            nxt = self.children.take(2 * node + ~go_left)
+            leaf = nxt == node
+            if leaf.any():
+                total += np.bincount(row[leaf], weights=self.value.take(node[leaf]), minlength=n)
+                keep = ~leaf
+                row, nxt = row[keep], nxt[keep]
+                if nxt.size == 0:
+                    break
+            node = nxt
+        return total / self.roots.size
+
+
+def load_compact_forest(path, mmap: bool = True) -> CompactForest:
+    """Ouvre un répertoire .forest ; en mmap les pages sont partagées entre process."""
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Format compact non supporté: {meta.get('format_version')}")
+    mode = "r" if mmap else None
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mode) for name in _ARRAYS}
+    return CompactForest(arrays, meta)
+
+
+def export_compact(model_path=None) -> Path:
+    """Compile le modèle .pkl entraîné vers son format compact (.forest)."""
+    from joblib import load
+    from prediction.config import MODEL_PATH
+
+    model_path = Path(model_path or MODEL_PATH)
+    out = save_compact_forest(load(model_path), compact_path(model_path), source=model_path)
+    print(f" Forêt compacte écrite → {out.resolve()}")
+    return out
+
+
+if __name__ == "__main__":
+    export_compact()
@@ -10,9 +10,51 @@ MODEL_PATH = Path(os.getenv("MODEL_PATH", ARTIFACTS_DIR / "model_taux_transmissi
 CLEAN_DATA_CSV  = Path(os.getenv("CLEAN_DATA_CSV", Path.cwd() / "clean_data.csv"))
 FEATURES_CSV    = Path(os.getenv("FEATURES_CSV", Path.cwd() / "features_data.csv"))
 PREDICTIONS_CSV = Path(os.getenv("PREDICTIONS_CSV", Path.cwd() / "predictions_resultats_rf.csv"))
+SEARCH_REPORT_CSV = Path(os.getenv("SEARCH_REPORT_CSV", ARTIFACTS_DIR / "search_report.csv"))
+PIPELINE_STATE = Path(os.getenv("PIPELINE_STATE", ARTIFACTS_DIR / "pipeline_state.json"))
+BENCHMARK_REPORT = Path(os.getenv("BENCHMARK_REPORT", ARTIFACTS_DIR / "model_benchmark.json"))
+
+# Les artefacts sont des datasets Parquet partitionnés par pays (<nom>.parquet/, cf.
+# prediction/datasets.py) ; les chemins *_CSV ci-dessus servent de base de nommage.
+# EXPORT_CSV=1 écrit en plus les CSV historiques.
+EXPORT_CSV = os.getenv("EXPORT_CSV", "0") == "1"
 
 MALADIE_CIBLE = os.getenv("MALADIE_CIBLE", "covid_19")
 
+# Collecte : "copy" (COPY TO STDOUT en flux vers le CSV) ou "fetchall" (DataFrame en mémoire)
+COLLECT_MODE = os.getenv("COLLECT_MODE", "copy").lower()
+
+# Source des features : "csv" (features_data.csv + store mmap) ou "db" (vue matérialisée
+# `features` calculée dans PostgreSQL, cf. prediction/features_sql.py)
+FEATURES_SOURCE = os.getenv("FEATURES_SOURCE", "csv").lower()
+
+# Prédictions batch : PREDICTIONS_DB=1 les publie aussi dans PostgreSQL (table prediction).
+# Service ML : "live" (modèle chargé dans l'API) ou "db" (séries lues dans la table).
+PREDICTIONS_DB = os.getenv("PREDICTIONS_DB", "0") == "1"
+ML_SERVING_MODE = os.getenv("ML_SERVING_MODE", "live").lower()
+# Modèles gardés en mémoire par worker API (un par maladie, LRU)
+ML_MAX_MODELS = int(os.getenv("ML_MAX_MODELS", "2"))
+# Micro-batching des prédictions de l'API (api/inference.py) : les appels arrivés dans
+# la même fenêtre (ML_BATCH_MAX_WAIT_MS) sont fusionnés, jusqu'à ML_BATCH_MAX_ROWS lignes,
+# et évalués par ML_INFERENCE_WORKERS threads (0 = un par coeur). ML_BATCHING=0 : appel direct.
+ML_BATCHING = os.getenv("ML_BATCHING", "1") == "1"
+ML_BATCH_MAX_ROWS = int(os.getenv("ML_BATCH_MAX_ROWS", "8192"))
+ML_BATCH_MAX_WAIT_MS = float(os.getenv("ML_BATCH_MAX_WAIT_MS", "2"))
+ML_INFERENCE_WORKERS = int(os.getenv("ML_INFERENCE_WORKERS", "0"))
+# Caches LRU par worker API : features d'un pays et séries prédites (entrées par cache)
+ML_CACHE_ENTRIES = int(os.getenv("ML_CACHE_ENTRIES", "256"))
+
+# Entraînement : "budget" (halving aléatoire borné en temps) ou "grid" (exhaustif)
+TRAIN_MODE = os.getenv("TRAIN_MODE", "budget")
+TRAIN_BUDGET_S = float(os.getenv("TRAIN_BUDGET_S", "300"))
+# Estimateurs en compétition (prediction/training.py) : rf, hgb, linear, persistence
+TRAIN_BACKENDS = [b for b in os.getenv("TRAIN_BACKENDS", "rf").lower().split(",") if b]
+# Finalistes de la recherche réentraînés puis mesurés (latence, taille, mémoire, cf.
+# prediction/model_benchmark.py) ; budgets de service optionnels pour le choix final
+TRAIN_FINALISTS = int(os.getenv("TRAIN_FINALISTS", "3"))
+SELECT_MAX_P99_MS = float(os.getenv("SELECT_MAX_P99_MS")) if os.getenv("SELECT_MAX_P99_MS") else None
+SELECT_MAX_SIZE_MB = float(os.getenv("SELECT_MAX_SIZE_MB")) if os.getenv("SELECT_MAX_SIZE_MB") else None
+
 FEATURE_COLS = [
     "population",
     "nouveaux_cas",
@@ -23,6 +65,34 @@ FEATURE_COLS = [
 ]
 
 TARGET_COL = "taux_transmission"
+
+# Features dérivées calculées par prediction/feature_kernel.py :
+# (colonne produite, opération, colonne source, fenêtre ou décalage en jours)
+# opérations : "lag", "mean" / "sum" (fenêtre glissante), "growth" (x[t] / x[t-k])
+ROLL = 7  # fenêtre des moyennes mobiles
+FEATURE_SPECS = [
+    ("nouveaux_cas_j-1",        "lag",  "nouveaux_cas", 1),
+    ("taux_transmission_j-1",   "lag",  TARGET_COL,     1),
+    ("moyenne_7j_nouveaux_cas", "mean", "nouveaux_cas", ROLL),
+    ("moyenne_7j_taux",         "mean", TARGET_COL,     ROLL),
+]
+
+
+def paths_for(maladie: str) -> dict:
+    """Variables d'environnement isolant les artefacts d'une maladie dans
+    ARTIFACTS_DIR/<maladie>/ (à poser avant d'importer la config, ex. process enfant)."""
+    base = ARTIFACTS_DIR / maladie
+    return {
+        "MALADIE_CIBLE": maladie,
+        "ARTIFACTS_DIR": str(base),
+        "MODEL_PATH": str(base / MODEL_PATH.name),
+        "CLEAN_DATA_CSV": str(base / CLEAN_DATA_CSV.name),
+        "FEATURES_CSV": str(base / FEATURES_CSV.name),
+        "PREDICTIONS_CSV": str(base / PREDICTIONS_CSV.name),
+        "SEARCH_REPORT_CSV": str(base / SEARCH_REPORT_CSV.name),
+        "PIPELINE_STATE": str(base / PIPELINE_STATE.name),
+        "BENCHMARK_REPORT": str(base / BENCHMARK_REPORT.name),
+    }
 # prediction/config.py
 # from pathlib import Path
 
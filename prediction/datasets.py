@@ -0,0 +1,222 @@
+# prediction/datasets.py
+# Artefacts du pipeline en datasets Parquet partitionnés par pays (hive : nom_pays=xxx/).
+# Chaque consommateur ne lit que les colonnes (projection) et les pays (filtre poussé
+# au niveau des partitions) dont il a besoin ; plus de parsing texte ni de dates.
+# Le CSV historique n'est plus qu'un export optionnel (config.EXPORT_CSV).
+#   clean_data.csv → clean_data.parquet/, features_data.csv → features_data.parquet/ ...
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from prediction.atomic_dir import replace_dir
+
+PARTITION_COL = "nom_pays"
+DATE_COL = "date_stat"
+
+# Schéma de clean_data (sortie de la collecte), utilisé pour typer la conversion CSV
+CLEAN_SCHEMA = {
+    "date_stat": pa.date32(), "nom_pays": pa.string(), "continent": pa.string(),
+    "population": pa.float64(), "nouveaux_cas": pa.int64(), "cas_totaux": pa.int64(),
+}
+
+
+def dataset_path(csv_path) -> Path:
+    """Dossier du dataset associé à un chemin CSV de config (suffixe .parquet)."""
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(PARTITION_COL, pa.string())]), flavor="hive")
+
+
+def _write(data, base_dir, basename: str, behavior: str):
+    ds.write_dataset(data, base_dir, format="parquet", partitioning=_partitioning(),
+                     basename_template=basename, existing_data_behavior=behavior)
+
+
+def write_dataset(df: pd.DataFrame, path) -> Path:
+    """Écrit (remplace) le dataset : dossier temporaire publié atomiquement (replace_dir)."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    _write(table, tmp, "part-0-{i}.parquet", "error")
+    replace_dir(tmp, path)
+    return path
+
+
+def append_dataset(df: pd.DataFrame, path) -> Path:
+    """Ajoute des lignes : version suivante du dataset (fichiers existants en liens
+    physiques, sans copie, + nouveaux fichiers dans les partitions concernées) publiée par
+    replace_dir. Un lecteur voit tous les ajouts ou aucun, jamais un fichier en cours."""
+    path = Path(path)
+    if df.empty:
+        return path
+    schema = _dataset(path).schema  # mêmes types que les fichiers existants
+    table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(path, tmp, copy_function=os.link)
+    _write(table, tmp, f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet", "overwrite_or_ignore")
+    os.utime(tmp)  # copytree reprend le mtime de l'ancienne version : l'empreinte (stamps) doit changer
+    replace_dir(tmp, path)
+    return path
+
+
+def csv_to_dataset(csv_path, path, column_types=None, block_size: int = 8 << 20) -> int:
+    """Convertit un CSV en dataset par blocs (lecteur CSV streaming) : colonnes typées,
+    mémoire bornée par block_size quelle que soit la taille du fichier."""
+    import pyarrow.csv as pacsv
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    reader = pacsv.open_csv(csv_path, read_options=pacsv.ReadOptions(block_size=block_size),
+                            convert_options=pacsv.ConvertOptions(column_types=column_types or {}))
+    n = 0
+
+    def batches():
+        nonlocal n
+        for batch in reader:
+            n += batch.num_rows
+            yield batch
+
+    _write(ds.Scanner.from_batches(batches(), schema=reader.schema), tmp, "part-0-{i}.parquet", "error")
+    replace_dir(tmp, path)
+    return n
+
+
+def _dataset(path):
+    return ds.dataset(path, format="parquet", partitioning=_partitioning())
+
+
+def _filter(nom_pays):
+    if nom_pays is None:
+        return None
+    values = [nom_pays] if isinstance(nom_pays, str) else list(nom_pays)
+    return pc.field(PARTITION_COL).isin(values)
+
+
+def _to_pandas(table: pa.Table) -> pd.DataFrame:
+    df = table.to_pandas()
+    if DATE_COL in df:
+        df[DATE_COL] = pd.to_datetime(df[DATE_COL])
+    if PARTITION_COL in df:
+        df[PARTITION_COL] = df[PARTITION_COL].astype(str)
+    return df
+
+
+def _is_sorted(df: pd.DataFrame, key) -> bool:
+    if len(key) < 2:
+        return len(key) == 0 or df[key[0]].is_monotonic_increasing
+    p, d = df[key[0]].to_numpy(), df[key[1]].to_numpy()
+    same = p[1:] == p[:-1]
+    return bool((p[1:] >= p[:-1]).all() and (d[1:][same] >= d[:-1][same]).all())
+
+
+def read_dataset(path, columns=None, nom_pays=None) -> pd.DataFrame:
+    """Lit un dataset : seulement `columns`, seulement les partitions de `nom_pays`
+    (un nom ou une liste). Trié par (pays, date) comme les CSV historiques."""
+    dset = _dataset(path)
+    key = [c for c in (PARTITION_COL, DATE_COL) if c in dset.schema.names]
+    cols = None if not columns else list(dict.fromkeys([*columns, *key]))
+    df = _to_pandas(dset.to_table(columns=cols, filter=_filter(nom_pays)))
+    if not _is_sorted(df, key):  # partitions lues dans l'ordre des noms : cas rare (ajouts)
+        df = df.sort_values(key, kind="stable").reset_index(drop=True)
+    return df[list(columns)] if columns else df
+
+
+def _since_filter(dset, since, known):
+    """Lignes datées de `since` ou après, plus toutes celles des pays absents de `known`."""
+    if since is None:
+        return None
+    t = dset.schema.field(DATE_COL).type
+    value = pd.Timestamp(since).date() if pa.types.is_date(t) else pd.Timestamp(since).to_pydatetime()
+    expr = pc.field(DATE_COL) >= pa.scalar(value, type=t)
+    return expr | ~pc.field(PARTITION_COL).isin(list(known or ()))
+
+
+def iter_dataset(path, batch_rows: int = 200_000, columns=None, since=None, known=None):
+    """Parcourt le dataset par blocs de DataFrames (mémoire bornée) ; `since` / `known` :
+    cf. iter_table (filtre évalué par Arrow, groupes de lignes trop anciens sautés)."""
+    dset = _dataset(path)
+    # un lot Arrow par fichier de partition : regroupés jusqu'à batch_rows avant pandas
+    pending, n = [], 0
+    for batch in dset.to_batches(columns=columns, batch_size=batch_rows,
+                                 filter=_since_filter(dset, since, known)):
+        if batch.num_rows:
+            pending.append(batch)
+            n += batch.num_rows
+        if n >= batch_rows:
+            yield _to_pandas(pa.Table.from_batches(pending))
+            pending, n = [], 0
+    if pending:
+        yield _to_pandas(pa.Table.from_batches(pending))
+
+
+def dataset_countries(path) -> list:
+    """Pays présents, lus depuis les noms de partitions (aucune donnée lue)."""
+    dset = _dataset(path)
+    out = set()
+    for frag in dset.get_fragments():
+        value = ds.get_partition_keys(frag.partition_expression).get(PARTITION_COL)
+        if value is not None:
+            out.add(value)
+    return sorted(out)
+
+
+def dataset_columns(path) -> list:
+    return _dataset(path).schema.names
+
+
+def has_dataset(csv_path) -> bool:
+    return dataset_path(csv_path).is_dir()
+
+
+def primary_source(csv_path) -> Path:
+    """Artefact lu par défaut pour un chemin de config : le dataset s'il existe, sinon le CSV."""
+    return dataset_path(csv_path) if has_dataset(csv_path) else Path(csv_path)
+
+
+def read_table(csv_path, columns=None, nom_pays=None) -> pd.DataFrame:
+    """Lecture d'un artefact du pipeline : dataset Parquet si présent, sinon CSV."""
+    if has_dataset(csv_path):
+        return read_dataset(dataset_path(csv_path), columns, nom_pays)
+    usecols = None if not columns else list(dict.fromkeys([PARTITION_COL, *columns]))
+    df = pd.read_csv(csv_path, usecols=usecols)
+    if DATE_COL in df:
+        df[DATE_COL] = pd.to_datetime(df[DATE_COL])
+    if nom_pays is not None:
+        values = [nom_pays] if isinstance(nom_pays, str) else list(nom_pays)
+        df = df[df[PARTITION_COL].isin(values)]
+    return df[list(columns)] if columns else df
+
+
+def iter_table(csv_path, chunk_rows: int = 200_000, since=None, known=None):
+    """Parcours par blocs : dataset si présent, sinon CSV par chunks. Avec `since`, seules
+    les lignes datées de `since` ou après sont renvoyées, sauf pour les pays absents de
+    `known` (lus en entier)."""
+    if has_dataset(csv_path):
+        yield from iter_dataset(dataset_path(csv_path), chunk_rows, since=since, known=known)
+        return
+    for chunk in pd.read_csv(csv_path, parse_dates=[DATE_COL], chunksize=chunk_rows):
+        if since is not None:
+            chunk = chunk[(chunk[DATE_COL] >= since) | ~chunk[PARTITION_COL].isin(list(known or ()))]
+        yield chunk
+
+
+def write_table(df: pd.DataFrame, csv_path, export_csv: bool = None) -> Path:
+    """Écrit un artefact : dataset partitionné + export CSV optionnel. Renvoie le dataset."""
+    if export_csv is None:
+        from prediction.config import EXPORT_CSV
+        export_csv = EXPORT_CSV
+    out = write_dataset(df, dataset_path(csv_path))
+    if export_csv:
+        df.to_csv(csv_path, index=False)
+    return out
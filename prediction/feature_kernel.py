@@ -0,0 +1,85 @@
+# prediction/feature_kernel.py
+# Noyau de features vectorisé : lags, moyennes/sommes mobiles et ratios de croissance
+# calculés en une passe numpy sur des séries triées par (pays, date), sans repasser
+# par la machinerie groupby pour chaque feature.
+#   - bornes de groupe : offsets de début de chaque pays ;
+#   - fenêtres : somme directe des w décalages (résultat indépendant du point de départ) ;
+#   - début de série : masque NaN selon la position dans le groupe.
+import numpy as np
+import pandas as pd
+
+OPERATIONS = ("lag", "mean", "sum", "growth")
+
+
+def group_starts(keys) -> np.ndarray:
+    """Indices de début de chaque groupe (clés déjà triées / contiguës)."""
+    keys = np.asarray(keys)
+    if keys.size == 0:
+        return np.array([], dtype=np.int64)
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def position_in_group(n: int, starts: np.ndarray) -> np.ndarray:
+    """Rang de chaque ligne dans son groupe (0 pour la première ligne du pays)."""
+    idx = np.arange(n)
+    if n == 0:
+        return idx
+    return idx - np.repeat(starts, np.diff(np.r_[starts, n]))
+
+
+def _lag(x, k, pos):
+    out = np.full_like(x, np.nan)
+    out[k:] = x[:-k]
+    out[pos < k] = np.nan
+    return out
+
+
+def _rolling_sum(x, w, pos):
+    # sum(x[i-w+1..i]) par ajout des w décalages, dans le même ordre pour chaque ligne :
+    # le résultat ne dépend que des valeurs de la fenêtre, ni des autres pays ni du début
+    # du calcul (une différence de cumsum, si : cf. recalcul incrémental tail + nouveaux jours).
+    # NaN si fenêtre incomplète ou contenant un NaN.
+    out = x.copy()
+    for k in range(1, w):
+        out[k:] += x[:-k]
+    out[pos < w - 1] = np.nan
+    return out
+
+
+def history_needed(specs) -> int:
+    """Nombre de lignes passées nécessaires pour calculer la ligne courante."""
+    need = 0
+    for _, op, _, k in specs:
+        need = max(need, k if op in ("lag", "growth") else k - 1)
+    return need
+
+
+def compute_feature_kernel(df: pd.DataFrame, specs, group_col: str = "nom_pays") -> dict:
+    """Calcule toutes les features de `specs` ; `df` doit être trié par (groupe, date).
+
+    specs : liste de (nom, opération, colonne source, fenêtre ou décalage), cf. config.
+    Renvoie {nom: np.ndarray} aligné sur les lignes de df.
+    """
+    n = len(df)
+    pos = position_in_group(n, group_starts(df[group_col].to_numpy()))
+    cache = {}
+    out = {}
+    for name, op, col, k in specs:
+        if op not in OPERATIONS:
+            raise ValueError(f"Opération de feature inconnue: {op!r} ({name})")
+        if k < 1:
+            raise ValueError(f"Fenêtre/décalage invalide pour {name}: {k}")
+        if col not in cache:
+            cache[col] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        x = cache[col]
+        if op == "lag":
+            out[name] = _lag(x, k, pos)
+        elif op == "sum":
+            out[name] = _rolling_sum(x, k, pos)
+        elif op == "mean":
+            out[name] = _rolling_sum(x, k, pos) / k
+        else:  # growth : x[t] / x[t-k], NaN si la base est nulle
+            base = _lag(x, k, pos)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[name] = np.where(base != 0, x / base, np.nan)
+    return out
@@ -0,0 +1,172 @@
+# prediction/feature_store.py
+# Feature store en colonnes .npy (une par colonne), triées par (pays, date), avec un
+# index des bornes de chaque pays. Ouvert en mmap lecture seule : tous les workers
+# uvicorn partagent les mêmes pages du cache OS au lieu d'avoir chacun leur DataFrame.
+# Le mode incrémental ajoute des parties (nouveaux fichiers .npy + meta.json remplacé) au
+# lieu de tout réécrire ; un pays est alors une suite de tranches (partie, début, fin).
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from prediction.atomic_dir import replace_dir
+from prediction.stamps import source_stamp
+
+FORMAT_VERSION = 2
+MAX_PARTS = 32  # au-delà, un ajout recompacte le store en une seule partie
+COUNTRY_COL = "nom_pays"
+DATE_COL = "date_stat"
+
+
+def feature_store_path(features_csv) -> Path:
+    """Emplacement du store associé à un features_data.csv (suffixe .store)."""
+    return Path(features_csv).with_suffix(".store")
+
+
+def _col_file(i: int) -> str:
+    # noms de colonnes libres ("nouveaux_cas_j-1"...) : fichiers indexés par position
+    return f"col_{i:03d}.npy"
+
+
+def _bounds(df: pd.DataFrame):
+    pays = df[COUNTRY_COL].astype(str).to_numpy()
+    starts = np.flatnonzero(np.r_[True, pays[1:] != pays[:-1]]) if len(pays) else np.array([], int)
+    bounds = np.r_[starts, len(pays)]
+    return zip(pays[starts], bounds[:-1].tolist(), bounds[1:].tolist())
+
+
+def _column_array(s: pd.Series, kind: str) -> np.ndarray:
+    if kind == "datetime":
+        return pd.to_datetime(s).to_numpy(dtype="datetime64[ns]").view("int64")
+    return s.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _read_meta(path: Path) -> dict:
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("format_version") == 1:  # une seule partie
+        meta = {**meta, "format_version": 2, "parts": [meta["n_rows"]],
+                "columns": [{"name": c["name"], "kind": c["kind"], "files": [c["file"]]}
+                            for c in meta["columns"]],
+                "countries": {p: [[0, a, b]] for p, (a, b) in meta["countries"].items()}}
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Format de store non supporté: {meta.get('format_version')}")
+    return meta
+
+
+def _write_meta(path: Path, meta: dict, source=None):
+    if source is not None:
+        meta["source"] = source_stamp(source)
+    tmp = path / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    os.replace(tmp, path / "meta.json")
+
+
+def export_feature_store(df: pd.DataFrame, path, source=None) -> Path:
+    """Écrit le store : dossier temporaire publié atomiquement (replace_dir)."""
+    path = Path(path)
+    df = df.sort_values([COUNTRY_COL, DATE_COL], kind="stable")
+
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    columns = []
+    for i, col in enumerate(c for c in df.columns if c != COUNTRY_COL):
+        s = df[col]
+        if col == DATE_COL:
+            kind = "datetime"
+        elif pd.api.types.is_numeric_dtype(s):
+            kind = "float"
+        else:
+            continue  # colonnes texte (continent...) : inutiles au service ML
+        np.save(tmp / _col_file(i), np.ascontiguousarray(_column_array(s, kind)))
+        columns.append({"name": col, "kind": kind, "files": [_col_file(i)]})
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_rows": int(len(df)),
+        "parts": [int(len(df))],
+        "columns": columns,
+        "countries": {p: [[0, a, b]] for p, a, b in _bounds(df)},
+    }
+    _write_meta(tmp, meta, source)
+    replace_dir(tmp, path)
+    return path
+
+
+def append_feature_store(df: pd.DataFrame, path, source=None) -> Path:
+    """Ajoute des jours postérieurs à ceux du store, sans réécrire l'existant : une
+    nouvelle partie par colonne, puis meta.json remplacé atomiquement (un lecteur ouvert
+    sur l'ancien meta ne lit que des fichiers inchangés). Recompacte après MAX_PARTS."""
+    path = Path(path)
+    meta = _read_meta(path)
+    if df.empty:
+        _write_meta(path, meta, source)
+        return path
+    df = df.sort_values([COUNTRY_COL, DATE_COL], kind="stable")
+    if len(meta["parts"]) >= MAX_PARTS:
+        store = FeatureStore(path, mmap=False)
+        full = pd.concat([store.frame(p) for p in store.countries] + [df[store.columns]], ignore_index=True)
+        return export_feature_store(full, path, source)
+
+    part = len(meta["parts"])
+    for c in meta["columns"]:
+        name = f"{Path(c['files'][0]).stem}.{part}.npy"
+        np.save(path / name, np.ascontiguousarray(_column_array(df[c["name"]], c["kind"])))
+        c["files"].append(name)
+    for p, a, b in _bounds(df):
+        meta["countries"].setdefault(p, []).append([part, a, b])
+    meta["parts"].append(int(len(df)))
+    meta["n_rows"] += int(len(df))
+    _write_meta(path, meta, source)
+    return path
+
+
+class FeatureStore:
+    """Accès en lecture seule : une tranche par pays, seulement les colonnes demandées."""
+
+    def __init__(self, path, mmap: bool = True):
+        self.path = Path(path)
+        self.meta = _read_meta(self.path)
+        mode = "r" if mmap else None
+        self._cols = {c["name"]: ([np.load(self.path / f, mmap_mode=mode) for f in c["files"]], c["kind"])
+                      for c in self.meta["columns"]}
+
+    @property
+    def countries(self) -> list:
+        return list(self.meta["countries"])
+
+    @property
+    def columns(self) -> list:
+        return [COUNTRY_COL] + list(self._cols)
+
+    def frame(self, nom_pays: str, columns=None) -> pd.DataFrame:
+        """Lignes d'un pays (copie des tranches seulement) ; vide si pays inconnu."""
+        ranges = self.meta["countries"].get(nom_pays, [])
+        names = [c for c in (columns or self._cols) if c != COUNTRY_COL]
+        data = {}
+        for name in names:
+            parts, kind = self._cols[name]
+            part = (np.concatenate([parts[k][a:b] for k, a, b in ranges]) if ranges
+                    else np.array([], dtype="int64" if kind == "datetime" else "float64"))
+            data[name] = part.view("datetime64[ns]") if kind == "datetime" else part
+        out = pd.DataFrame(data)
+        out.insert(0, COUNTRY_COL, nom_pays)
+        return out
+
+
+def export_from_csv(features_csv=None) -> Path:
+    """Reconstruit le store à partir du features_data.csv courant."""
+    from prediction.config import FEATURES_CSV
+
+    features_csv = Path(features_csv or FEATURES_CSV)
+    df = pd.read_csv(features_csv, parse_dates=[DATE_COL])
+    out = export_feature_store(df, feature_store_path(features_csv), source=features_csv)
+    print(f" Feature store écrit → {out.resolve()}  ({len(df):,} lignes)")
+    return out
+
+
+if __name__ == "__main__":
+    export_from_csv()
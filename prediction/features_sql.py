@@ -0,0 +1,175 @@
+# prediction/features_sql.py
+# Étape features alternative, calculée dans PostgreSQL : la cible, les lags et les
+# moyennes mobiles de config.FEATURE_SPECS deviennent des fonctions de fenêtre
+# (LAG / AVG ... OVER (PARTITION BY maladie, pays ORDER BY date_stat ROWS k PRECEDING))
+# dans une vue matérialisée `features`, lue directement par l'entraînement et l'API.
+# Plus d'aller-retour clean_data.csv → pandas → features_data.csv.
+import argparse
+import hashlib
+import json
+import tempfile
+
+import pandas as pd
+from psycopg2 import sql
+
+from data_version import bump_version
+from db_config import get_connexion
+from prediction.config import FEATURE_SPECS, TARGET_COL
+
+VIEW = "features"
+
+_BASE = """
+    SELECT
+        m.nom_maladie,
+        s.id_pays,
+        p.nom_pays,
+        p.continent,
+        p.population,
+        s.date_stat,
+        COALESCE(s.nouveaux_cas, 0)::double precision AS nouveaux_cas,
+        COALESCE(s.cas_totaux, 0)::bigint             AS cas_totaux,
+        GREATEST(COALESCE(s.nouveaux_cas, 0)::double precision / p.population, 0) AS {target}
+    FROM statistique s
+    JOIN pays p    ON s.id_pays = p.id_pays
+    JOIN maladie m ON s.id_maladie = m.id_maladie
+    WHERE p.population > 0
+      AND COALESCE(s.nouveaux_cas, 0) >= 0
+      AND COALESCE(s.cas_totaux, 0) >= 0
+"""
+
+
+def _feature_expr(op: str, col: str, k: int) -> sql.Composable:
+    c = sql.Identifier(col)
+    frame = sql.SQL("(w ROWS BETWEEN {} PRECEDING AND CURRENT ROW)").format(sql.Literal(k - 1))
+    if op == "lag":
+        return sql.SQL("LAG({c}, {k}) OVER w").format(c=c, k=sql.Literal(k))
+    if op in ("mean", "sum"):
+        # min_periods = k comme côté pandas : NULL tant que la fenêtre n'est pas pleine
+        agg = sql.SQL("AVG" if op == "mean" else "SUM")
+        return sql.SQL("CASE WHEN COUNT({c}) OVER {f} = {k} THEN {agg}({c}) OVER {f} END").format(
+            c=c, f=frame, k=sql.Literal(k), agg=agg)
+    if op == "growth":
+        return sql.SQL("{c} / NULLIF(LAG({c}, {k}) OVER w, 0)").format(c=c, k=sql.Literal(k))
+    raise ValueError(f"Opération de feature inconnue: {op!r}")
+
+
+def build_features_query(specs=FEATURE_SPECS) -> sql.Composed:
+    """SELECT des features (lignes incomplètes en début de série exclues, comme dropna)."""
+    cols = [sql.SQL("({})::double precision AS {}").format(_feature_expr(op, col, k), sql.Identifier(name))
+            for name, op, col, k in specs]
+    not_null = [sql.SQL("{} IS NOT NULL").format(sql.Identifier(name)) for name, *_ in specs]
+    return sql.SQL("""
+WITH base AS ({base}),
+feat AS (
+    SELECT base.*, {cols}
+    FROM base
+    WINDOW w AS (PARTITION BY nom_maladie, id_pays ORDER BY date_stat)
+)
+SELECT * FROM feat WHERE {not_null}
+""").format(
+        base=sql.SQL(_BASE.format(target=TARGET_COL)),
+        cols=sql.SQL(",\n           ").join(cols),
+        not_null=sql.SQL(" AND ").join(not_null),
+    )
+
+
+def render_offline(q: sql.Composable) -> str:
+    """Texte SQL sans connexion (as_string en exige une) — pour --print et les tests."""
+    if isinstance(q, sql.Composed):
+        return "".join(render_offline(part) for part in q.seq)
+    if isinstance(q, sql.Identifier):
+        return ".".join('"' + s.replace('"', '""') + '"' for s in q.strings)
+    if isinstance(q, sql.Literal):
+        return str(int(q.wrapped))  # seuls des entiers (fenêtres, décalages) sont littéraux ici
+    return q.string
+
+
+def specs_signature(specs=FEATURE_SPECS) -> str:
+    return hashlib.sha256(json.dumps([list(s) for s in specs]).encode()).hexdigest()[:16]
+
+
+def refresh_features_view(conn=None):
+    """Crée (ou recrée si FEATURE_SPECS a changé) puis rafraîchit la vue `features`."""
+    own = conn is None
+    conn = conn or get_connexion()
+    sig = specs_signature()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT obj_description(to_regclass(%s), 'pg_class')", (VIEW,))
+            row = cur.fetchone()
+            current = row[0] if row else None
+            if current != sig:
+                print(f"🧱 (Re)création de la vue matérialisée {VIEW}")
+                cur.execute(sql.SQL("DROP MATERIALIZED VIEW IF EXISTS {}").format(sql.Identifier(VIEW)))
+                cur.execute(sql.SQL("CREATE MATERIALIZED VIEW {} AS {}").format(
+                    sql.Identifier(VIEW), build_features_query()))
+                # index unique : lectures par (maladie, pays) + REFRESH CONCURRENTLY
+                cur.execute(sql.SQL("CREATE UNIQUE INDEX {} ON {} (nom_maladie, nom_pays, date_stat)").format(
+                    sql.Identifier(f"{VIEW}_maladie_pays_date"), sql.Identifier(VIEW)))
+                cur.execute(sql.SQL("COMMENT ON MATERIALIZED VIEW {} IS {}").format(
+                    sql.Identifier(VIEW), sql.Literal(sig)))
+            else:
+                print(f"🔄 REFRESH de la vue matérialisée {VIEW}")
+                cur.execute(sql.SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY {}").format(sql.Identifier(VIEW)))
+            cur.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(sql.Identifier(VIEW)))
+            n = cur.fetchone()[0]
+            bump_version(cur, "features")  # NOTIFY délivré au commit
+        conn.commit()
+        print(f" Vue {VIEW} à jour ({n:,} lignes)")
+        return n
+    finally:
+        if own:
+            conn.close()
+
+
+def load_features_db(maladie: str, nom_pays: str = None, columns=None, conn=None, readonly: bool = False) -> pd.DataFrame:
+    """Lit la vue `features` (une maladie, éventuellement un seul pays) en DataFrame
+    (readonly=True : réplique en lecture si PG_READ_DSN est défini ; le pipeline lit le
+    primaire, juste après son REFRESH)."""
+    cols = sql.SQL("*") if not columns else sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+    query = sql.SQL("SELECT {} FROM {} WHERE nom_maladie = %s").format(cols, sql.Identifier(VIEW))
+    params = [maladie]
+    if nom_pays is not None:
+        query += sql.SQL(" AND nom_pays = %s")
+        params.append(nom_pays)
+    query += sql.SQL(" ORDER BY nom_pays, date_stat")
+
+    own = conn is None
+    conn = conn or get_connexion(readonly)
+    try:
+        # COPY en flux dans un fichier temporaire puis parseur C de pandas : pas de tuple
+        # Python par ligne (≈ 10x plus rapide que fetchall sur ~2M lignes)
+        with conn.cursor() as cur, tempfile.TemporaryFile("w+b") as f:
+            query = cur.mogrify(query, params).decode()
+            cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+            f.seek(0)
+            df = pd.read_csv(f)
+    finally:
+        if own:
+            conn.close()
+    if "date_stat" in df:
+        df["date_stat"] = pd.to_datetime(df["date_stat"], format="%Y-%m-%d")
+    return df
+
+
+def list_countries_db(maladie: str, conn=None, readonly: bool = False) -> list:
+    own = conn is None
+    conn = conn or get_connexion(readonly)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("SELECT DISTINCT nom_pays FROM {} WHERE nom_maladie = %s ORDER BY 1").format(
+                sql.Identifier(VIEW)), (maladie,))
+            return [r[0] for r in cur.fetchall()]
+    finally:
+        if own:
+            conn.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--print", action="store_true", help="affiche la requête sans se connecter")
+    args = ap.parse_args()
+    if args.print:
+        print(render_offline(build_features_query()))
+    else:
+        refresh_features_view()
@@ -0,0 +1,175 @@
+# prediction/model_benchmark.py
+# Banc d'essai des modèles candidats : au-delà du RMSE, ce que coûte chaque modèle
+# une fois servi (temps d'ajustement, taille sérialisée, chargement, RSS, latence
+# p50/p99 ligne seule et batch). Rapport JSON + Markdown et choix sous budget.
+#   python -m prediction.model_benchmark            (mesure le modèle courant)
+import argparse
+import json
+import multiprocessing as mp
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import dump, load
+from sklearn.metrics import mean_squared_error, r2_score
+
+from prediction.compact_forest import compact_path, load_compact_forest, save_compact_forest
+from prediction.perf import latency_summary, rss_mb, time_calls
+
+BATCH_ROWS = 500  # ~ une série pays servie par /ml/predict_series
+N_SINGLE, N_BATCH = 200, 20
+
+
+def size_mb(p: Path) -> float:
+    p = Path(p)
+    files = [p] if p.is_file() else list(p.rglob("*"))
+    return sum(f.stat().st_size for f in files if f.is_file()) / 1e6
+
+
+def _probe(kind: str, path: str, X: pd.DataFrame, batch: int, q):
+    """Exécuté dans un process neuf : RSS et chargement mesurés comme dans un worker API."""
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    rss0 = rss_mb()
+    t0 = time.perf_counter()
+    model = load_compact_forest(path) if kind == "compact" else load(path)
+    load_s = time.perf_counter() - t0
+    if hasattr(model, "n_jobs"):
+        model.set_params(n_jobs=1)  # un worker uvicorn = un coeur
+    rss_load = rss_mb() - rss0
+    Xb = X.iloc[:batch]
+    one = time_calls(lambda: model.predict(X.iloc[:1]), n=N_SINGLE)
+    many = time_calls(lambda: model.predict(Xb), n=N_BATCH, warmup=1)
+    # mmap (forêt compacte) : les pages ne sont lues qu'à l'usage, d'où les deux mesures
+    q.put({"format": kind, "load_s": load_s, "rss_load_mb": rss_load, "rss_serve_mb": rss_mb() - rss0,
+           "single": latency_summary(one), "batch": latency_summary(many)})
+
+
+def probe_serving(path, X: pd.DataFrame, kind: str = "pickle", batch: int = BATCH_ROWS) -> dict:
+    """Chargement + latences d'un modèle sérialisé, mesurés dans un process séparé."""
+    ctx = mp.get_context("spawn")
+    q = ctx.Queue()
+    p = ctx.Process(target=_probe, args=(kind, str(path), X.iloc[:batch], batch, q))
+    p.start()
+    out = q.get()
+    p.join()
+    return out
+
+
+def _serving_format(model, pkl: Path):
+    """Format que l'API chargerait : forêt compacte pour les arbres sklearn, sinon le pickle."""
+    try:
+        return "compact", save_compact_forest(model, compact_path(pkl), source=pkl)
+    except TypeError:
+        return "pickle", pkl
+
+
+def benchmark_model(name: str, model, X_test, y_test, X_train=None, y_train=None,
+                    workdir=None, params=None) -> dict:
+    """Mesure un candidat. Si X_train est fourni, le modèle est (ré)ajusté et chronométré."""
+    fit_s = None
+    if X_train is not None:
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - t0
+    y_pred = model.predict(X_test)
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        pkl = Path(tmp) / f"{name}.pkl"
+        dump(model, pkl)
+        kind, served = _serving_format(model, pkl)
+        serve = probe_serving(served, X_test, kind, batch=min(BATCH_ROWS, len(X_test)))
+        pickle_mb, served_mb = size_mb(pkl), size_mb(served)
+
+    return {
+        "name": name,
+        "params": params if params is not None else {},
+        "rmse": float(np.sqrt(mean_squared_error(y_test, y_pred))),
+        "r2": float(r2_score(y_test, y_pred)),
+        "fit_s": fit_s,
+        "pickle_mb": pickle_mb,
+        "serve_format": kind,
+        "serve_mb": served_mb,
+        "load_s": serve["load_s"],
+        "rss_load_mb": serve["rss_load_mb"],
+        "rss_serve_mb": serve["rss_serve_mb"],
+        "single_p50_ms": serve["single"]["p50_ms"],
+        "single_p99_ms": serve["single"]["p99_ms"],
+        "batch_rows": min(BATCH_ROWS, len(X_test)),
+        "batch_p50_ms": serve["batch"]["p50_ms"],
+        "batch_p99_ms": serve["batch"]["p99_ms"],
+    }
+
+
+def select_model(results: list, max_p99_ms: float = None, max_size_mb: float = None) -> dict:
+    """Meilleur RMSE parmi les candidats qui tiennent les budgets (p99 ligne seule, taille
+    du format servi). Si aucun ne les tient : le plus rapide, avec un avertissement."""
+    def fits(r):
+        return ((max_p99_ms is None or r["single_p99_ms"] <= max_p99_ms)
+                and (max_size_mb is None or r["serve_mb"] <= max_size_mb))
+
+    ok = [r for r in results if fits(r)]
+    if ok:
+        return min(ok, key=lambda r: r["rmse"])
+    print(f"⚠️ Aucun candidat dans le budget (p99 ≤ {max_p99_ms} ms, taille ≤ {max_size_mb} Mo) : "
+          "choix du plus rapide")
+    return min(results, key=lambda r: (r["single_p99_ms"], r["rmse"]))
+
+
+_MD_COLS = [
+    ("name", "candidat", "{}"), ("rmse", "RMSE", "{:.6f}"), ("r2", "R²", "{:.4f}"),
+    ("fit_s", "fit (s)", "{:.1f}"), ("serve_format", "format", "{}"), ("serve_mb", "taille (Mo)", "{:.1f}"),
+    ("load_s", "chargement (s)", "{:.2f}"), ("rss_load_mb", "RSS chargé (Mo)", "{:.0f}"),
+    ("rss_serve_mb", "RSS en service (Mo)", "{:.0f}"),
+    ("single_p50_ms", "1 ligne p50 (ms)", "{:.2f}"), ("single_p99_ms", "1 ligne p99 (ms)", "{:.2f}"),
+    ("batch_p50_ms", "batch p50 (ms)", "{:.1f}"), ("batch_p99_ms", "batch p99 (ms)", "{:.1f}"),
+]
+
+
+def write_report(results: list, selected: dict, path, budgets: dict = None) -> Path:
+    """Rapport JSON (machine) + Markdown (revue) côte à côte : <path>.json / <path>.md."""
+    path = Path(path)
+    payload = {"selected": selected["name"], "budgets": budgets or {}, "candidates": results}
+    path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+
+    lines = ["| " + " | ".join(h for _, h, _ in _MD_COLS) + " |",
+             "|" + "---|" * len(_MD_COLS)]
+    for r in results:
+        cells = ["—" if r[k] is None else fmt.format(r[k]) for k, _, fmt in _MD_COLS]
+        if r["name"] == selected["name"]:
+            cells[0] = f"**{cells[0]}** ✅"
+        lines.append("| " + " | ".join(cells) + " |")
+    budget = ", ".join(f"{k}={v}" for k, v in (budgets or {}).items() if v is not None) or "aucun"
+    md = ["# Banc d'essai des modèles", "", f"Retenu : **{selected['name']}** (budgets : {budget})", "",
+          *lines, "", f"Batch = {results[0]['batch_rows']} lignes ; latences mesurées sur 1 coeur, "
+          "dans un process neuf (comme un worker API).", ""]
+    path.with_suffix(".md").write_text("\n".join(md), encoding="utf-8")
+    print(f" Rapport de benchmark → {path.resolve()} (+ .md)")
+    return path
+
+
+def main(argv=None):
+    """Mesure le modèle entraîné courant sur le jeu de test temporel."""
+    from prediction.config import BENCHMARK_REPORT, FEATURE_COLS, FEATURES_CSV, MODEL_PATH, TARGET_COL
+    from prediction.datasets import read_table
+    from prediction.model_selection import temporal_split
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=str(MODEL_PATH))
+    ap.add_argument("--out", default=str(BENCHMARK_REPORT))
+    args = ap.parse_args(argv)
+
+    data = read_table(FEATURES_CSV, columns=["date_stat", TARGET_COL] + FEATURE_COLS)
+    data = data.sort_values("date_stat", kind="stable").reset_index(drop=True)
+    _, te = temporal_split(data["date_stat"], test_size=0.2)
+    X_test, y_test = data[FEATURE_COLS].iloc[te], data[TARGET_COL].astype(float).values[te]
+
+    model = load(args.model)
+    r = benchmark_model(Path(args.model).stem, model, X_test, y_test, params=model.get_params())
+    write_report([r], r, args.out)
+
+
+if __name__ == "__main__":
+    main()
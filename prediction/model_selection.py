@@ -0,0 +1,47 @@
+# prediction/model_selection.py
+# Découpages temporels (pas de fuite du futur vers l'entraînement) et dimensionnement
+# du parallélisme pour l'entraînement.
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+
+
+def available_cores() -> int:
+    """Coeurs utilisables par ce process (affinité / cgroup), surchargeable via TRAIN_N_JOBS."""
+    if os.getenv("TRAIN_N_JOBS"):
+        return max(1, int(os.environ["TRAIN_N_JOBS"]))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:  # pas de sched_getaffinity (macOS/Windows)
+        return os.cpu_count() or 1
+
+
+def temporal_split(dates, test_size: float = 0.2):
+    """Indices (train, test) : les dernières dates (tous pays confondus) vont en test."""
+    d = pd.to_datetime(pd.Series(dates)).to_numpy()
+    uniq = np.unique(d)
+    cutoff = uniq[int(len(uniq) * (1 - test_size))]
+    return np.flatnonzero(d < cutoff), np.flatnonzero(d >= cutoff)
+
+
+def date_folds(dates, n_splits: int = 3) -> list:
+    """Plis de validation croisée par dates (TimeSeriesSplit sur les dates uniques).
+
+    Toutes les lignes d'une même date restent dans le même pli ; chaque pli de test
+    est postérieur à son entraînement. Utilisable directement comme `cv=`.
+    """
+    d = pd.to_datetime(pd.Series(dates)).to_numpy()
+    uniq, inv = np.unique(d, return_inverse=True)
+    folds = []
+    for tr, te in TimeSeriesSplit(n_splits=n_splits).split(uniq):
+        folds.append((np.flatnonzero(inv <= tr[-1]), np.flatnonzero(np.isin(inv, te))))
+    return folds
+
+
+def split_cores(total: int, n: int) -> list:
+    """Répartit `total` coeurs entre `n` tâches parallèles (écart max d'un coeur, au moins 1)."""
+    n = max(1, n)
+    base, extra = divmod(max(total, n), n)
+    return [base + (i < extra) for i in range(n)]
@@ -0,0 +1,44 @@
+# prediction/perf.py
+# Petits outils de mesure (temps, mémoire) partagés par les benchmarks.
+import os
+import resource
+import time
+
+import numpy as np
+
+
+def rss_mb() -> float:
+    """RSS courant du process (Mo). Lu dans /proc, repli sur le pic si indisponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Pic de RSS du process depuis son démarrage (Mo, ru_maxrss est en Ko sous Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def time_calls(fn, n: int = 100, warmup: int = 3) -> np.ndarray:
+    """Appelle fn() n fois et renvoie les durées en millisecondes."""
+    for _ in range(warmup):
+        fn()
+    out = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out[i] = (time.perf_counter() - t0) * 1e3
+    return out
+
+
+def latency_summary(samples_ms) -> dict:
+    """p50 / p99 / moyenne d'une série de durées (ms)."""
+    s = np.asarray(samples_ms, dtype=float)
+    return {
+        "p50_ms": float(np.percentile(s, 50)),
+        "p99_ms": float(np.percentile(s, 99)),
+        "mean_ms": float(s.mean()),
+    }
@@ -0,0 +1,332 @@
+# prediction/pipeline.py
+# Orchestrateur du pipeline 1→4 (collecte, features, entraînement, prédiction batch).
+# Chaque étape a une empreinte de ses entrées : requête + version des données en base,
+# empreintes des artefacts amont, paramètres de config, code de l'étape. Une étape dont
+# l'empreinte n'a pas changé et dont les sorties sont intactes est sautée.
+# Plusieurs maladies : un process par maladie, artefacts isolés via config.paths_for.
+#   python -m prediction.pipeline
+#   python -m prediction.pipeline --maladies covid_19,monkeypox --jobs 2
+#   python -m prediction.pipeline --maladies all --jobs 2   (toutes les maladies en base)
+#   python -m prediction.pipeline --force features      (relance features, puis l'aval si besoin)
+import argparse
+import hashlib
+import importlib
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+STAGES = ["collect", "features", "train", "predict"]
+_PKG = Path(__file__).resolve().parent
+
+
+def _hash(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _code(*names) -> str:
+    """Empreinte du code des modules d'une étape (changer le code relance l'étape)."""
+    return _hash([hashlib.sha256((_PKG / n).read_bytes()).hexdigest() for n in names])
+
+
+def digest_paths(paths, cache: dict):
+    """Empreinte du contenu de fichiers / dossiers (datasets). Le sha256 de chaque fichier
+    est mis en cache avec sa taille + mtime : seul un fichier modifié est relu.
+    None si une sortie manque."""
+    h = hashlib.sha256()
+    for p in map(Path, paths):
+        if not p.exists():
+            return None
+        files = sorted(f for f in p.rglob("*") if f.is_file()) if p.is_dir() else [p]
+        for f in files:
+            st = f.stat()
+            stamp = [st.st_size, st.st_mtime_ns]
+            entry = cache.get(str(f))
+            if not entry or entry["stamp"] != stamp:
+                with open(f, "rb") as fh:
+                    entry = {"stamp": stamp, "sha256": hashlib.file_digest(fh, "sha256").hexdigest()}
+                cache[str(f)] = entry
+            h.update(f"{f.relative_to(p) if p.is_dir() else p.name}:{entry['sha256']}\n".encode())
+    return h.hexdigest()[:16]
+
+
+def db_data_version(maladie: str) -> str:
+    """Version des données sources en base : volume, dernière date et sommes des
+    statistiques de la maladie + attributs des pays utilisés par la collecte."""
+    from db_config import get_connexion
+
+    conn = get_connexion()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT COUNT(*), MAX(s.date_stat)::text,
+                       COALESCE(SUM(s.nouveaux_cas), 0)::text, COALESCE(SUM(s.cas_totaux), 0)::text
+                FROM statistique s JOIN maladie m ON s.id_maladie = m.id_maladie
+                WHERE m.nom_maladie = %s
+            """, (maladie,))
+            stats = cur.fetchone()
+            cur.execute("""
+                SELECT md5(string_agg(id_pays || ':' || nom_pays || ':' || COALESCE(continent, '')
+                                      || ':' || COALESCE(population::text, ''), ',' ORDER BY id_pays))
+                FROM pays
+            """)
+            pays = cur.fetchone()[0]
+    finally:
+        conn.close()
+    return _hash([list(stats), pays])
+
+
+# --- Étapes : (entrées, sorties, exécution). Config importée à l'appel (env par maladie). ---
+
+def _collect_inputs(upstream):
+    from prediction import config
+    collecte = importlib.import_module("prediction.1_collecte")
+    sql = collecte.SQL_STREAM if config.COLLECT_MODE == "copy" else collecte.SQL
+    return {"sql": _hash(sql), "mode": config.COLLECT_MODE, "maladie": config.MALADIE_CIBLE,
+            "data": db_data_version(config.MALADIE_CIBLE), "code": _code("1_collecte.py", "datasets.py")}
+
+
+def _collect_outputs():
+    from prediction.config import CLEAN_DATA_CSV
+    from prediction.datasets import primary_source
+    return [primary_source(CLEAN_DATA_CSV)]
+
+
+def _collect_run(incremental):
+    from prediction.config import COLLECT_MODE
+    collecte = importlib.import_module("prediction.1_collecte")
+    collecte.run_collect_stream() if COLLECT_MODE == "copy" else collecte.run_collect()
+
+
+def _features_inputs(upstream):
+    from prediction import config
+    code = ("features_sql.py",) if config.FEATURES_SOURCE == "db" else (
+        "2_features_engineering.py", "feature_kernel.py", "feature_store.py", "datasets.py")
+    return {"upstream": upstream("collect"), "specs": config.FEATURE_SPECS,
+            "roll": config.ROLL, "target": config.TARGET_COL, "source": config.FEATURES_SOURCE,
+            "code": _code(*code)}
+
+
+def _features_outputs():
+    from prediction.config import FEATURES_CSV, FEATURES_SOURCE
+    from prediction.datasets import primary_source
+    return [] if FEATURES_SOURCE == "db" else [primary_source(FEATURES_CSV)]
+
+
+def _features_run(incremental):
+    from prediction.config import FEATURES_SOURCE
+    if FEATURES_SOURCE == "db":
+        from prediction.features_sql import refresh_features_view
+        return refresh_features_view()
+    fe = importlib.import_module("prediction.2_features_engineering")
+    fe.run_features_incremental() if incremental else fe.run_features()
+
+
+def _train_inputs(upstream):
+    from prediction import config
+    return {"upstream": upstream("features"), "cols": config.FEATURE_COLS,
+            "target": config.TARGET_COL, "backends": config.TRAIN_BACKENDS,
+            "mode": config.TRAIN_MODE, "budget": config.TRAIN_BUDGET_S,
+            "selection": [config.TRAIN_FINALISTS, config.SELECT_MAX_P99_MS, config.SELECT_MAX_SIZE_MB],
+            "code": _code("training.py", "baselines.py", "model_selection.py", "compact_forest.py",
+                          "model_benchmark.py")}
+
+
+def _train_outputs():
+    from prediction.config import MODEL_PATH
+    return [MODEL_PATH]
+
+
+def _train_run(incremental):
+    from prediction.training import run_train
+    run_train()
+
+
+def _predict_inputs(upstream):
+    from prediction import config
+    return {"model": upstream("train"), "features": upstream("features"),
+            "cols": config.FEATURE_COLS, "code": _code("4_prediction_rf.py")}
+
+
+def _predict_outputs():
+    from prediction.config import PREDICTIONS_CSV
+    from prediction.datasets import primary_source
+    return [primary_source(PREDICTIONS_CSV)]
+
+
+def _predict_run(incremental):
+    importlib.import_module("prediction.4_prediction_rf").run_predict_batch()
+
+
+_DEFS = {
+    "collect": (_collect_inputs, _collect_outputs, _collect_run),
+    "features": (_features_inputs, _features_outputs, _features_run),
+    "train": (_train_inputs, _train_outputs, _train_run),
+    "predict": (_predict_inputs, _predict_outputs, _predict_run),
+}
+
+
+def _load_state(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"stages": {}, "files": {}}
+
+
+def _save_state(path: Path, state: dict):
+    for f in [f for f in state["files"] if not Path(f).exists()]:
+        del state["files"][f]  # en place : run_pipeline garde une référence au cache
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_pipeline(stages=STAGES, force=(), incremental: bool = False) -> list:
+    """Exécute les étapes demandées dans l'ordre ; renvoie une ligne de bilan par étape."""
+    from prediction.config import MALADIE_CIBLE, PIPELINE_STATE
+
+    state = _load_state(PIPELINE_STATE)
+    done, files = state["stages"], state["files"]
+
+    def upstream(name):
+        """Empreinte actuelle des sorties d'une étape amont (produites ou non par
+        l'orchestrateur) ; pour une étape sans fichier, celle de son dernier passage."""
+        outputs = _DEFS[name][1]()
+        return digest_paths(outputs, files) if outputs else done.get(name, {}).get("outputs")
+
+    report = []
+    for name in [s for s in STAGES if s in stages]:
+        inputs_fn, outputs_fn, run_fn = _DEFS[name]
+        row = {"maladie": MALADIE_CIBLE, "etape": name, "empreinte_s": 0.0, "execution_s": 0.0}
+        report.append(row)
+        t0 = time.perf_counter()
+        try:
+            inputs = _hash(inputs_fn(upstream))
+        except Exception as e:
+            if name == "collect" and digest_paths(outputs_fn(), files):
+                # base injoignable : on travaille sur le clean_data déjà collecté
+                print(f"⚠️ [{MALADIE_CIBLE}] version des données indisponible ({e}) → collecte conservée")
+                row.update(statut="conservé", empreinte_s=time.perf_counter() - t0)
+                continue
+            print(f"❌ [{MALADIE_CIBLE}] {name} : empreinte impossible ({e})")
+            row.update(statut="échec", erreur=str(e), empreinte_s=time.perf_counter() - t0)
+            break
+        prev = done.get(name, {})
+        current = digest_paths(outputs_fn(), files)
+        row["empreinte_s"] = time.perf_counter() - t0
+        if name not in force and "all" not in force and prev.get("inputs") == inputs \
+                and current is not None and current == prev.get("outputs"):
+            print(f"⏭️ [{MALADIE_CIBLE}] {name} à jour, sauté")
+            row["statut"] = "sauté"
+            continue
+
+        print(f"▶ [{MALADIE_CIBLE}] {name}")
+        t0 = time.perf_counter()
+        try:
+            run_fn(incremental)
+        except Exception as e:
+            print(f"❌ [{MALADIE_CIBLE}] {name} en échec : {e}")
+            row.update(statut="échec", erreur=str(e), execution_s=time.perf_counter() - t0)
+            break
+        row["execution_s"] = time.perf_counter() - t0
+        outputs = outputs_fn()
+        # étape sans fichier (vue SQL) : l'empreinte des entrées tient lieu de sortie
+        done[name] = {"inputs": inputs, "outputs": digest_paths(outputs, files) if outputs else inputs,
+                      "seconds": round(row["execution_s"], 3), "at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        row["statut"] = "exécuté"
+        _save_state(PIPELINE_STATE, state)
+    _save_state(PIPELINE_STATE, state)
+    return report
+
+
+def _run_for(env: dict, stages, force, incremental) -> list:
+    """Point d'entrée du process enfant : la config est importée avec l'env de la maladie."""
+    os.environ.update(env)
+    return run_pipeline(stages, force, incremental)
+
+
+def list_maladies() -> list:
+    """Maladies présentes en base (table maladie) : une chaîne par maladie, y compris
+    celles ajoutées après coup."""
+    from db_config import get_connexion
+
+    conn = get_connexion()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT nom_maladie FROM maladie ORDER BY nom_maladie")
+            return [r[0] for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def run_many(maladies, jobs: int, stages=STAGES, force=(), incremental: bool = False) -> list:
+    """Une chaîne par maladie, `jobs` en parallèle (process neufs : config et mémoire isolées).
+
+    Les coeurs sont répartis entre les chaînes en cours (TRAIN_N_JOBS de chaque process) ;
+    quand une chaîne se termine, ses coeurs passent à la suivante.
+    """
+    from prediction.config import paths_for
+    from prediction.model_selection import available_cores, split_cores
+
+    slots = max(1, min(jobs, len(maladies)))
+    free = split_cores(available_cores(), slots)
+    fixed = os.getenv("TRAIN_N_JOBS")  # imposé par l'utilisateur : on ne répartit pas
+    pending, running, results = list(maladies), {}, {}
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=slots, mp_context=ctx, max_tasks_per_child=1) as pool:
+        while pending or running:
+            while pending and free:
+                m, cores = pending.pop(0), free.pop()
+                env = {**paths_for(m), "TRAIN_N_JOBS": fixed or str(cores)}
+                print(f"🚀 Chaîne {m} ({env['TRAIN_N_JOBS']} coeur(s))")
+                running[pool.submit(_run_for, env, stages, force, incremental)] = (m, cores)
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in finished:
+                m, cores = running.pop(f)
+                free.append(cores)
+                try:
+                    results[m] = f.result()
+                except Exception as e:
+                    results[m] = [{"maladie": m, "etape": "-", "statut": "échec", "erreur": str(e),
+                                   "empreinte_s": 0.0, "execution_s": 0.0}]
+    return [row for m in maladies for row in results[m]]
+
+
+def print_summary(report: list):
+    print(f"\n{'maladie':14s} {'étape':9s} {'statut':9s} {'empreinte':>10s} {'exécution':>10s}")
+    for r in report:
+        print(f"{r['maladie']:14s} {r['etape']:9s} {r['statut']:9s} {r['empreinte_s']:9.2f}s "
+              f"{r['execution_s']:9.2f}s" + (f"  {r['erreur']}" if r.get("erreur") else ""))
+    total = sum(r["empreinte_s"] + r["execution_s"] for r in report)
+    print(f"Total étapes : {total:.1f}s")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stages", default=",".join(STAGES), help=f"sous-ensemble de {','.join(STAGES)}")
+    ap.add_argument("--force", default="", help="étapes à relancer même si à jour (ou 'all')")
+    ap.add_argument("--maladies", default="", help="liste de maladies, ou 'all' (table maladie)")
+    ap.add_argument("--jobs", type=int, default=1, help="chaînes de maladies en parallèle")
+    ap.add_argument("--incremental", action="store_true", help="features en mode incrémental")
+    args = ap.parse_args(argv)
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        ap.error(f"étapes inconnues: {', '.join(sorted(unknown))}")
+    force = [s for s in args.force.split(",") if s]
+    t0 = time.perf_counter()
+    if args.maladies:
+        maladies = list_maladies() if args.maladies == "all" else args.maladies.split(",")
+        report = run_many(maladies, args.jobs, stages, force, args.incremental)
+    else:
+        report = run_pipeline(stages, force, args.incremental)
+    print_summary(report)
+    print(f"Durée totale : {time.perf_counter() - t0:.1f}s")
+    return 1 if any(r["statut"] == "échec" for r in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
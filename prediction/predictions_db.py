@@ -0,0 +1,138 @@
+# prediction/predictions_db.py
+# Prédictions batch publiées dans PostgreSQL : table `prediction` clé (nom_maladie,
+# model_version, id_pays, date_stat) chargée par COPY, et registre `model_registry` (une
+# version active par maladie ; deux maladies peuvent partager une empreinte de modèle).
+# L'API (ML_SERVING_MODE=db) y lit une série par pays par index (id_pays résolu sur le
+# nom normalisé, puis clé primaire), sans charger de modèle. Tables créées par les
+# migrations (db_schema.py).
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from data_version import bump_version
+from db_config import get_connexion
+from prediction.stamps import read_model_version, write_model_version
+
+KEEP_VERSIONS = 2  # versions conservées par maladie (l'active + la précédente)
+
+_COLS = ["nom_maladie", "model_version", "id_pays", "date_stat", "taux_true", "taux_pred", "nouveaux_cas_pred"]
+
+# Normalisation des noms identique à ml_router._norm ('United States' == 'united_states'),
+# servie par l'index pays_nom_norm
+PAYS_ID_SQL = """
+SELECT id_pays FROM pays WHERE lower(replace(trim(nom_pays), ' ', '_')) = %s ORDER BY id_pays LIMIT 1
+"""
+
+# clé primaire (nom_maladie, model_version, id_pays, date_stat) : la série déjà triée
+SERIES_SQL = """
+SELECT pr.date_stat, pr.taux_true, pr.taux_pred
+FROM model_registry r
+JOIN prediction pr ON pr.nom_maladie = r.nom_maladie AND pr.model_version = r.model_version
+WHERE r.nom_maladie = %s AND r.actif AND pr.id_pays = %s
+ORDER BY pr.date_stat
+"""
+
+COUNTRIES_SQL = """
+SELECT p.nom_pays
+FROM pays p
+WHERE EXISTS (
+    SELECT 1 FROM prediction pr
+    JOIN model_registry r ON r.nom_maladie = pr.nom_maladie AND r.model_version = pr.model_version
+    WHERE r.nom_maladie = %s AND r.actif AND pr.id_pays = p.id_pays
+)
+ORDER BY p.nom_pays
+"""
+
+
+def model_version(model_path) -> str:
+    """Version = empreinte du contenu du modèle, lue à côté du modèle (calculée si absente)."""
+    return read_model_version(model_path) or write_model_version(model_path)
+
+
+def publish_predictions(out: pd.DataFrame, maladie: str, version: str, model_path=None, conn=None) -> int:
+    """Charge les prédictions (COPY) puis bascule la version active, en une transaction :
+    l'API voit l'ancienne série ou la nouvelle, jamais un mélange."""
+    own = conn is None
+    conn = conn or get_connexion()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT nom_pays, id_pays FROM pays")
+            ids = dict(cur.fetchall())
+            rows = out.assign(nom_maladie=maladie, model_version=version, id_pays=out["nom_pays"].map(ids))
+            missing = rows["id_pays"].isna()
+            if missing.any():
+                print(f"⚠️ {rows.loc[missing, 'nom_pays'].nunique()} pays absents de la table pays ignorés")
+                rows = rows[~missing]
+            rows = rows.assign(id_pays=rows["id_pays"].astype("int64"),
+                               date_stat=pd.to_datetime(rows["date_stat"]).dt.strftime("%Y-%m-%d"))
+
+            cur.execute("""
+                INSERT INTO model_registry (model_version, nom_maladie, model_path, n_predictions)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (nom_maladie, model_version) DO UPDATE
+                SET model_path = EXCLUDED.model_path, n_predictions = EXCLUDED.n_predictions, created_at = now()
+            """, (version, maladie, str(model_path) if model_path else None, len(rows)))
+            cur.execute("DELETE FROM prediction WHERE nom_maladie = %s AND model_version = %s", (maladie, version))
+            with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as f:
+                rows[_COLS].to_csv(f, index=False, header=False)
+                f.seek(0)
+                cur.copy_expert(f"COPY prediction ({', '.join(_COLS)}) FROM STDIN WITH (FORMAT csv)", f)
+
+            cur.execute("UPDATE model_registry SET actif = false WHERE nom_maladie = %s AND actif", (maladie,))
+            cur.execute("UPDATE model_registry SET actif = true WHERE nom_maladie = %s AND model_version = %s",
+                        (maladie, version))
+            # anciennes versions de la maladie (et leurs prédictions, ON DELETE CASCADE)
+            cur.execute("""
+                DELETE FROM model_registry WHERE nom_maladie = %s AND model_version IN (
+                    SELECT model_version FROM model_registry
+                    WHERE nom_maladie = %s AND NOT actif
+                    ORDER BY created_at DESC OFFSET %s)
+            """, (maladie, maladie, KEEP_VERSIONS - 1))
+            bump_version(cur, f"predictions:{maladie}")  # NOTIFY délivré au commit
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own:
+            conn.close()
+
+
+def fetch_series(maladie: str, nom_pays_norm: str, conn=None, readonly: bool = False) -> list:
+    """[(date, taux_true, taux_pred), ...] du pays pour la version active de la maladie
+    (readonly=True : réplique en lecture si PG_READ_DSN est défini)."""
+    own = conn is None
+    conn = conn or get_connexion(readonly)
+    try:
+        with conn.cursor() as cur:
+            # id_pays d'abord (index pays_nom_norm), puis lecture par clé primaire
+            cur.execute(PAYS_ID_SQL, (nom_pays_norm,))
+            row = cur.fetchone()
+            if row is None:
+                return []
+            cur.execute(SERIES_SQL, (maladie, row[0]))
+            return cur.fetchall()
+    finally:
+        if own:
+            conn.close()
+
+
+def fetch_countries(maladie: str, conn=None, readonly: bool = False) -> list:
+    own = conn is None
+    conn = conn or get_connexion(readonly)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(COUNTRIES_SQL, (maladie,))
+            return [r[0] for r in cur.fetchall()]
+    finally:
+        if own:
+            conn.close()
+
+
+def publish_file(model_path, predictions: pd.DataFrame, maladie: str) -> int:
+    version = model_version(model_path)
+    n = publish_predictions(predictions, maladie, version, Path(model_path))
+    print(f"🗄️ {n:,} prédictions publiées dans PostgreSQL (modèle {version}, {maladie})")
+    return n
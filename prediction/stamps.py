@@ -0,0 +1,48 @@
+# prediction/stamps.py
+# Empreinte légère (taille + mtime) d'un fichier source, enregistrée dans le meta.json
+# des artefacts dérivés (.forest, .store) pour savoir s'ils sont encore à jour.
+# Version d'un modèle (empreinte sha256 du .pkl) : calculée une fois à la sauvegarde et
+# gardée à côté (<modèle>.version.json), lue par l'API sans relire le modèle.
+import hashlib
+import json
+from pathlib import Path
+
+
+def source_stamp(source) -> dict:
+    st = Path(source).stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def is_current(path, source, meta_name: str = "meta.json") -> bool:
+    """Vrai si l'artefact `path` a été dérivé de la version actuelle de `source`."""
+    path, source = Path(path), Path(source)
+    if not (path / meta_name).exists():
+        return False
+    if not source.exists():
+        return True  # seul l'artefact dérivé est déployé
+    src = json.loads((path / meta_name).read_text(encoding="utf-8")).get("source")
+    return bool(src) and src == source_stamp(source)
+
+
+def version_path(model_path) -> Path:
+    return Path(model_path).with_suffix(".version.json")
+
+
+def write_model_version(model_path) -> str:
+    """Empreinte du contenu du modèle (même fichier → même version), enregistrée à côté."""
+    with open(model_path, "rb") as f:
+        version = hashlib.file_digest(f, "sha256").hexdigest()[:16]
+    version_path(model_path).write_text(
+        json.dumps({"version": version, "source": source_stamp(model_path)}), encoding="utf-8")
+    return version
+
+
+def read_model_version(model_path):
+    """Version enregistrée si elle correspond au modèle actuel, sinon None (pas de hachage)."""
+    p, model_path = version_path(model_path), Path(model_path)
+    if not p.exists():
+        return None
+    meta = json.loads(p.read_text(encoding="utf-8"))
+    if model_path.exists() and meta.get("source") != source_stamp(model_path):
+        return None
+    return meta.get("version")
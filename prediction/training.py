@@ -0,0 +1,256 @@
+# prediction/training.py
+# Entraînement commun à tous les modèles : chargement des features, split temporel,
+# recherche d'hyperparamètres, finalistes mesurés (model_benchmark) et sauvegarde.
+# Les estimateurs sont des "backends" choisis par config (TRAIN_BACKENDS) :
+#   rf          RandomForestRegressor
+#   hgb         HistGradientBoostingRegressor (histogrammes : bien plus rapide à ajuster)
+#   linear      LinearRegression
+#   persistence référence naïve : taux de demain = taux du jour (taux_transmission_j-1)
+# Plusieurs backends → leurs finalistes sont comparés ensemble, le meilleur est déployé.
+#   python -m prediction.training --backends rf,hgb,persistence
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import dump
+from scipy.stats import loguniform, randint
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import GridSearchCV, HalvingRandomSearchCV
+
+from prediction.config import (
+    BENCHMARK_REPORT, FEATURES_CSV, FEATURES_SOURCE, MALADIE_CIBLE, MODEL_PATH, FEATURE_COLS, TARGET_COL,
+    SEARCH_REPORT_CSV, SELECT_MAX_P99_MS, SELECT_MAX_SIZE_MB, TRAIN_BACKENDS, TRAIN_FINALISTS, TRAIN_MODE,
+    TRAIN_BUDGET_S,
+)
+from prediction.baselines import PersistenceRegressor
+from prediction.atomic_dir import remove_dir
+from prediction.compact_forest import compact_path, export_compact
+from prediction.datasets import read_table
+from prediction.model_benchmark import benchmark_model, select_model, write_report
+from prediction.model_selection import available_cores, date_folds, temporal_split
+from prediction.stamps import write_model_version
+
+RANDOM_STATE = 42
+FACTOR = 3  # successive halving : candidats / 3, ressource x 3 à chaque tour
+
+
+def _rf(params, n_jobs):
+    return RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=n_jobs, **params)
+
+
+def _hgb(params, n_jobs):
+    # early_stopping tirerait un jeu de validation aléatoire (fuite du futur) : désactivé,
+    # le nombre d'itérations est réglé par la recherche
+    return HistGradientBoostingRegressor(random_state=RANDOM_STATE, early_stopping=False, **params)
+
+
+# Backend = constructeur (params, n_jobs) + espaces de recherche.
+#   grid          : mode "grid" (exhaustif)
+#   distributions : mode "budget" (tirage aléatoire + successive halving sur `resource`)
+#   resource      : (paramètre, min, max) ; None = pas de recherche (un seul candidat)
+BACKENDS = {
+    "rf": {
+        "make": _rf,
+        "grid": {
+            "n_estimators": [300, 600],
+            "max_depth": [None, 15, 30],
+            "min_samples_split": [2, 5, 10],
+            "max_features": ["sqrt", "log2", None],
+        },
+        "distributions": {
+            "max_depth": [None, 10, 15, 20, 30],
+            "min_samples_split": randint(2, 21),
+            "min_samples_leaf": [1, 2, 4],
+            "max_features": ["sqrt", "log2", 0.5, None],
+        },
+        "resource": ("n_estimators", 30, 300),
+    },
+    "hgb": {
+        "make": _hgb,
+        "grid": {
+            "max_iter": [200, 500],
+            "learning_rate": [0.05, 0.1],
+            "max_leaf_nodes": [15, 31, 63],
+            "min_samples_leaf": [20, 50],
+        },
+        "distributions": {
+            "learning_rate": loguniform(0.02, 0.3),
+            "max_leaf_nodes": [15, 31, 63, 127],
+            "min_samples_leaf": [10, 20, 50, 100],
+            "l2_regularization": [0.0, 0.1, 1.0],
+        },
+        "resource": ("max_iter", 50, 450),
+    },
+    "linear": {"make": lambda params, n_jobs: LinearRegression(**params), "resource": None},
+    "persistence": {"make": lambda params, n_jobs: PersistenceRegressor(**params), "resource": None},
+}
+
+
+def load_training_data() -> pd.DataFrame:
+    """Features triées par date (vue PostgreSQL ou dataset/CSV selon FEATURES_SOURCE)."""
+    cols = ["date_stat", TARGET_COL] + FEATURE_COLS
+    if FEATURES_SOURCE == "db":
+        from prediction.features_sql import load_features_db
+        data = load_features_db(MALADIE_CIBLE, columns=cols)
+    else:
+        data = read_table(FEATURES_CSV, columns=cols)
+    return data.sort_values("date_stat", kind="stable").reset_index(drop=True)
+
+
+def _estimate_candidates(backend: dict, X, y, folds, budget_s: float, n_jobs: int) -> int:
+    """Nombre de candidats tenant dans `budget_s` secondes (estimation).
+
+    Chaque tour de halving coûte à peu près pareil (candidats / FACTOR, ressource x FACTOR),
+    soit ~ n_candidats x min_ressource unités (arbres, itérations) par pli. On chronomètre
+    un petit ajustement sur le dernier pli pour obtenir le coût d'une unité.
+    """
+    name, lo, hi = backend["resource"]
+    tr = folds[-1][0]
+    probe = backend["make"]({name: 10}, 1)
+    t0 = time.perf_counter()
+    probe.fit(X.iloc[tr], y[tr])
+    per_unit = (time.perf_counter() - t0) / 10
+    n_iter = int(np.floor(np.log(hi / lo) / np.log(FACTOR))) + 1
+    cost_per_candidate = n_iter * lo * len(folds) * per_unit / n_jobs
+    return max(FACTOR, int(budget_s / cost_per_candidate))
+
+
+def search(backend: dict, X, y, folds, mode: str, budget_s: float, n_jobs: int):
+    """Recherche d'hyperparamètres d'un backend (parallélisme au niveau de la recherche
+    uniquement, estimateurs en n_jobs=1 : pas de sur-souscription)."""
+    estimator = backend["make"]({}, 1)
+    if mode == "grid":
+        return GridSearchCV(estimator, param_grid=backend["grid"], scoring="neg_mean_squared_error",
+                            cv=folds, n_jobs=n_jobs, refit=False, verbose=1).fit(X, y)
+    if mode == "budget":
+        name, lo, hi = backend["resource"]
+        n_candidates = _estimate_candidates(backend, X, y, folds, budget_s, n_jobs)
+        print(f" Budget {budget_s:.0f}s, {n_jobs} coeur(s) → {n_candidates} candidats")
+        return HalvingRandomSearchCV(
+            estimator, backend["distributions"], n_candidates=n_candidates, resource=name,
+            min_resources=lo, max_resources=hi, factor=FACTOR,
+            scoring="neg_mean_squared_error", cv=folds, n_jobs=n_jobs, refit=False,
+            random_state=RANDOM_STATE, verbose=1,
+        ).fit(X, y)
+    raise ValueError(f"Mode d'entraînement inconnu: {mode!r} (grid|budget)")
+
+
+def write_search_report(reports: dict, path=SEARCH_REPORT_CSV) -> pd.DataFrame:
+    """Une ligne par candidat évalué : temps d'ajustement vs score (RMSE de validation)."""
+    cols = ["mean_fit_time", "std_fit_time", "mean_score_time", "mean_test_score", "std_test_score", "rank_test_score"]
+    parts = []
+    for backend, cv_results in reports.items():
+        res = pd.DataFrame(cv_results)
+        part = res[[c for c in ("iter", "n_resources") if c in res] + cols].copy()
+        part.insert(0, "backend", backend)
+        part["rmse_cv"] = np.sqrt(-part["mean_test_score"])
+        part["params"] = res["params"].astype(str)
+        parts.append(part.sort_values(["rank_test_score", "mean_fit_time"]))
+    report = pd.concat(parts, ignore_index=True)
+    report.to_csv(path, index=False)
+    print(f" Rapport de recherche → {path.resolve()}  ({len(report)} évaluations)")
+    return report
+
+
+def finalists(cv_results: dict, k: int, drop=()) -> list:
+    """Les k meilleurs jeux de paramètres distincts. En halving, les candidats des derniers
+    tours (évalués avec la plus grande ressource) passent d'abord, puis on complète avec les
+    tours précédents. `drop` : paramètres ignorés (ressource du halving, fixée ensuite)."""
+    res = pd.DataFrame(cv_results)
+    keys, asc = (["iter", "rank_test_score"], [False, True]) if "iter" in res else ("rank_test_score", True)
+    out = []
+    for params in res.sort_values(keys, ascending=asc)["params"]:
+        params = {k_: v for k_, v in params.items() if k_ not in drop}
+        if params not in out:
+            out.append(params)
+        if len(out) == max(1, k):
+            break
+    return out
+
+
+def save_model(model, path=MODEL_PATH):
+    """Artefacts servis : le .pkl (et sa version), et la forêt compacte quand le modèle
+    est fait d'arbres sklearn (sinon on retire une forêt compacte d'un modèle précédent)."""
+    dump(model, path)
+    write_model_version(path)
+    print(f" Modèle sauvegardé → {path.resolve()}")
+    try:
+        export_compact(path)
+    except TypeError:
+        remove_dir(compact_path(path))
+
+
+def run_train(backends=TRAIN_BACKENDS, mode: str = TRAIN_MODE, budget_s: float = TRAIN_BUDGET_S):
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        raise ValueError(f"Backend(s) inconnu(s): {unknown} ({'|'.join(BACKENDS)})")
+    print(f"🏋️ Entraînement (cible = {TARGET_COL}, backends={','.join(backends)}, mode={mode})")
+    data = load_training_data()
+    X = data[FEATURE_COLS].copy()
+    y = data[TARGET_COL].astype(float).values
+
+    # Split temporel : les dernières dates servent de test (pas de fuite du futur)
+    tr, te = temporal_split(data["date_stat"], test_size=0.2)
+    X_train, X_test, y_train, y_test = X.iloc[tr], X.iloc[te], y[tr], y[te]
+    folds = date_folds(data["date_stat"].iloc[tr], n_splits=3)
+    n_jobs = available_cores()
+
+    # Le budget est partagé entre les backends qui ont une recherche
+    searched = [b for b in backends if BACKENDS[b]["resource"] is not None]
+    reports, candidates = {}, []
+    for b in backends:
+        backend = BACKENDS[b]
+        if backend["resource"] is None:
+            candidates.append((b, {}))
+            continue
+        t0 = time.perf_counter()
+        result = search(backend, X_train, y_train, folds, mode, budget_s / len(searched), n_jobs)
+        print(f" Recherche {b} terminée en {time.perf_counter() - t0:.1f}s")
+        reports[b] = result.cv_results_
+        name, _, hi = backend["resource"]
+        drop = (name,) if mode == "budget" else ()
+        for params in finalists(result.cv_results_, TRAIN_FINALISTS, drop):
+            if mode == "budget":
+                params[name] = hi
+            candidates.append((b, params))
+    if reports:
+        write_search_report(reports)
+
+    # Finalistes réajustés sur tout le train (tous les coeurs pour l'estimateur) puis
+    # mesurés tels que l'API les servirait ; choix sous budgets de service
+    results, models = [], {}
+    for i, (b, params) in enumerate(candidates):
+        name = f"{b}_{i + 1}"
+        models[name] = BACKENDS[b]["make"](params, n_jobs)
+        results.append(benchmark_model(name, models[name], X_test, y_test, X_train, y_train,
+                                       workdir=MODEL_PATH.parent, params=params))
+        r = results[-1]
+        print(f" {name}: RMSE {r['rmse']:.6f} | fit {r['fit_s']:.1f}s | {r['serve_mb']:.1f} Mo | "
+              f"p99 1 ligne {r['single_p99_ms']:.2f} ms | {params}")
+
+    chosen = select_model(results, SELECT_MAX_P99_MS, SELECT_MAX_SIZE_MB)
+    write_report(results, chosen, BENCHMARK_REPORT,
+                 {"max_p99_ms": SELECT_MAX_P99_MS, "max_size_mb": SELECT_MAX_SIZE_MB})
+    print(f" Retenu: {chosen['name']} {chosen['params']}")
+    print(f" R² (test): {chosen['r2']:.4f} | RMSE (test): {chosen['rmse']:.6f}")
+    save_model(models[chosen["name"]])
+
+    # Retour métriques pour log
+    return {"backend": chosen["name"].rsplit("_", 1)[0], "r2": chosen["r2"], "rmse": chosen["rmse"],
+            "best_params": chosen["params"]}
+
+
+def main(argv=None, backends=TRAIN_BACKENDS):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", default=",".join(backends), help=f"parmi {','.join(BACKENDS)}")
+    ap.add_argument("--mode", choices=["grid", "budget"], default=TRAIN_MODE)
+    ap.add_argument("--budget-s", type=float, default=TRAIN_BUDGET_S)
+    args = ap.parse_args(argv)
+    run_train([b for b in args.backends.split(",") if b], args.mode, args.budget_s)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# tests/benchmarks/conftest.py
+# Benchmarks des chemins chauds (pytest-benchmark), hors ligne, sur les données synthétiques
+# de bench/synthetic_data.py à plusieurs tailles (SIZES). Ignorés sans --run-bench.
+#   pytest tests/benchmarks --run-bench --benchmark-autosave      enregistre une référence (0001…)
+#   pytest tests/benchmarks --run-bench --benchmark-compare --benchmark-compare-fail=median:25%
+#       compare à la dernière référence (ou --benchmark-compare=0001) ; échec au-delà de +25 %
+# Références dans .benchmarks/<machine>/ (--benchmark-storage pour un autre dossier) : une
+# latence ne se compare qu'à une mesure de la même machine.
+import importlib
+
+import joblib
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import data_cleaner
+from bench.synthetic_data import generate
+from prediction.config import FEATURE_COLS, TARGET_COL
+
+# {taille: (régions, jours)}
+SIZES = {"S": (20, 180), "M": (100, 365), "L": (230, 900)}
+
+
+@pytest.fixture(params=list(SIZES))
+def size(request) -> str:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def raw_data(tmp_path_factory):
+    """Dossier des CSV bruts d'une taille (générés une fois par session)."""
+    cache = {}
+
+    def get(size: str):
+        if size not in cache:
+            regions, jours = SIZES[size]
+            cache[size] = tmp_path_factory.mktemp(f"raw_{size}")
+            generate(cache[size], n_regions=regions, jours=jours, seed=0)
+        return cache[size]
+    return get
+
+
+@pytest.fixture(scope="session")
+def clean_data(raw_data, tmp_path_factory):
+    """clean_data.csv d'une taille, comme la collecte : daily covid nettoyé + population."""
+    cache = {}
+
+    def get(size: str):
+        if size not in cache:
+            old, data_cleaner.DATA_DIR = data_cleaner.DATA_DIR, raw_data(size)
+            try:
+                daily = data_cleaner.nettoyer_covid_daily()
+                summary = data_cleaner.nettoyer_covid_summary()
+            finally:
+                data_cleaner.DATA_DIR = old
+            df = daily.merge(summary[["nom_pays", "continent", "population"]], on="nom_pays")
+            cache[size] = tmp_path_factory.mktemp(f"clean_{size}") / "clean_data.csv"
+            df.to_csv(cache[size], index=False)
+        return cache[size]
+    return get
+
+
+@pytest.fixture(scope="session")
+def features(clean_data, tmp_path_factory):
+    """Features (dataset + store mmap) et modèle .pkl d'une taille, comme le pipeline."""
+    fe = importlib.import_module("prediction.2_features_engineering")
+    cache = {}
+
+    def get(size: str):
+        if size not in cache:
+            out = tmp_path_factory.mktemp(f"features_{size}")
+            saved = fe.CLEAN_DATA_CSV, fe.FEATURES_CSV
+            fe.CLEAN_DATA_CSV, fe.FEATURES_CSV = clean_data(size), out / "features_data.csv"
+            try:
+                df = fe.run_features()
+            finally:
+                fe.CLEAN_DATA_CSV, fe.FEATURES_CSV = saved
+            sample = df.sample(min(len(df), 20_000), random_state=0)
+            model = RandomForestRegressor(n_estimators=50, max_depth=12, random_state=0, n_jobs=1)
+            model.fit(sample[FEATURE_COLS], sample[TARGET_COL])
+            joblib.dump(model, out / "model_taux_transmission_rf.pkl")
+            cache[size] = {"dir": out, "features_csv": out / "features_data.csv",
+                           "model_path": out / "model_taux_transmission_rf.pkl",
+                           "pays": sorted(df["nom_pays"].unique())[0]}
+        return cache[size]
+    return get
+
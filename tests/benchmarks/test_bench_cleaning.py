@@ -0,0 +1,25 @@
+# tests/benchmarks/test_bench_cleaning.py
+import pandas as pd
+import pytest
+
+import data_cleaner
+from bench.synthetic_data import regions
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.benchmark(group="nettoyer_nom_pays")
+@pytest.mark.parametrize("n", [1_000, 10_000, 100_000])
+def test_nettoyer_nom_pays(benchmark, n):
+    # noms bruts accentués, répétés comme dans les CSV (un par jour et par pays)
+    noms = pd.Series(regions(1_000)["country"].to_numpy().repeat(n // 1_000))
+    out = benchmark(noms.apply, data_cleaner.nettoyer_nom_pays)
+    assert len(out) == n
+
+
+@pytest.mark.benchmark(group="nettoyage")
+@pytest.mark.parametrize("cleaner", ["nettoyer_covid_daily", "nettoyer_monkeypox", "nettoyer_covid_summary"])
+def test_cleaners(benchmark, raw_data, monkeypatch, cleaner, size):
+    monkeypatch.setattr(data_cleaner, "DATA_DIR", raw_data(size))
+    df = benchmark(getattr(data_cleaner, cleaner))
+    assert not df.empty
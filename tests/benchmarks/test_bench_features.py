@@ -0,0 +1,17 @@
+# tests/benchmarks/test_bench_features.py
+import importlib
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+fe = importlib.import_module("prediction.2_features_engineering")
+
+
+@pytest.mark.benchmark(group="run_features")
+def test_run_features(benchmark, clean_data, tmp_path, monkeypatch, size):
+    # lecture clean_data → kernel → dataset Parquet + store mmap, comme le pipeline
+    monkeypatch.setattr(fe, "CLEAN_DATA_CSV", clean_data(size))
+    monkeypatch.setattr(fe, "FEATURES_CSV", tmp_path / "features_data.csv")
+    df = benchmark.pedantic(fe.run_features, rounds=5, warmup_rounds=1)
+    assert df[fe.FEATURE_NAMES].notna().all().all()
@@ -0,0 +1,68 @@
+# tests/benchmarks/test_bench_serving.py
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import api.ml_router as ml
+from prediction.config import TARGET_COL
+
+pytest.importorskip("pytest_benchmark")
+
+# caches vidés avant chaque appel : froid = chargement du modèle + lecture des features +
+# prédiction + sérialisation ; model_loaded = tout sauf le chargement ; series_cached = LRU
+_RESET = {
+    "cold": [ml._models, ml._stores, ml._features_cache, ml._series_cache],
+    "model_loaded": [ml._features_cache, ml._series_cache],
+    "series_cached": [],
+}
+
+
+@pytest.fixture()
+def client(features, size, tmp_path, monkeypatch):
+    f = features(size)
+    monkeypatch.setattr(ml, "ARTIFACTS_DIR", tmp_path)  # pas d'artefacts par maladie
+    monkeypatch.setattr(ml, "MODEL_PATH", f["model_path"])
+    monkeypatch.setattr(ml, "FEATURES_CSV", f["features_csv"])
+    for cache in _RESET["cold"]:
+        cache.clear()
+    app = FastAPI()
+    app.include_router(ml.router)
+    yield TestClient(app), f["pays"]
+    for cache in _RESET["cold"]:
+        cache.clear()
+
+
+@pytest.mark.benchmark(group="predict_series")
+@pytest.mark.parametrize("state", list(_RESET))
+def test_predict_series(benchmark, client, state):
+    http, pays = client
+    url = f"/ml/predict_series/{pays}"
+    assert http.get(url).status_code == 200  # amorce (imports, exécuteur, caches)
+
+    def reset():
+        for cache in _RESET[state]:
+            cache.clear()
+
+    r = benchmark.pedantic(http.get, args=(url,), setup=reset, rounds=20, warmup_rounds=1)
+    assert r.status_code == 200 and r.json()["points"]
+
+
+@pytest.mark.benchmark(group="json_series")
+@pytest.mark.parametrize("n", [1_000, 10_000, 50_000])  # 50 000 jours : ~137 ans, borne des dates pandas
+def test_series_json(benchmark, n):
+    # _points (DataFrame → dicts JSON-safe) puis encodage de la réponse, comme FastAPI
+    rng = np.random.default_rng(0)
+    d = pd.DataFrame({"date_stat": pd.date_range("2020-01-22", periods=n),
+                      TARGET_COL: np.where(rng.random(n) < 0.05, np.nan, rng.random(n) * 1e-3)})
+    y = rng.random(n) * 1e-3
+
+    def serialize(d):
+        payload = {"nom_pays": "region_00001", "points": ml._points(d, y)}
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    body = benchmark.pedantic(serialize, setup=lambda: ((d.copy(),), {}), rounds=5, warmup_rounds=1)
+    assert body.count(b'"date"') == n
@@ -76,7 +76,9 @@ def tmp_model_and_features(tmp_path: Path):
 def test_client(tmp_model_and_features):
     """FastAPI minimal avec le router ML, patché pour utiliser les fichiers temporaires."""
     # reset / rediriger vers les artefacts temporaires
-    ml._model = None
+    ml._models.clear()
+    ml._features_cache.clear()
+    ml._series_cache.clear()
     ml.MODEL_PATH = tmp_model_and_features["model_path"]
     ml.FEATURES_CSV = tmp_model_and_features["features_csv"]
 
@@ -85,6 +87,24 @@ def test_client(tmp_model_and_features):
     return TestClient(app)
 
 
+# --- Benchmarks (tests/benchmarks) : ignorés sauf avec --run-bench ---
+BENCH_DIR = Path(__file__).resolve().parent / "benchmarks"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-bench", action="store_true",
+                     help="lance les benchmarks pytest-benchmark de tests/benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-bench"):
+        return
+    skip = pytest.mark.skip(reason="benchmark : relancer avec --run-bench")
+    for item in items:
+        if BENCH_DIR in item.path.parents:
+            item.add_marker(skip)
+
+
 # --- Hooks pytest pour afficher START / PASS / FAIL / SKIPPED ---
 def pytest_runtest_logstart(nodeid, location):
     print(f"\n▶ START: {nodeid}")
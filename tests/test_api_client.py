@@ -0,0 +1,109 @@
+# tests/test_api_client.py
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from api_client import ApiClient, ApiError  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    hits, peers = [], set()
+    version = None  # X-Data-Version renvoyé (None : pas d'en-tête)
+
+    def do_GET(self):
+        _Handler.hits.append(self.path)
+        _Handler.peers.add(self.client_address[1])
+        if self.path.startswith("/lent"):
+            time.sleep(0.3)
+        code = 404 if self.path == "/absent" else 200
+        tag = f'"{self.path}-{_Handler.version}"'
+        if self.headers.get("If-None-Match") == tag:
+            code = 304
+        body = json.dumps({"path": self.path}).encode() if code != 304 else b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", tag)
+        if _Handler.version is not None:
+            self.send_header("X-Data-Version", _Handler.version)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def api():
+    _Handler.hits, _Handler.peers, _Handler.version = [], set(), None
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+
+
+def test_cache_and_keep_alive(api):
+    client = ApiClient(api, ttl_s=60)
+    for _ in range(3):
+        assert client.fetch("/pays/covid_19") == {"path": "/pays/covid_19"}
+    client.fetch("/pays/mpox")
+    assert _Handler.hits == ["/pays/covid_19", "/pays/mpox"]  # 2e et 3e appels servis du cache
+    assert len(_Handler.peers) == 1  # même connexion TCP réutilisée
+
+
+def test_new_data_version_invalidates_cache(api):
+    client = ApiClient(api, ttl_s=60)
+    _Handler.version = "1"
+    client.fetch("/pays/covid_19")
+    client.fetch("/pays/covid_19")
+    _Handler.version = "2"  # l'ETL a publié : la réponse suivante porte la version 2
+    client.fetch("/stats")
+    client.fetch("/pays/covid_19")
+    assert _Handler.hits == ["/pays/covid_19", "/stats", "/pays/covid_19"]
+    # même effet quand la version arrive par le flux SSE
+    client._observe_version("3")
+    client.fetch("/stats")
+    assert _Handler.hits[-1] == "/stats" and len(_Handler.hits) == 4
+
+
+def test_stale_entries_are_revalidated(api):
+    client = ApiClient(api, ttl_s=0)  # tout est périmé : chaque appel revalide
+    parsed = []
+    parse = lambda js: parsed.append(js) or dict(js)
+    first = client.fetch_frame("/evolution/covid_19/France", parse)
+    again = client.fetch_frame("/evolution/covid_19/France", parse)
+    assert again is first and len(parsed) == 1  # 304 : ni corps ni nouveau parse
+    assert _Handler.hits == ["/evolution/covid_19/France"] * 2
+
+    _Handler.version = "2"  # les données ont changé : 200 et nouveau parse
+    assert client.fetch_frame("/evolution/covid_19/France", parse) is not first
+    assert len(parsed) == 2
+
+
+def test_errors_are_not_cached(api):
+    client = ApiClient(api)
+    for _ in range(2):
+        with pytest.raises(ApiError) as e:
+            client.fetch("/absent")
+        assert e.value.status == 404
+    assert _Handler.hits == ["/absent", "/absent"]
+
+
+def test_fetch_many_runs_in_parallel(api):
+    client = ApiClient(api)
+    t0 = time.perf_counter()
+    a, b, c = client.fetch_many(["/lent/1", "/lent/2", "/absent"])
+    assert time.perf_counter() - t0 < 0.55
+    assert a == {"path": "/lent/1"} and b == {"path": "/lent/2"} and isinstance(c, ApiError)
+
+
+def test_health_state(api):
+    assert ApiClient(api).is_up()
+    assert not ApiClient("http://127.0.0.1:9", health_interval_s=60).is_up()
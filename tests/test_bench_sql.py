@@ -0,0 +1,29 @@
+# tests/test_bench_sql.py
+from bench.bench_sql import compare
+
+
+def _r(p50=1.0, hit=100, plan=("Index Only Scan statistique_pkey",), issues=()):
+    return {"p50_ms": p50, "p99_ms": p50, "shared_hit": hit, "shared_read": 0,
+            "plan": list(plan), "issues": list(issues)}
+
+
+def test_compare_flags_plan_latency_and_buffer_regressions():
+    base = {"evolution": _r(), "top": _r(p50=50.0), "recent": _r()}
+    current = {
+        "evolution": _r(plan=("Seq Scan statistique_covid_19",)),
+        "top": _r(p50=90.0),
+        "recent": _r(hit=400, p50=1.9),  # +0.9 ms : sous le plancher de 1 ms
+    }
+    assert compare(current, base, tolerance=0.5, min_ms=1.0) == [
+        "evolution: plan modifié (- Index Only Scan statistique_pkey ; + Seq Scan statistique_covid_19)",
+        "top: p50 50.00 → 90.00 ms",
+        "recent: blocs lus 100 → 400",
+    ]
+
+
+def test_compare_within_tolerance_and_plan_issues():
+    base = {"evolution": _r(p50=10.0, hit=100)}
+    assert compare({"evolution": _r(p50=14.0, hit=140)}, base, tolerance=0.5, min_ms=1.0) == []
+    # écart au plan attendu signalé même sans référence
+    assert compare({"pays": _r(issues=["statistique_pkey non utilisé"])}, {}, 0.5, 1.0) == [
+        "pays: statistique_pkey non utilisé"]
@@ -0,0 +1,38 @@
+# tests/test_charts.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from charts import downsample, line_chart, lttb_indices  # noqa: E402
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    x = np.arange(5000)
+    y = np.sin(x / 300.0)
+    y[3217] = 50.0  # pic isolé
+    idx = lttb_indices(x, y, 200)
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == 4999
+    assert 3217 in idx
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_downsample_dates_and_short_series():
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=3000), "v": np.arange(3000.0)})
+    assert len(downsample(df, "date", ["v"], 500)) == 500
+    assert len(downsample(df.head(100), "date", ["v"], 500)) == 100
+
+
+def test_line_chart_budget_and_webgl_switch():
+    n = 4000
+    df = pd.DataFrame({"d": pd.date_range("2020-01-01", periods=n), "a": np.random.rand(n), "b": np.random.rand(n)})
+    fig = line_chart(df, "d", ["a", "b"], budget=2000)
+    assert [len(t.x) for t in fig.data] == [1000, 1000]
+    assert all(isinstance(t, go.Scattergl) for t in fig.data)
+
+    small = line_chart(df.head(300), "d", "a")
+    assert isinstance(small.data[0], go.Scatter) and len(small.data[0].x) == 300
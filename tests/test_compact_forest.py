@@ -0,0 +1,48 @@
+# tests/test_compact_forest.py
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.dummy import DummyRegressor
+
+import api.ml_router as ml
+from prediction.compact_forest import compact_path, load_compact_forest, save_compact_forest
+
+
+@pytest.mark.parametrize("max_depth", [None, 4])
+def test_compact_forest_matches_sklearn(tmp_path, max_depth):
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(300, 5)), columns=list("abcde"))
+    y = X["a"] * 2 + rng.normal(size=300)
+    rf = RandomForestRegressor(n_estimators=15, max_depth=max_depth, random_state=0).fit(X, y)
+
+    path = save_compact_forest(rf, tmp_path / "m.forest")
+    cf = load_compact_forest(path)
+    X_new = pd.DataFrame(rng.normal(size=(50, 5)), columns=list("abcde"))
+
+    np.testing.assert_allclose(cf.predict(X_new), rf.predict(X_new), rtol=1e-12)
+    # ligne seule + colonnes dans le désordre (réordonnées par nom)
+    np.testing.assert_allclose(cf.predict(X_new.iloc[:1, ::-1]), rf.predict(X_new.iloc[:1]), rtol=1e-12)
+
+
+def test_compact_forest_rejects_non_tree_model(tmp_path):
+    m = DummyRegressor().fit(np.zeros((2, 1)), [0.0, 1.0])
+    with pytest.raises(TypeError):
+        save_compact_forest(m, tmp_path / "m.forest")
+
+
+def test_router_serves_compact_forest(test_client, tmp_model_and_features):
+    model_path = tmp_model_and_features["model_path"]
+    rf = joblib.load(model_path)
+    save_compact_forest(rf, compact_path(model_path), source=model_path)
+
+    r = test_client.get("/ml/predict_series/France")
+    assert r.status_code == 200
+    assert isinstance(ml.get_model(), type(load_compact_forest(compact_path(model_path))))
+
+    df = pd.read_csv(tmp_model_and_features["features_csv"], parse_dates=["date_stat"])
+    d = df[df["nom_pays"] == "France"].sort_values("date_stat")
+    expected = rf.predict(d[tmp_model_and_features["feature_cols"]])
+    got = [p["taux_pred"] for p in r.json()["points"]]
+    np.testing.assert_allclose(got, expected, rtol=1e-12)
@@ -0,0 +1,81 @@
+# tests/test_data_events.py
+# Nécessite une base PostgreSQL joignable (variables PG*) ; sinon le test est sauté.
+# Schéma jetable migré (table data_version) ; le NOTIFY, lui, est global à la base.
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import data_events
+from data_version import publish_version
+from db_config import get_connexion
+from db_schema import migrate
+
+
+@pytest.fixture()
+def db_schema(monkeypatch):
+    try:
+        conn = get_connexion()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL indisponible: {e}")
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+    conn.commit()
+    monkeypatch.setenv("PGOPTIONS", f"-c search_path={schema}")
+    migrate()
+    yield schema
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def _wait_for(pred, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_notify_reaches_api(db_schema):
+    data_events.current_version()  # démarre l'écoute
+    # l'écouteur peut ne pas être encore abonné : on republie jusqu'à réception
+    seen = False
+    for _ in range(25):
+        v = publish_version("test")
+        if _wait_for(lambda: data_events.current_version() == v, 0.2):
+            seen = True
+            break
+    assert seen
+
+    app = FastAPI()
+    app.add_middleware(data_events.VersionHeaderMiddleware)
+    app.include_router(data_events.router)
+    client = TestClient(app)
+
+    r = client.get("/data_version")
+    assert r.json() == {"version": v} and r.headers["X-Data-Version"] == str(v)
+
+    # long-poll : rend la main dès le commit suivant, bien avant `wait`
+    threading.Timer(0.3, publish_version, args=("test",)).start()
+    t0 = time.perf_counter()
+    r = client.get("/data_version", params={"since": v, "wait": 10})
+    assert r.json()["version"] == v + 1
+    assert time.perf_counter() - t0 < 5
+
+    # sans changement : attend `wait` puis renvoie la même version
+    assert client.get("/data_version", params={"since": v + 1, "wait": 0.2}).json() == {"version": v + 1}
+
+
+def test_version_waits_for_replica(monkeypatch):
+    replayed = iter([None, 4, 4, 5])  # réplique injoignable/en retard, puis à jour
+    monkeypatch.setattr(data_events, "PG_READ_DSN", "host=replique")
+    monkeypatch.setattr(data_events, "_replica_version", lambda: next(replayed))
+    data_events._wait_for_replica(5)
+    assert next(replayed, "fin") == "fin"  # rendu la main dès la version rejouée, pas avant
@@ -0,0 +1,61 @@
+# tests/test_datasets.py
+import pandas as pd
+
+from prediction.datasets import (
+    CLEAN_SCHEMA, append_dataset, csv_to_dataset, dataset_countries, dataset_path, read_dataset,
+    read_table, write_table,
+)
+
+
+def _clean(n_days=300):
+    return pd.DataFrame({
+        "date_stat": pd.date_range("2021-01-01", periods=n_days, freq="D").repeat(2),
+        "nom_pays": ["albania", "United States"] * n_days,
+        "continent": "Europe",
+        "population": [2.8e6, 3.3e8] * n_days,
+        "nouveaux_cas": range(2 * n_days),
+        "cas_totaux": 0,
+    })
+
+
+def test_csv_to_dataset_streams_typed_partitions(tmp_path):
+    df = _clean()
+    csv = tmp_path / "clean_data.csv"
+    df.to_csv(csv, index=False)
+
+    path = dataset_path(csv)
+    assert csv_to_dataset(csv, path, column_types=CLEAN_SCHEMA, block_size=4096) == len(df)  # plusieurs blocs
+    assert dataset_countries(path) == ["United States", "albania"]
+
+    back = read_dataset(path)
+    assert str(back["nouveaux_cas"].dtype) == "int64"
+    ref = df.sort_values(["nom_pays", "date_stat"], kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(back[ref.columns], ref, check_dtype=False)
+
+
+def test_projection_filter_and_append(tmp_path):
+    csv = tmp_path / "features_data.csv"
+    df = _clean(10)
+    write_table(df, csv, export_csv=False)
+    assert not csv.exists()
+
+    one = read_table(csv, columns=["date_stat", "nouveaux_cas"], nom_pays="albania")
+    assert list(one.columns) == ["date_stat", "nouveaux_cas"]
+    assert len(one) == 10 and one["date_stat"].is_monotonic_increasing
+
+    extra = _clean(12).iloc[20:]  # 2 jours de plus par pays
+    served = dataset_path(csv).resolve()  # version ouverte par un lecteur avant l'ajout
+    append_dataset(extra, dataset_path(csv))
+    assert len(read_table(csv, nom_pays="United States")) == 12
+    assert dataset_path(csv).resolve() != served  # nouvelle version publiée ...
+    assert len(read_dataset(served, nom_pays="United States")) == 10  # ... l'ancienne intacte
+
+
+def test_router_serves_from_dataset(test_client, tmp_model_and_features):
+    csv = tmp_model_and_features["features_csv"]
+    from_csv = test_client.get("/ml/predict_series/Spain").json()
+    write_table(pd.read_csv(csv, parse_dates=["date_stat"]), csv, export_csv=False)
+    csv.unlink()
+
+    assert test_client.get("/ml/available_countries").json() == {"countries": ["France", "Spain"]}
+    assert test_client.get("/ml/predict_series/Spain").json() == from_csv
@@ -0,0 +1,31 @@
+# tests/test_db_config.py
+# Nécessite une base PostgreSQL joignable (variables PG*) ; sinon le test est sauté.
+import pytest
+
+import db_config
+
+
+def _app_name(conn):
+    with conn.cursor() as cur:
+        cur.execute("SHOW application_name")
+        return cur.fetchone()[0]
+
+
+def test_readonly_connections_use_read_dsn(monkeypatch):
+    # même serveur, mais reconnaissable : les champs du DSN complètent ceux du primaire
+    monkeypatch.setattr(db_config, "PG_READ_DSN", "application_name=lecture")
+    try:
+        primary = db_config.get_connexion()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL indisponible: {e}")
+    replica = db_config.get_connexion(readonly=True)
+    try:
+        assert _app_name(replica) == "lecture" and _app_name(primary) != "lecture"
+    finally:
+        primary.close()
+        replica.close()
+
+    monkeypatch.setattr(db_config, "PG_READ_DSN", "")
+    conn = db_config.get_connexion(readonly=True)  # sans réplique : le primaire
+    assert _app_name(conn) != "lecture"
+    conn.close()
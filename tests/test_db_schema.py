@@ -0,0 +1,137 @@
+# tests/test_db_schema.py
+# Nécessite une base PostgreSQL joignable (variables PG*) ; sinon les tests sont sautés.
+# Schéma jetable (search_path via PGOPTIONS) contenant une base « d'avant » : statistique
+# non partitionnée, clé primaire id_statistique, sans les colonnes lissées.
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import db_schema
+from api.queries import PLAN_CHECKS
+from db_config import get_connexion
+
+N_PAYS, N_JOURS = 60, 400
+
+
+@pytest.fixture()
+def legacy_schema(monkeypatch):
+    try:
+        conn = get_connexion()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL indisponible: {e}")
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path = {schema}")
+        cur.execute("""
+            CREATE TABLE pays (id_pays serial PRIMARY KEY, nom_pays text UNIQUE, continent text, population bigint);
+            CREATE TABLE maladie (id_maladie serial PRIMARY KEY, nom_maladie text UNIQUE);
+            CREATE TABLE statistique (
+                id_statistique bigserial PRIMARY KEY,
+                date_stat date, id_pays int REFERENCES pays, id_maladie int REFERENCES maladie,
+                cas_totaux bigint, nouveaux_cas bigint, cas_actifs bigint,
+                deces_totaux bigint, nouveaux_deces bigint,
+                UNIQUE (date_stat, id_pays, id_maladie)
+            );
+            INSERT INTO maladie (nom_maladie) VALUES ('covid_19'), ('monkeypox');
+        """)
+        cur.execute("""
+            INSERT INTO pays (nom_pays, continent, population)
+            SELECT format('pays_%%s', i), (ARRAY['Europe', 'Asia', 'Africa'])[1 + i %% 3], 1000000 + i
+            FROM generate_series(1, %s) i
+        """, (N_PAYS,))
+        cur.execute("""
+            INSERT INTO statistique (date_stat, id_pays, id_maladie, cas_totaux, nouveaux_cas, deces_totaux, nouveaux_deces)
+            SELECT DATE '2021-01-01' + j, p, m, j * p, p, j, 1
+            FROM generate_series(0, %s - 1) j, generate_series(1, %s) p, generate_series(1, 2) m
+        """, (N_JOURS, N_PAYS))
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("PGOPTIONS", f"-c search_path={schema}")
+    yield schema
+    conn = get_connexion()
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def test_migrate_partitions_legacy_table_and_plans(legacy_schema):
+    assert db_schema.migrate() == len(db_schema.MIGRATIONS)
+    assert db_schema.migrate() == 0  # idempotent
+
+    conn = get_connexion()
+    try:
+        with conn.cursor() as cur:
+            assert db_schema._relkind(cur, "statistique") == "p"
+            by_id, default = db_schema._partitions(cur)
+            assert by_id == {1: "statistique_covid_19", 2: "statistique_monkeypox"}
+            assert default == "statistique_autres"
+            cur.execute("SELECT COUNT(*), COUNT(DISTINCT id_statistique) FROM statistique")
+            assert cur.fetchone() == (2 * N_PAYS * N_JOURS,) * 2
+            # écritures de l'ETL : cible ON CONFLICT et séquence reprises
+            cur.execute("""
+                INSERT INTO statistique (date_stat, id_pays, id_maladie, nouveaux_cas_lisses)
+                VALUES ('2021-01-01', 1, 2, 1.5), ('2030-01-01', 1, 2, 1.5)
+                ON CONFLICT (date_stat, id_pays, id_maladie) DO NOTHING
+                RETURNING id_statistique
+            """)
+            [(new_id,)] = cur.fetchall()  # la ligne en conflit consomme aussi un numéro
+            assert new_id > 2 * N_PAYS * N_JOURS
+        conn.commit()
+    finally:
+        conn.close()
+
+    db_schema.vacuum_analyze()
+    report = db_schema.check_plans()
+    assert [name for name, _, _ in report] == list(PLAN_CHECKS)
+    assert {name: issues for name, _, issues in report} == {name: [] for name in PLAN_CHECKS}
+
+
+def test_fresh_schema_takes_etl_rows_with_missing_values(legacy_schema, monkeypatch):
+    import etl_main
+
+    fresh = f"{legacy_schema}_neuf"
+    conn = get_connexion()
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {fresh}")
+    conn.commit()
+    monkeypatch.setenv("PGOPTIONS", f"-c search_path={fresh}")
+    try:
+        assert db_schema.migrate() == len(db_schema.MIGRATIONS)
+        covid = pd.DataFrame({
+            "date_stat": ["2020-03-02", "2020-03-01"], "nom_pays": "france",
+            "cas_totaux": [12.0, 10.0], "nouveaux_cas": [2.0, np.nan], "cas_actifs": np.nan,
+            "deces_totaux": [1.0, 0.0], "nouveaux_deces": [1.0, np.nan],
+        })
+        summary = pd.DataFrame({"nom_pays": ["france"], "continent": ["Europe"], "population": [np.nan]})
+        assert etl_main.inserer_pays([covid])
+        assert etl_main.enrichir_pays_summary(summary)
+        assert etl_main.inserer_statistiques_covid(covid)
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT date_stat::text, nouveaux_cas, cas_actifs FROM {fresh}.statistique ORDER BY 1")
+            assert cur.fetchall() == [("2020-03-01", None, None), ("2020-03-02", 2, None)]
+            cur.execute(f"SELECT partition FROM (SELECT tableoid::regclass::text AS partition FROM {fresh}.statistique) t")
+            assert {r[0] for r in cur.fetchall()} == {f"{fresh}.statistique_covid_19"}
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {fresh} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+def test_plan_issues_reports_missing_index_and_pruning():
+    plan = {"Plan": {"Node Type": "Append", "Plans": [
+        {"Node Type": "Seq Scan", "Relation Name": "statistique_covid_19", "Actual Loops": 1},
+        {"Node Type": "Seq Scan", "Relation Name": "statistique_monkeypox", "Actual Loops": 1},
+        {"Node Type": "Index Scan", "Relation Name": "statistique_autres", "Actual Loops": 0,
+         "Index Name": "statistique_autres_pkey"},
+    ]}}
+    parts = {"statistique_covid_19", "statistique_monkeypox", "statistique_autres"}
+    parents = {"statistique_autres_pkey": "statistique_pkey"}
+    issues = db_schema.plan_issues(plan, PLAN_CHECKS["evolution"], parents, parts)
+    assert issues == ["2 partitions lues (statistique_covid_19, statistique_monkeypox)",
+                      "statistique_pkey utilisé sans index-only scan"]
+    assert db_schema.plan_issues(plan, PLAN_CHECKS["recent"], parents, parts)[-1] == "statistique_recent_idx non utilisé"
@@ -0,0 +1,64 @@
+# tests/test_feature_kernel.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction.feature_kernel import compute_feature_kernel, history_needed
+
+SPECS = [
+    ("lag1", "lag", "x", 1),
+    ("lag3", "lag", "x", 3),
+    ("mean4", "mean", "x", 4),
+    ("sum2", "sum", "x", 2),
+    ("growth2", "growth", "x", 2),
+]
+
+
+def _reference(df):
+    """Implémentation groupby historique (une passe par feature)."""
+    g = df.groupby("nom_pays", group_keys=False)["x"]
+    roll = lambda w: g.rolling(w, min_periods=w)  # noqa: E731
+    return {
+        "lag1": g.shift(1),
+        "lag3": g.shift(3),
+        "mean4": roll(4).mean().reset_index(level=0, drop=True),
+        "sum2": roll(2).sum().reset_index(level=0, drop=True),
+        "growth2": (df["x"] / g.shift(2)).replace([np.inf, -np.inf], np.nan),
+    }
+
+
+def test_kernel_matches_groupby_with_gaps_and_short_series():
+    rng = np.random.default_rng(0)
+    sizes = {"a": 12, "b": 2, "c": 9}  # "b" plus court que les fenêtres
+    df = pd.DataFrame({
+        "nom_pays": np.repeat(list(sizes), list(sizes.values())),
+        "x": rng.integers(0, 50, sum(sizes.values())).astype(float),
+    })
+    df.loc[[5, 17], "x"] = np.nan  # trous de déclaration
+    df.loc[3, "x"] = 0.0
+
+    got = compute_feature_kernel(df, SPECS)
+    ref = _reference(df)
+    for name in ref:
+        np.testing.assert_allclose(got[name], ref[name].to_numpy(), rtol=1e-12, equal_nan=True, err_msg=name)
+
+
+def test_history_and_bad_spec():
+    assert history_needed(SPECS) == 3
+    df = pd.DataFrame({"nom_pays": ["a"], "x": [1.0]})
+    with pytest.raises(ValueError):
+        compute_feature_kernel(df, [("y", "median", "x", 3)])
+
+
+def test_window_depends_only_on_its_values():
+    # petit pays après un grand : ses fenêtres sont bit à bit celles du pays seul,
+    # comme celles du recalcul incrémental (tail + nouveaux jours)
+    rng = np.random.default_rng(1)
+    small = pd.DataFrame({"nom_pays": "b", "x": rng.random(30) * 1e-9})
+    big = pd.DataFrame({"nom_pays": "a", "x": rng.random(500) * 1e6})
+    specs = [("m7", "mean", "x", 7)]
+    alone = compute_feature_kernel(small, specs)["m7"]
+    after = compute_feature_kernel(pd.concat([big, small], ignore_index=True), specs)["m7"][500:]
+    tail = compute_feature_kernel(small.iloc[10:], specs)["m7"][6:]
+    np.testing.assert_array_equal(after, alone)
+    np.testing.assert_array_equal(tail, alone[16:])
@@ -0,0 +1,55 @@
+# tests/test_feature_store.py
+import pandas as pd
+
+from prediction.feature_store import FeatureStore, export_feature_store, feature_store_path
+
+
+def test_store_roundtrip_per_country(tmp_model_and_features):
+    csv = tmp_model_and_features["features_csv"]
+    df = pd.read_csv(csv, parse_dates=["date_stat"])
+    path = export_feature_store(df, feature_store_path(csv), source=csv)
+
+    store = FeatureStore(path)
+    assert sorted(store.countries) == ["France", "Spain"]
+    got = store.frame("Spain", ["date_stat", "nouveaux_cas"])
+    exp = df[df["nom_pays"] == "Spain"][["nom_pays", "date_stat", "nouveaux_cas"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, exp, check_dtype=False)
+    assert store.frame("Narnia").empty
+
+
+def test_router_same_answer_from_store_and_csv(test_client, tmp_model_and_features):
+    from_csv = test_client.get("/ml/predict_series/Spain").json()
+
+    csv = tmp_model_and_features["features_csv"]
+    df = pd.read_csv(csv, parse_dates=["date_stat"])
+    export_feature_store(df, feature_store_path(csv), source=csv)
+
+    assert test_client.get("/ml/predict_series/Spain").json() == from_csv
+    assert test_client.get("/ml/available_countries").json() == {"countries": ["France", "Spain"]}
+
+
+def test_router_ignores_stale_store(test_client, tmp_model_and_features):
+    csv = tmp_model_and_features["features_csv"]
+    df = pd.read_csv(csv, parse_dates=["date_stat"])
+    export_feature_store(df[df["nom_pays"] == "France"], feature_store_path(csv), source=csv)
+    df.to_csv(csv, index=False)  # CSV réécrit après l'export -> store périmé
+
+    assert test_client.get("/ml/predict_series/Spain").status_code == 200
+
+
+def test_append_parts_and_compaction(tmp_path, monkeypatch):
+    import prediction.feature_store as fs
+
+    df = pd.DataFrame({"nom_pays": ["a"] * 4 + ["b"] * 4,
+                       "date_stat": list(pd.date_range("2021-01-01", periods=4)) * 2,
+                       "x": range(8)})
+    path = fs.export_feature_store(df[df["date_stat"] < "2021-01-03"], tmp_path / "f.store")
+    fs.append_feature_store(df[df["date_stat"] == "2021-01-03"], path)
+    assert FeatureStore(path).meta["parts"] == [4, 2]
+
+    monkeypatch.setattr(fs, "MAX_PARTS", 2)  # 3e partie : recompactage
+    fs.append_feature_store(df[df["date_stat"] == "2021-01-04"], path)
+    store = FeatureStore(path)
+    assert store.meta["parts"] == [8]
+    pd.testing.assert_frame_equal(store.frame("b", ["date_stat", "x"]),
+                                  df[df["nom_pays"] == "b"].reset_index(drop=True), check_dtype=False)
@@ -0,0 +1,82 @@
+# tests/test_features_incremental.py
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+fe = importlib.import_module("prediction.2_features_engineering")
+
+
+def _clean(n_days: int, pays=("albania", "france"), start="2021-01-01"):
+    rng = np.random.default_rng(len(pays) * 100 + n_days)
+    rows = []
+    for i, p in enumerate(pays):
+        for d in pd.date_range(start, periods=n_days, freq="D"):
+            rows.append({"date_stat": d, "nom_pays": p, "continent": "Europe",
+                         "population": 1_000_000 * (i + 1), "nouveaux_cas": int(rng.integers(0, 500)),
+                         "cas_totaux": 0})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture()
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(fe, "CLEAN_DATA_CSV", tmp_path / "clean_data.csv")
+    monkeypatch.setattr(fe, "FEATURES_CSV", tmp_path / "features_data.csv")
+    return tmp_path
+
+
+def test_incremental_matches_full_recompute(paths):
+    full = pd.concat([_clean(40), _clean(3, pays=("tonga",))])
+    # 1er passage sur les 25 premiers jours (tonga: trop court pour une ligne complète)
+    full[full["date_stat"] < "2021-01-26"].to_csv(fe.CLEAN_DATA_CSV, index=False)
+    fe.run_features()
+
+    # nouveaux jours + nouveau pays ajoutés en fin de fichier
+    extra = _clean(12, pays=("chile",), start="2021-01-20")
+    older = full[full["date_stat"] >= "2021-01-26"]
+    pd.concat([pd.read_csv(fe.CLEAN_DATA_CSV, parse_dates=["date_stat"]), older, extra]).to_csv(
+        fe.CLEAN_DATA_CSV, index=False)
+    out = fe.run_features_incremental()
+
+    assert set(out["nom_pays"]) == {"albania", "france", "chile"}
+    assert (out.loc[out["nom_pays"] != "chile", "date_stat"] >= "2021-01-26").all()
+    assert fe.check_consistency()
+
+    # relancer sans nouvelles données n'ajoute rien
+    assert fe.run_features_incremental().empty
+    assert fe.check_consistency()
+
+
+def test_incremental_without_state_falls_back_to_full(paths):
+    _clean(10).to_csv(fe.CLEAN_DATA_CSV, index=False)
+    out = fe.run_features_incremental()
+    assert len(out) == 2 * (10 - fe.TAIL)
+    assert fe.check_consistency()
+
+
+def test_incremental_reads_recent_rows_and_appends_store_part(paths, monkeypatch):
+    from prediction.datasets import write_table
+    from prediction.feature_store import FeatureStore, feature_store_path
+
+    full = _clean(60)
+    write_table(full[full["date_stat"] < "2021-02-20"], fe.CLEAN_DATA_CSV, export_csv=False)
+    fe.run_features()
+    write_table(pd.concat([full, _clean(15, pays=("chile",))]), fe.CLEAN_DATA_CSV, export_csv=False)
+
+    seen = []
+    scan = fe.iter_table
+    monkeypatch.setattr(fe, "iter_table", lambda *a, **k: (seen.append(c) or c for c in scan(*a, **k)))
+    fe.run_features_incremental()
+    scanned = pd.concat(seen)
+    # pays connus : historique (TAIL lignes) + jours nouveaux ; chile (nouveau) : en entier
+    assert len(scanned) == 2 * (fe.TAIL + 10) + 15
+    assert fe.check_consistency()
+
+    store = FeatureStore(feature_store_path(fe.FEATURES_CSV))
+    assert len(store.meta["parts"]) == 2
+    ref = fe.read_table(fe.FEATURES_CSV)
+    for p in ("albania", "chile"):
+        exp = ref[ref["nom_pays"] == p].reset_index(drop=True)
+        pd.testing.assert_frame_equal(store.frame(p, ["date_stat", "moyenne_7j_taux"]),
+                                      exp[["nom_pays", "date_stat", "moyenne_7j_taux"]], check_dtype=False)
@@ -0,0 +1,115 @@
+# tests/test_features_sql.py
+# Les tests de la vue elle-même nécessitent une base PostgreSQL joignable (variables PG*) ;
+# sinon ils sont sautés.
+import uuid
+from importlib import import_module
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import db_schema
+from db_config import get_connexion
+from prediction.config import FEATURE_SPECS, TARGET_COL
+from prediction.features_sql import (_feature_expr, build_features_query, load_features_db,
+                                     refresh_features_view, render_offline)
+
+
+def test_query_covers_every_feature_spec():
+    q = render_offline(build_features_query())
+    for name, *_ in FEATURE_SPECS:
+        assert f'AS "{name}"' in q
+        assert f'"{name}" IS NOT NULL' in q
+    # mêmes filtres que la collecte, fenêtre par (maladie, pays)
+    assert "p.population > 0" in q
+    assert "PARTITION BY nom_maladie, id_pays ORDER BY date_stat" in q
+
+
+def test_rolling_mean_requires_full_window():
+    q = render_offline(_feature_expr("mean", "x", 7))
+    assert 'COUNT("x") OVER (w ROWS BETWEEN 6 PRECEDING AND CURRENT ROW) = 7' in q
+    with pytest.raises(ValueError):
+        _feature_expr("median", "x", 3)
+
+
+@pytest.fixture()
+def features_schema(monkeypatch):
+    """Schéma jetable migré (cf. test_db_schema) ; saute le test sans PostgreSQL."""
+    try:
+        conn = get_connexion()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL indisponible: {e}")
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+    conn.commit()
+    monkeypatch.setenv("PGOPTIONS", f"-c search_path={schema}")
+    db_schema.migrate()
+    yield schema
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def _insert(conn, stats):
+    with conn.cursor() as cur:
+        for r in stats.itertuples(index=False):
+            cur.execute("""
+                INSERT INTO statistique (date_stat, id_pays, id_maladie, cas_totaux, nouveaux_cas)
+                SELECT %s, id_pays, %s, %s, %s FROM pays WHERE nom_pays = %s
+            """, (r.date_stat.date(), r.id_maladie, int(r.cas_totaux),
+                  None if np.isnan(r.nouveaux_cas) else int(r.nouveaux_cas), r.nom_pays))
+    conn.commit()
+
+
+def _expected(stats, pays, maladie):
+    """Même calcul côté pandas : filtres de la collecte, features, dropna."""
+    compute_features = import_module("prediction.2_features_engineering").compute_features
+    df = stats[stats["id_maladie"] == maladie].merge(pays, on="nom_pays")
+    df["nouveaux_cas"] = df["nouveaux_cas"].fillna(0)
+    df = df[(df["population"] > 0) & (df["nouveaux_cas"] >= 0)]
+    df = compute_features(df.sort_values(["nom_pays", "date_stat"]).copy())
+    return df.dropna(subset=[name for name, *_ in FEATURE_SPECS]).reset_index(drop=True)
+
+
+def test_view_matches_compute_features(features_schema):
+    rng = np.random.default_rng(31)
+    pays = pd.DataFrame({"nom_pays": ["a", "b", "c", "vide"], "continent": "Europe",
+                         "population": [1_000_000, 250_000, 7_000, 0]})
+    stats = pd.DataFrame([(p, d, m) for p in pays["nom_pays"] for m in (1, 2)
+                          for d in pd.date_range("2021-01-01", periods=40)],
+                         columns=["nom_pays", "date_stat", "id_maladie"])
+    stats["nouveaux_cas"] = rng.integers(0, 500, len(stats)).astype(float)
+    stats.loc[rng.random(len(stats)) < 0.05, "nouveaux_cas"] = np.nan  # NULL → 0
+    stats.loc[rng.random(len(stats)) < 0.03, "nouveaux_cas"] = -3      # révision : ligne exclue
+    stats["cas_totaux"] = stats.groupby(["nom_pays", "id_maladie"])["nouveaux_cas"].cumsum().fillna(0)
+    last_day = stats["date_stat"] == stats["date_stat"].max()
+
+    conn = get_connexion()
+    try:
+        with conn.cursor() as cur:
+            cur.executemany("INSERT INTO pays (nom_pays, continent, population) VALUES (%s, %s, %s)",
+                            list(pays.itertuples(index=False)))
+        _insert(conn, stats[~last_day])
+        n = refresh_features_view(conn)  # création de la vue
+
+        cols = [TARGET_COL] + [name for name, *_ in FEATURE_SPECS]
+        for maladie, nom in ((1, "covid_19"), (2, "monkeypox")):
+            exp = _expected(stats[~last_day], pays, maladie)
+            got = load_features_db(nom, conn=conn)
+            pd.testing.assert_frame_equal(got[["nom_pays", "date_stat"]], exp[["nom_pays", "date_stat"]],
+                                          check_dtype=False)
+            np.testing.assert_allclose(got[cols].to_numpy(float), exp[cols].to_numpy(float), rtol=1e-9)
+            n -= len(got)
+        assert n == 0
+
+        # specs inchangées : REFRESH CONCURRENTLY, qui voit le dernier jour
+        _insert(conn, stats[last_day])
+        refresh_features_view(conn)
+        exp = _expected(stats, pays, 1)
+        got = load_features_db("covid_19", conn=conn)
+        assert len(got) == len(exp)
+        np.testing.assert_allclose(got[cols].to_numpy(float), exp[cols].to_numpy(float), rtol=1e-9)
+    finally:
+        conn.close()
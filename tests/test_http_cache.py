@@ -0,0 +1,69 @@
+# tests/test_http_cache.py
+import os
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.http_cache import CompressionMiddleware, conditional
+
+_state = {"version": 1, "calls": 0}
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    stamp = lambda request: ((_state["version"],), datetime(2024, 5, 1, 12, tzinfo=timezone.utc))
+
+    @app.get("/donnees", dependencies=[conditional(stamp)])
+    def donnees(n: int = 10):
+        _state["calls"] += 1
+        return {"valeurs": list(range(n))}
+
+    return TestClient(app)
+
+
+def test_if_none_match_skips_endpoint():
+    _state.update(version=1, calls=0)
+    client = _app()
+    r = client.get("/donnees")
+    tag = r.headers["ETag"]
+    assert r.status_code == 200 and r.headers["Last-Modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+    # cacheable par la passerelle (s-maxage), revalidée à chaque usage par les navigateurs
+    assert "max-age=0" in r.headers["Cache-Control"] and "s-maxage=" in r.headers["Cache-Control"]
+
+    r = client.get("/donnees", headers={"If-None-Match": tag})
+    assert r.status_code == 304 and r.content == b"" and r.headers["ETag"] == tag
+    assert _state["calls"] == 1  # l'endpoint (la requête SQL) n'a pas tourné
+
+    assert client.get("/donnees?n=11", headers={"If-None-Match": tag}).status_code == 200  # autre query
+    _state["version"] = 2  # nouvelle version des données : l'ancien ETag ne vaut plus
+    assert client.get("/donnees", headers={"If-None-Match": tag}).status_code == 200
+    assert client.get("/donnees", headers={"If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"}).status_code == 304
+
+
+def test_gzip_above_threshold_with_own_etag():
+    _state.update(version=1, calls=0)
+    client = _app()
+    small = client.get("/donnees", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    big = client.get("/donnees?n=2000", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip" and big.headers["ETag"].endswith('-gzip"')
+    assert len(big.json()["valeurs"]) == 2000
+    # le client renvoie l'ETag de la représentation compressée : toujours un 304
+    r = client.get("/donnees?n=2000", headers={"Accept-Encoding": "gzip", "If-None-Match": big.headers["ETag"]})
+    assert r.status_code == 304
+
+
+def test_ml_series_revalidated_until_model_changes(test_client, tmp_model_and_features):
+    r = test_client.get("/ml/predict_series/France")
+    tag = r.headers["ETag"]
+    assert test_client.get("/ml/predict_series/France", headers={"If-None-Match": tag}).status_code == 304
+    assert test_client.get("/ml/predict_series/Spain", headers={"If-None-Match": tag}).status_code == 200
+
+    model = tmp_model_and_features["model_path"]  # réentraînement : nouveau mtime
+    t = time.time() + 5
+    os.utime(model, (t, t))
+    assert test_client.get("/ml/predict_series/France", headers={"If-None-Match": tag}).status_code == 200
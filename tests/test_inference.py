@@ -0,0 +1,49 @@
+# tests/test_inference.py
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from api.inference import BatchingExecutor
+
+
+class _CountingModel:
+    """Renvoie la somme des colonnes ; compte les appels et la taille des batchs."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        if (X["a"] < 0).any():
+            raise ValueError("valeur négative")
+        return X.sum(axis=1).to_numpy()
+
+
+def _frame(i, n=5):
+    return pd.DataFrame({"a": np.arange(n, dtype=float) + i * 100, "b": 1.0})
+
+
+def test_concurrent_requests_are_merged_and_scattered_back():
+    model, ex = _CountingModel(), BatchingExecutor(max_rows=1000, max_wait_ms=50, workers=1)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: ex.predict(model, _frame(i)), range(8)))
+    finally:
+        ex.shutdown()
+    for i, y in enumerate(results):
+        np.testing.assert_array_equal(y, _frame(i).sum(axis=1).to_numpy())
+    assert len(model.calls) < 8 and sum(model.calls) == 40
+
+
+def test_max_rows_caps_batches_and_errors_stay_local():
+    model, ex = _CountingModel(), BatchingExecutor(max_rows=10, max_wait_ms=50, workers=1)
+    try:
+        futures = [ex.submit(model, _frame(i)) for i in range(4)]
+        bad = ex.submit(model, _frame(-1))
+        for f in futures:
+            assert len(f.result(5)) == 5
+        assert isinstance(bad.exception(5), ValueError)
+    finally:
+        ex.shutdown()
+    assert max(model.calls) <= 10
@@ -0,0 +1,34 @@
+# tests/test_ml_maladies.py
+import shutil
+
+import api.ml_router as ml
+from prediction.config import paths_for
+
+
+def _artefacts(monkeypatch, tmp_path, src, maladies):
+    """Un dossier ARTIFACTS_DIR/<maladie>/ par maladie, noms de fichiers de paths_for."""
+    monkeypatch.setattr(ml, "ARTIFACTS_DIR", tmp_path / "artifacts")
+    for m in maladies:
+        env = paths_for(m)
+        dst = tmp_path / "artifacts" / m
+        dst.mkdir(parents=True)
+        shutil.copy(src["model_path"], dst / ml.Path(env["MODEL_PATH"]).name)
+        shutil.copy(src["features_csv"], dst / ml.Path(env["FEATURES_CSV"]).name)
+
+
+def test_routes_par_maladie(test_client, tmp_model_and_features, tmp_path, monkeypatch):
+    _artefacts(monkeypatch, tmp_path, tmp_model_and_features, ["mpox"])
+    assert "mpox" in test_client.get("/ml/maladies").json()["maladies"]
+    assert "France" in test_client.get("/ml/mpox/available_countries").json()["countries"]
+    r = test_client.get("/ml/mpox/predict_series/France")
+    assert r.status_code == 200 and r.json()["points"]
+    assert test_client.get("/ml/inconnue/available_countries").status_code == 404
+
+
+def test_lru_borne_le_nombre_de_modeles(test_client, tmp_model_and_features, tmp_path, monkeypatch):
+    _artefacts(monkeypatch, tmp_path, tmp_model_and_features, ["a", "b", "c"])
+    monkeypatch.setattr(ml, "ML_MAX_MODELS", 2)
+    for m in ["a", "b", "c"]:
+        assert test_client.get(f"/ml/{m}/predict_series/France").status_code == 200
+    assert len(ml._models) == 2
+    assert not any("/a/" in k for k in ml._models)  # le moins récent a été évincé
@@ -0,0 +1,53 @@
+# tests/test_ml_metrics.py
+import os
+
+from prometheus_client import REGISTRY
+
+import api.ml_router as ml
+
+EP = "/ml/predict_series/{nom_pays}"
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_series_cache_and_phase_metrics(test_client):
+    hits0 = _value("ml_cache_requests_total", endpoint=EP, cache="series", result="hit")
+    predicts0 = _value("ml_phase_seconds_count", endpoint=EP, phase="predict")
+
+    first = test_client.get("/ml/predict_series/France").json()
+    second = test_client.get("/ml/predict_series/France").json()
+    assert first == second
+    assert _value("ml_cache_requests_total", endpoint=EP, cache="series", result="hit") == hits0 + 1
+    assert _value("ml_phase_seconds_count", endpoint=EP, phase="predict") == predicts0 + 1  # 2e appel servi du cache
+    assert _value("ml_rows_scored_sum", endpoint=EP) > 0
+    assert _value("ml_model_load_seconds_count", maladie=ml.MALADIE_CIBLE, format="pickle") >= 1
+
+
+def test_new_features_invalidate_caches(test_client, tmp_model_and_features):
+    test_client.get("/ml/predict_series/France")
+    csv = tmp_model_and_features["features_csv"]
+    st = csv.stat()
+    os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # features régénérées
+    misses0 = _value("ml_cache_requests_total", endpoint=EP, cache="series", result="miss")
+    assert test_client.get("/ml/predict_series/France").status_code == 200
+    assert _value("ml_cache_requests_total", endpoint=EP, cache="series", result="miss") == misses0 + 1
+
+
+def test_model_version_label_read_without_hashing(test_client, tmp_model_and_features, monkeypatch):
+    import hashlib
+
+    from prediction.stamps import write_model_version
+
+    model_path = tmp_model_and_features["model_path"]
+    version = write_model_version(model_path)  # écrite à la sauvegarde du modèle
+    monkeypatch.setattr(hashlib, "file_digest", None)  # le chargement ne relit pas le .pkl
+    assert test_client.get("/ml/predict_series/France").status_code == 200
+    assert _value("ml_model_active", maladie=ml.MALADIE_CIBLE, version=version, format="pickle") == 1
+
+    st = model_path.stat()
+    os.utime(model_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # modèle remplacé sans version
+    ml._models.clear()
+    assert test_client.get("/ml/predict_series/France").status_code == 200
+    assert _value("ml_model_active", maladie=ml.MALADIE_CIBLE, version="inconnue", format="pickle") == 1
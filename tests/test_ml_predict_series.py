@@ -44,7 +44,7 @@ def test_available_countries_503_when_features_missing(test_client, tmp_path):
 
 def test_predict_series_503_when_model_missing(test_client, tmp_path):
     # Simule modèle manquant
-    ml._model = None
+    ml._models.clear()
     ml.MODEL_PATH = tmp_path / "no_model.pkl"
     r = test_client.get("/ml/predict_series/France")
     assert r.status_code == 503
@@ -0,0 +1,39 @@
+# tests/test_model_benchmark.py
+import json
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+from prediction.model_benchmark import benchmark_model, select_model, write_report
+
+
+def _row(name, rmse, p99, mb):
+    return {"name": name, "rmse": rmse, "single_p99_ms": p99, "serve_mb": mb}
+
+
+def test_select_model_respects_budgets():
+    res = [_row("gros", 1.0, 40.0, 900.0), _row("moyen", 1.1, 5.0, 80.0), _row("petit", 1.5, 1.0, 2.0)]
+    assert select_model(res)["name"] == "gros"
+    assert select_model(res, max_p99_ms=10)["name"] == "moyen"
+    assert select_model(res, max_size_mb=10)["name"] == "petit"
+    assert select_model(res, max_p99_ms=0.1)["name"] == "petit"  # hors budget : le plus rapide
+
+
+def test_benchmark_and_report(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(size=(300, 3)), columns=["a", "b", "c"])
+    y = X["a"] * 2 + rng.normal(scale=0.01, size=300)
+    Xtr, Xte, ytr, yte = X.iloc[:200], X.iloc[200:], y[:200], y[200:]
+
+    rf = benchmark_model("rf", RandomForestRegressor(n_estimators=5, random_state=0), Xte, yte, Xtr, ytr)
+    lin = benchmark_model("ridge", Ridge(), Xte, yte, Xtr, ytr)
+    assert rf["serve_format"] == "compact" and lin["serve_format"] == "pickle"
+    assert rf["fit_s"] > 0 and rf["single_p99_ms"] >= rf["single_p50_ms"] > 0
+    assert rf["batch_rows"] == 100
+
+    out = write_report([rf, lin], rf, tmp_path / "bench.json", {"max_p99_ms": None})
+    assert json.loads(out.read_text())["selected"] == "rf"
+    assert "**rf** ✅" in (tmp_path / "bench.md").read_text()
+
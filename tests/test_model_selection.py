@@ -0,0 +1,39 @@
+# tests/test_model_selection.py
+import pandas as pd
+
+from prediction.model_selection import available_cores, date_folds, split_cores, temporal_split
+
+
+def _dates():
+    # 2 pays x 30 jours, lignes mélangées comme dans features_data.csv
+    d = pd.date_range("2021-01-01", periods=30, freq="D")
+    return pd.Series(list(d) * 2).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def test_temporal_split_test_is_after_train():
+    dates = _dates()
+    tr, te = temporal_split(dates, test_size=0.2)
+    assert len(tr) + len(te) == len(dates)
+    assert dates[tr].max() < dates[te].min()
+
+
+def test_date_folds_never_leak_future_nor_split_a_date():
+    dates = _dates()
+    folds = date_folds(dates, n_splits=3)
+    assert len(folds) == 3
+    for tr, te in folds:
+        assert dates[tr].max() < dates[te].min()
+        assert set(dates[tr]).isdisjoint(set(dates[te]))
+
+
+def test_available_cores_env_override(monkeypatch):
+    monkeypatch.setenv("TRAIN_N_JOBS", "3")
+    assert available_cores() == 3
+    monkeypatch.delenv("TRAIN_N_JOBS")
+    assert available_cores() >= 1
+
+
+def test_split_cores_fair_and_at_least_one():
+    assert split_cores(8, 3) == [3, 3, 2]
+    assert split_cores(1, 2) == [1, 1]
+    assert sum(split_cores(13, 4)) == 13
@@ -0,0 +1,56 @@
+# tests/test_pipeline.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from prediction.pipeline import digest_paths
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(tmp_path, *args):
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "ARTIFACTS_DIR": str(tmp_path / "art"),
+           "CLEAN_DATA_CSV": str(tmp_path / "clean_data.csv"), "FEATURES_CSV": str(tmp_path / "features_data.csv")}
+    out = subprocess.run([sys.executable, "-m", "prediction.pipeline", *args], cwd=tmp_path, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stdout + out.stderr
+    return out.stdout
+
+
+def _status(stdout, stage):
+    line = next(l for l in stdout.splitlines() if l.split()[1:2] == [stage])  # ligne du bilan
+    return line.split()[2]
+
+
+def test_features_stage_skipped_until_input_changes(tmp_path):
+    rng = np.random.default_rng(0)
+    clean = pd.DataFrame({
+        "date_stat": np.tile(pd.date_range("2021-01-01", periods=20), 2),
+        "nom_pays": ["albania"] * 20 + ["france"] * 20,
+        "continent": "Europe", "population": 1_000_000,
+        "nouveaux_cas": rng.integers(0, 500, 40), "cas_totaux": 0,
+    })
+    clean.to_csv(tmp_path / "clean_data.csv", index=False)
+
+    assert _status(_run(tmp_path, "--stages", "features"), "features") == "exécuté"
+    assert _status(_run(tmp_path, "--stages", "features"), "features") == "sauté"
+    assert _status(_run(tmp_path, "--stages", "features", "--force", "features"), "features") == "exécuté"
+
+    clean.assign(nouveaux_cas=clean["nouveaux_cas"] + 1).to_csv(tmp_path / "clean_data.csv", index=False)
+    assert _status(_run(tmp_path, "--stages", "features"), "features") == "exécuté"
+
+
+def test_digest_paths_tracks_content(tmp_path):
+    d = tmp_path / "ds"
+    (d / "nom_pays=a").mkdir(parents=True)
+    (d / "nom_pays=a" / "part-0.parquet").write_bytes(b"x")
+    cache = {}
+    first = digest_paths([d], cache)
+    assert digest_paths([d], cache) == first
+    (d / "nom_pays=a" / "part-0.parquet").write_bytes(b"y")
+    assert digest_paths([d], cache) != first
+    assert digest_paths([tmp_path / "absent"], cache) is None
@@ -0,0 +1,102 @@
+# tests/test_predictions_db.py
+# Nécessite une base PostgreSQL joignable (variables PG*) ; sinon les tests sont sautés.
+# Tout se passe dans un schéma jetable (search_path via PGOPTIONS), supprimé à la fin.
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api.ml_router as ml
+from db_config import get_connexion
+from db_schema import migrate
+from prediction import predictions_db
+
+
+@pytest.fixture()
+def db_schema(monkeypatch):
+    try:
+        conn = get_connexion()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL indisponible: {e}")
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+    conn.commit()
+    monkeypatch.setenv("PGOPTIONS", f"-c search_path={schema}")
+    migrate()
+    with conn.cursor() as cur:
+        cur.execute(f"INSERT INTO {schema}.pays (nom_pays) VALUES ('France'), ('United States'), ('Chile')")
+    conn.commit()
+    yield schema
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def _preds(offset=0.0):
+    d = pd.date_range("2021-01-01", periods=5)
+    return pd.DataFrame({
+        "date_stat": np.tile(d, 2),
+        "nom_pays": ["France"] * 5 + ["United States"] * 5,
+        "population": 1e6,
+        "taux_true": [np.nan] + [0.001] * 9,
+        "taux_pred": np.linspace(0, 0.01, 10) + offset,
+        "nouveaux_cas_pred": 1.0,
+    })
+
+
+def test_publish_and_serve_from_db(db_schema, test_client, monkeypatch):
+    assert predictions_db.publish_predictions(_preds(), "covid_19", "v1") == 10
+    predictions_db.publish_predictions(_preds(offset=1.0), "covid_19", "v2")
+
+    monkeypatch.setattr(ml, "ML_SERVING_MODE", "db")
+    monkeypatch.setattr(ml, "MODEL_PATH", ml.MODEL_PATH.with_name("absent.pkl"))  # aucun modèle requis
+    ml._models.clear()
+
+    assert test_client.get("/ml/available_countries").json() == {"countries": ["France", "United States"]}
+    pts = test_client.get("/ml/predict_series/united_states").json()["points"]
+    assert [p["date"] for p in pts] == [f"2021-01-0{i}" for i in range(1, 6)]
+    assert pts[0]["taux_pred"] == pytest.approx(1.0 + 0.01 * 5 / 9)  # version active = v2
+    assert test_client.get("/ml/predict_series/France").json()["points"][0]["taux_true"] is None
+    assert test_client.get("/ml/predict_series/Chile").status_code == 404
+    assert not ml._models
+
+    # v1 conservée (KEEP_VERSIONS=2) ; une 3e version purge la plus ancienne
+    predictions_db.publish_predictions(_preds(offset=2.0), "covid_19", "v3")
+    conn = get_connexion()
+    with conn.cursor() as cur:
+        cur.execute("SELECT model_version FROM model_registry ORDER BY created_at")
+        assert [r[0] for r in cur.fetchall()] == ["v2", "v3"]
+        cur.execute("SELECT COUNT(*) FROM prediction")
+        assert cur.fetchone()[0] == 20
+    conn.close()
+
+
+def test_same_version_for_two_diseases_keeps_both_series(db_schema):
+    # même empreinte de modèle (ex. persistence, sans état appris) pour deux maladies
+    predictions_db.publish_predictions(_preds(), "covid_19", "v1")
+    predictions_db.publish_predictions(_preds(offset=1.0), "monkeypox", "v1")
+    predictions_db.publish_predictions(_preds(offset=2.0), "monkeypox", "v2")
+
+    covid = predictions_db.fetch_series("covid_19", "france")
+    mpox = predictions_db.fetch_series("monkeypox", "france")
+    assert len(covid) == len(mpox) == 5
+    assert covid[1][2] == pytest.approx(0.01 / 9)
+    assert mpox[1][2] == pytest.approx(2.0 + 0.01 / 9)  # version active = v2
+    assert predictions_db.fetch_countries("covid_19") == ["France", "United States"]
+    assert predictions_db.fetch_series("covid_19", "narnia") == []
+
+    conn = get_connexion()
+    with conn.cursor() as cur:
+        cur.execute("SELECT nom_maladie, model_version, actif FROM model_registry ORDER BY 1, 2")
+        assert cur.fetchall() == [("covid_19", "v1", True), ("monkeypox", "v1", False), ("monkeypox", "v2", True)]
+        # lecture d'une série : index sur le nom normalisé puis clé primaire, sans parcours séquentiel
+        cur.execute("SET enable_seqscan = off")
+        plans = []
+        for q, params in ((predictions_db.PAYS_ID_SQL, ("france",)), (predictions_db.SERIES_SQL, ("covid_19", 1))):
+            cur.execute("EXPLAIN " + q, params)
+            plans.append("\n".join(r[0] for r in cur.fetchall()))
+        assert "pays_nom_norm" in plans[0] and "prediction_pkey" in plans[1]
+    conn.close()
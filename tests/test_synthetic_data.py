@@ -0,0 +1,29 @@
+# tests/test_synthetic_data.py
+import hashlib
+
+import data_cleaner
+from bench.synthetic_data import generate
+
+
+def _md5(path):
+    return hashlib.md5(path.read_bytes()).hexdigest()
+
+
+def test_generate_is_seeded_and_readable_by_cleaners(tmp_path, monkeypatch):
+    a, b = tmp_path / "a", tmp_path / "b"
+    kw = dict(n_regions=12, jours=60, seed=3, p_gap=0.02, p_revision=0.02)
+    rows = generate(a, **kw)
+    generate(b, **kw)
+    assert {f: _md5(a / f) for f in rows} == {f: _md5(b / f) for f in rows}
+
+    monkeypatch.setattr(data_cleaner, "DATA_DIR", a)
+    covid = data_cleaner.nettoyer_covid_daily()
+    assert len(covid) == 12 * 60
+    assert covid["nom_pays"].str.fullmatch(r"[a-z0-9_]+").all()
+    # trous de déclaration et révisions : ce que l'ETL doit encaisser
+    assert covid["nouveaux_cas"].isna().any() and (covid["nouveaux_cas"] < 0).any()
+
+    mpox = data_cleaner.nettoyer_monkeypox()
+    assert set(mpox["nom_pays"]) <= set(covid["nom_pays"])  # agrégats World/continents retirés
+    summary = data_cleaner.nettoyer_covid_summary()
+    assert len(summary) == 12
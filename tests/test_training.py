@@ -0,0 +1,17 @@
+# tests/test_training.py
+import pandas as pd
+
+from prediction import training
+from prediction.baselines import PersistenceRegressor
+
+
+def test_finalists_distinct_last_round_first():
+    cv = {"iter": [0, 0, 0, 1], "rank_test_score": [2, 3, 4, 1],
+          "params": [{"a": 1, "n_estimators": 30}, {"a": 2, "n_estimators": 30},
+                     {"a": 3, "n_estimators": 30}, {"a": 1, "n_estimators": 90}]}
+    assert training.finalists(cv, 2, drop=("n_estimators",)) == [{"a": 1}, {"a": 2}]
+
+
+def test_persistence_baseline_repeats_previous_day():
+    X = pd.DataFrame({"nouveaux_cas": [1.0, 2.0], "taux_transmission_j-1": [0.1, 0.2]})
+    assert PersistenceRegressor().fit(X).predict(X).tolist() == [0.1, 0.2]